@@ -0,0 +1,64 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+class RenderBudgetExceeded(RenderCancelled):
+    pass
+
+
+class CancelToken:
+    # Asks a render to stop. Grid generation, fill computation and drawing check the
+    # token of their cancel scope once per row, and stop with RenderCancelled once it
+    # is cancelled or with RenderBudgetExceeded once budget seconds have passed.
+    def __init__(self, budget: float | None = None) -> None:
+        self._deadline = None if budget is None else time.monotonic() + budget
+        self._cancelled = threading.Event()
+
+    def __getstate__(self) -> dict:
+        # NOTE: Only the deadline reaches renders in other processes, cancelling a
+        # token does not
+        return {"deadline": self._deadline}
+
+    def __setstate__(self, state: dict) -> None:
+        self._deadline = state["deadline"]
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise RenderCancelled("render was cancelled")
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise RenderBudgetExceeded("render ran out of time")
+
+
+_cancel_token: ContextVar[CancelToken | None] = ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    # Makes the renders run in the scope check the token
+    reset = _cancel_token.set(token)
+    try:
+        yield token
+    finally:
+        _cancel_token.reset(reset)
+
+
+def check_cancelled() -> None:
+    # Raises RenderCancelled when the render of the current scope should stop
+    token = _cancel_token.get()
+    if token is not None:
+        token.check()
@@ -0,0 +1,41 @@
+import hashlib
+import struct
+from functools import cache
+
+# Bits of a single hash, every row of a grid is split into blocks of this many columns
+BLOCK_BITS = 512
+_BLOCK = struct.Struct("<qq")
+
+
+@cache
+def _seed_key(seed: int) -> bytes:
+    return hashlib.blake2b(str(seed).encode(), digest_size=32).digest()
+
+
+def _block_bits(seed: int, row: int, block: int) -> int:
+    digest = hashlib.blake2b(
+        _BLOCK.pack(row, block), digest_size=BLOCK_BITS // 8, key=_seed_key(seed)
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+def counter_random_row(seed: int, row: int, cols: range) -> int:
+    # Random bits of the columns of a row, the first column is the most significant
+    # bit. Every bit is a pure function of (seed, row, col), so any window of any grid
+    # sees the same bits for the same cells, and rows can be computed independently.
+    if not cols:
+        return 0
+
+    first_block = cols.start // BLOCK_BITS
+    last_block = (cols.stop - 1) // BLOCK_BITS
+
+    bits = 0
+    for block in range(first_block, last_block + 1):
+        bits = (bits << BLOCK_BITS) | _block_bits(seed, row, block)
+
+    bits >>= (last_block + 1) * BLOCK_BITS - cols.stop
+    return bits & ((1 << len(cols)) - 1)
+
+
+def counter_random_bit(seed: int, row: int, col: int) -> int:
+    return counter_random_row(seed, row, range(col, col + 1))
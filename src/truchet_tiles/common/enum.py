@@ -11,3 +11,10 @@ class SvgColors:
     BLACK = "#000000"
     WHITE = "#FFFFFF"
     RED = "#FF0000"
+
+
+class DetailLevel(str, Enum):
+    full = "full"
+    no_strokes = "no_strokes"  # Tiles without their connector lines
+    straight_fills = "straight_fills"  # Line connector fills without strokes
+    raster = "raster"  # One pixel per tile image of the fill inside grid
@@ -0,0 +1,233 @@
+from collections.abc import Callable, Iterable
+from random import Random
+from typing import Protocol
+
+from truchet_tiles.common.cancel import check_cancelled
+from truchet_tiles.common.progress import report_progress
+from truchet_tiles.common.window import GridWindow
+
+
+class Grid(Protocol):
+    # 0-1 values keyed by (row, col) for rectangular and axial (q, r) for hexagonal
+    # grids. Values are only meaningful for the cells of the tiling.
+    # NOTE: defaultdict[tuple[int, int], int] grids satisfy this protocol as well
+    def __getitem__(self, key: tuple[int, int]) -> int: ...
+
+
+def _evaluate_row(func: Callable[[int, int], int], row: int, cols: range) -> int:
+    # Bits of the row as an integer, the first column is the most significant bit
+    bits = 0
+    for col in cols:
+        bits = (bits << 1) | func(row, col)
+
+    return bits
+
+
+class ConstantGrid:
+    def __init__(self, value: int) -> None:
+        if value not in (0, 1):
+            raise ValueError("value should be 0 or 1")
+
+        self._value = value
+
+    def __getitem__(self, key: tuple[int, int]) -> int:
+        return self._value
+
+
+class FunctionalGrid:
+    # Evaluates the row function lazily, one row of the window at a time. Row
+    # functions compute whole rows at once, in the layout of row_bits.
+    def __init__(
+        self, row_func: Callable[[int, range], int], window: GridWindow
+    ) -> None:
+        self._row_func = row_func
+        self._window = window
+        self._rows: dict[int, int] = {}
+
+    @classmethod
+    def from_function(
+        cls, func: Callable[[int, int], int], window: GridWindow
+    ) -> "FunctionalGrid":
+        return cls(lambda row, cols: _evaluate_row(func, row, cols), window)
+
+    @classmethod
+    def from_row_function(
+        cls, row_func: Callable[[int, range], int], window: GridWindow
+    ) -> "FunctionalGrid":
+        return cls(row_func, window)
+
+    @property
+    def window(self) -> GridWindow:
+        return self._window
+
+    def row(self, row: int) -> int:
+        bits = self._rows.get(row)
+        if bits is None:
+            bits = self._row_func(row, self._window.cols)
+            self._rows[row] = bits
+
+        return bits
+
+    def __getitem__(self, key: tuple[int, int]) -> int:
+        if key not in self._window:
+            return 0
+
+        row, col = key
+        return (self.row(row) >> (self._window.col_stop - 1 - col)) & 1
+
+
+class PackedGrid:
+    # Dense 1 bit per cell storage of the window, row major and most significant bit
+    # first, with every row padded to whole bytes. The data can be any byte buffer of
+    # that layout, e.g. a read only memoryview of a memory mapped grid file.
+    def __init__(
+        self, window: GridWindow, data: bytearray | memoryview | None = None
+    ) -> None:
+        self._window = window
+        self._row_size = (len(window.cols) + 7) // 8
+        size = self._row_size * len(window.rows)
+
+        if data is None:
+            data = bytearray(size)
+        elif len(data) != size:
+            raise ValueError(f"data should be {size} bytes for the window")
+
+        self._data = data
+
+    @classmethod
+    def from_function(
+        cls, func: Callable[[int, int], int], window: GridWindow
+    ) -> "PackedGrid":
+        return cls.from_row_bits(
+            window, (_evaluate_row(func, row, window.cols) for row in window.rows)
+        )
+
+    @classmethod
+    def from_row_bits(cls, window: GridWindow, rows: Iterable[int]) -> "PackedGrid":
+        # Rows are integers in the layout of row_bits, one per row of the window
+        padding = -len(window.cols) % 8
+        row_size = (len(window.cols) + 7) // 8
+        data = bytearray()
+        for index, bits in enumerate(rows):
+            check_cancelled()
+            report_progress(index, len(window.rows))
+            data += (bits << padding).to_bytes(row_size, "big")
+
+        return cls(window, data)
+
+    @classmethod
+    def from_row_function(
+        cls, row_func: Callable[[int, range], int], window: GridWindow
+    ) -> "PackedGrid":
+        return cls.from_row_bits(
+            window, (row_func(row, window.cols) for row in window.rows)
+        )
+
+    @classmethod
+    def from_random(cls, window: GridWindow, rng: Random) -> "PackedGrid":
+        # Uniformly random cells of the whole window, drawn with a single call
+        row_size = (len(window.cols) + 7) // 8
+        data = bytearray(rng.randbytes(row_size * len(window.rows)))
+
+        padding = -len(window.cols) % 8
+        if padding:
+            for index in range(row_size - 1, len(data), row_size):
+                data[index] &= (0xFF << padding) & 0xFF
+
+        return cls(window, data)
+
+    @classmethod
+    def from_grid(cls, grid: Grid, window: GridWindow) -> "PackedGrid":
+        if isinstance(grid, PackedGrid) and grid.window == window:
+            return grid
+
+        return cls.from_row_bits(
+            window, (row_bits(grid, row, window.cols) for row in window.rows)
+        )
+
+    @property
+    def window(self) -> GridWindow:
+        return self._window
+
+    @property
+    def data(self) -> bytearray | memoryview:
+        return self._data
+
+    def row_bytes(self, row: int) -> bytes:
+        start = (row - self._window.row_start) * self._row_size
+        return bytes(self._data[start : start + self._row_size])
+
+    def _locate(self, key: tuple[int, int]) -> tuple[int, int]:
+        row, col = key
+        col_index = col - self._window.col_start
+        index = (row - self._window.row_start) * self._row_size + col_index // 8
+        return index, 7 - col_index % 8
+
+    def __getitem__(self, key: tuple[int, int]) -> int:
+        if key not in self._window:
+            return 0
+
+        index, shift = self._locate(key)
+        return (self._data[index] >> shift) & 1
+
+    def __setitem__(self, key: tuple[int, int], value: int) -> None:
+        if key not in self._window:
+            raise KeyError(f"{key} is outside of the grid window")
+
+        index, shift = self._locate(key)
+        if value:
+            self._data[index] |= 1 << shift
+        else:
+            self._data[index] &= ~(1 << shift) & 0xFF
+
+
+def row_bits(grid: Grid, row: int, cols: range) -> int:
+    # Bits of a grid row as an integer, the first column is the most significant bit.
+    # Grids with a known layout are read without visiting every cell.
+    if isinstance(grid, ConstantGrid):
+        return grid[(row, 0)] * ((1 << len(cols)) - 1)
+
+    if isinstance(grid, (FunctionalGrid, PackedGrid)) and _is_subrange(
+        cols, grid.window.cols
+    ):
+        if row not in grid.window.rows:
+            return 0
+
+        if isinstance(grid, FunctionalGrid):
+            bits = grid.row(row)
+        else:
+            padding = -len(grid.window.cols) % 8
+            bits = int.from_bytes(grid.row_bytes(row), "big") >> padding
+
+        return (bits >> (grid.window.col_stop - cols.stop)) & ((1 << len(cols)) - 1)
+
+    return _evaluate_row(lambda row, col: grid[(row, col)], row, cols)
+
+
+def _is_subrange(cols: range, other: range) -> bool:
+    return not cols or (other.start <= cols.start and cols.stop <= other.stop)
+
+
+def reusing_row_function(
+    func: Callable[[int, int], int],
+    grid: Grid | None = None,
+    known_cols: Callable[[int], range] = lambda row: range(0),
+) -> Callable[[int, range], int]:
+    # Row function of func, in the layout of row_bits, that reads the cells in
+    # known_cols(row) from grid instead of evaluating them. E.g. to grow or shrink a
+    # grid from one of another dimension, for the cells both of them share.
+    def _row(row: int, cols: range) -> int:
+        known = known_cols(row)
+        start = min(max(known.start, cols.start), cols.stop)
+        stop = max(min(known.stop, cols.stop), start)
+        if grid is None or start == stop:
+            return _evaluate_row(func, row, cols)
+
+        bits = _evaluate_row(func, row, range(cols.start, start))
+        bits = (bits << (stop - start)) | row_bits(grid, row, range(start, stop))
+        bits = (bits << (cols.stop - stop)) | _evaluate_row(
+            func, row, range(stop, cols.stop)
+        )
+        return bits
+
+    return _row
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import tempfile
+from collections.abc import Callable, Hashable
+from pathlib import Path
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import (
+    GRID_FILE_VERSION,
+    read_grid_file,
+    write_grid_file,
+)
+from truchet_tiles.common.grid_store import get_shared_grid_store
+
+GRID_CACHE_DIR_ENV = "TRUCHET_GRID_CACHE_DIR"
+GRID_CACHE_MAX_BYTES_ENV = "TRUCHET_GRID_CACHE_MAX_BYTES"
+DEFAULT_GRID_CACHE_MAX_BYTES = 1 << 30
+
+# Bump when the bits produced for an existing key change, e.g. a grid function is fixed
+GRID_CACHE_VERSION = 2
+
+_ENTRY_SUFFIX = ".grid"
+
+
+class GridCache:
+    # Content addressed store of packed grids shared by every process using the same
+    # directory. Entries are grid files opened through mmap, so readers share the pages
+    # of the OS page cache instead of holding private copies.
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: int = DEFAULT_GRID_CACHE_MAX_BYTES,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def _path(self, key: tuple[Hashable, ...]) -> Path:
+        text = repr((GRID_CACHE_VERSION, GRID_FILE_VERSION, *key))
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return self._directory / f"{digest}{_ENTRY_SUFFIX}"
+
+    def get(self, key: tuple[Hashable, ...]) -> PackedGrid | None:
+        path = self._path(key)
+        try:
+            grid = read_grid_file(path)
+            # NOTE: Modification times order the entries for eviction, least recently
+            # used first
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return grid
+
+    def put(self, key: tuple[Hashable, ...], grid: PackedGrid) -> None:
+        # NOTE: The entry is written to a temporary file and renamed into place, so
+        # readers in other processes never see a partially written grid
+        fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_grid_file(temp_path, grid)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def get_or_create(
+        self, key: tuple[Hashable, ...], create: Callable[[], PackedGrid]
+    ) -> PackedGrid:
+        grid = self.get(key)
+        if grid is None:
+            grid = create()
+            self.put(key, grid)
+
+        return grid
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._directory.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+
+            # NOTE: Processes that already mapped the entry keep reading it after unlink
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _grid_cache_from_environment() -> GridCache | None:
+    directory = os.environ.get(GRID_CACHE_DIR_ENV)
+    if not directory:
+        return None
+
+    max_bytes = int(
+        os.environ.get(GRID_CACHE_MAX_BYTES_ENV, DEFAULT_GRID_CACHE_MAX_BYTES)
+    )
+    return GridCache(directory, max_bytes)
+
+
+_grid_cache = _grid_cache_from_environment()
+
+
+def configure_grid_cache(
+    directory: str | os.PathLike | None,
+    max_bytes: int = DEFAULT_GRID_CACHE_MAX_BYTES,
+) -> None:
+    # Grids are cached on disk only when a directory is configured, either here or
+    # through the TRUCHET_GRID_CACHE_DIR environment variable
+    global _grid_cache
+    _grid_cache = None if directory is None else GridCache(directory, max_bytes)
+
+
+def get_grid_cache() -> GridCache | None:
+    return _grid_cache
+
+
+def get_or_create_cached_grid(
+    key: tuple[Hashable, ...], create: Callable[[], PackedGrid]
+) -> PackedGrid | None:
+    # Looks the grid up in the shared memory store, then in the disk cache, and stores
+    # created grids in both. Returns None when neither of them is configured.
+    grid_store = get_shared_grid_store()
+    grid_cache = get_grid_cache()
+    if grid_store is None and grid_cache is None:
+        return None
+
+    if grid_store is not None and (grid := grid_store.get(key)) is not None:
+        return grid
+
+    grid = create() if grid_cache is None else grid_cache.get_or_create(key, create)
+    return grid if grid_store is None else grid_store.put(key, grid)
@@ -0,0 +1,70 @@
+import mmap
+import os
+import struct
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.window import GridWindow
+
+# File layout: magic, format version, reserved, window bounds (row_start, row_stop,
+# col_start, col_stop) as signed 64 bit little endian integers, then the packed bits
+# of the window exactly as PackedGrid stores them.
+GRID_FILE_MAGIC = b"TTGR"
+GRID_FILE_VERSION = 1
+_HEADER = struct.Struct("<4sHHqqqq")
+GRID_FILE_HEADER_SIZE = _HEADER.size
+
+
+def _pack_header(window: GridWindow) -> bytes:
+    return _HEADER.pack(
+        GRID_FILE_MAGIC,
+        GRID_FILE_VERSION,
+        0,
+        window.row_start,
+        window.row_stop,
+        window.col_start,
+        window.col_stop,
+    )
+
+
+def grid_buffer_size(grid: PackedGrid) -> int:
+    return GRID_FILE_HEADER_SIZE + len(grid.data)
+
+
+def write_grid_buffer(buffer: memoryview, grid: PackedGrid) -> None:
+    # Writes the grid file layout into a writable buffer of grid_buffer_size bytes
+    buffer[:GRID_FILE_HEADER_SIZE] = _pack_header(grid.window)
+    buffer[GRID_FILE_HEADER_SIZE : grid_buffer_size(grid)] = grid.data
+
+
+def read_grid_buffer(buffer: memoryview) -> PackedGrid:
+    # NOTE: The bits are not copied, the returned grid is a view of the buffer
+    if len(buffer) < GRID_FILE_HEADER_SIZE:
+        raise ValueError("buffer is too small to hold a grid")
+
+    magic, version, _, *bounds = _HEADER.unpack_from(buffer)
+    if magic != GRID_FILE_MAGIC:
+        raise ValueError("buffer does not hold a grid")
+    if version != GRID_FILE_VERSION:
+        raise ValueError(f"unsupported grid file version {version}")
+
+    window = GridWindow(*bounds)
+    size = GRID_FILE_HEADER_SIZE + (len(window.cols) + 7) // 8 * len(window.rows)
+    return PackedGrid(window, buffer[GRID_FILE_HEADER_SIZE:size])
+
+
+def write_grid_file(path: str | os.PathLike, grid: PackedGrid) -> None:
+    with open(path, "wb") as file:
+        file.write(_pack_header(grid.window))
+        file.write(grid.data)
+
+
+def read_grid_file(path: str | os.PathLike) -> PackedGrid:
+    # NOTE: The bits are not read here, the returned grid is a read only view of the
+    # memory mapped file and pages are loaded by the OS as cells are accessed
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < GRID_FILE_HEADER_SIZE:
+            raise ValueError(f"{path} is too small to be a grid file")
+
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return read_grid_buffer(memoryview(mapped))
@@ -0,0 +1,135 @@
+import re
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import GRID_FILE_MAGIC, read_grid_buffer
+from truchet_tiles.common.window import GridWindow
+
+# Decoders of user provided 0/1 grids. All of them read the size first and reject
+# grids larger than max_dimension before decoding any cell, and all of them decode
+# whole rows or runs at a time into a PackedGrid of window (0, height, 0, width).
+
+# Header of a binary PBM image, comments may appear between the tokens
+_PBM_HEADER = re.compile(rb"P4(?:\s+|#[^\n]*\n)+(\d+)(?:\s+|#[^\n]*\n)+(\d+)\s")
+# Header of a run length encoded text grid, as used for Game of Life patterns
+_RLE_HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)")
+_RLE_RUN = re.compile(r"(\d*)([bo$!])")
+
+
+def _check_size(width: int, height: int, max_dimension: int) -> None:
+    if not (0 < width <= max_dimension and 0 < height <= max_dimension):
+        raise ValueError(
+            f"grid is {width}x{height}, it should be between 1x1 and "
+            f"{max_dimension}x{max_dimension}"
+        )
+
+
+def _clear_padding(data: bytearray, width: int) -> None:
+    # The bits after the last column of a row are 0 in a PackedGrid
+    padding = -width % 8
+    if not padding:
+        return
+
+    row_size = (width + 7) // 8
+    mask = (0xFF << padding) & 0xFF
+    for index in range(row_size - 1, len(data), row_size):
+        data[index] &= mask
+
+
+def decode_pbm(data: bytes, max_dimension: int) -> PackedGrid:
+    # Binary PBM (P4) images already store rows as packed bits, 1 is black
+    header = _PBM_HEADER.match(data)
+    if header is None:
+        raise ValueError("data is not a binary PBM image")
+
+    width, height = int(header.group(1)), int(header.group(2))
+    _check_size(width, height, max_dimension)
+
+    size = (width + 7) // 8 * height
+    bits = bytearray(data[header.end() : header.end() + size])
+    if len(bits) != size:
+        raise ValueError("PBM image is truncated")
+
+    _clear_padding(bits, width)
+    return PackedGrid(GridWindow(0, height, 0, width), bits)
+
+
+def decode_packed_bits(data: bytes, max_dimension: int) -> PackedGrid:
+    # Grids in the grid file layout, see truchet_tiles.common.grid_file
+    grid = read_grid_buffer(memoryview(data))
+    width, height = len(grid.window.cols), len(grid.window.rows)
+    _check_size(width, height, max_dimension)
+
+    bits = bytearray(grid.data)
+    _clear_padding(bits, width)
+    return PackedGrid(GridWindow(0, height, 0, width), bits)
+
+
+def decode_rle(text: str, max_dimension: int) -> PackedGrid:
+    # Run length encoded text: "#" comment lines, an "x = <width>, y = <height>"
+    # header line, then runs of "b" (0) and "o" (1) cells with optional counts, "$"
+    # ending rows and "!" ending the grid. Rows may be shorter than the width.
+    lines = [line for line in text.splitlines() if not line.startswith("#")]
+    header = _RLE_HEADER.match(lines[0].strip()) if lines else None
+    if header is None:
+        raise ValueError("run length encoded grids should start with x = ..., y = ...")
+
+    width, height = int(header.group(1)), int(header.group(2))
+    _check_size(width, height, max_dimension)
+
+    body = re.sub(r"\s+", "", "".join(lines[1:]))
+    rows: list[int] = []
+    cells: list[str] = []
+    col = 0
+
+    def _end_rows(count: int) -> None:
+        nonlocal col
+        if len(rows) + count > height:
+            raise ValueError("the grid has more rows than its height")
+
+        rows.append(int("".join(cells).ljust(width, "0"), 2))
+        rows.extend([0] * (count - 1))
+        cells.clear()
+        col = 0
+
+    position = 0
+    for run in _RLE_RUN.finditer(body):
+        if run.start() != position:
+            break
+        position = run.end()
+
+        count = int(run.group(1) or 1)
+        match run.group(2):
+            case "b" | "o" if col + count > width:
+                raise ValueError("a row is longer than the grid width")
+            case "b" | "o":
+                cells.append(("1" if run.group(2) == "o" else "0") * count)
+                col += count
+            case "$":
+                _end_rows(count)
+            case "!":
+                position = len(body)
+                break
+
+    if position != len(body):
+        raise ValueError(f"invalid run length encoding at {body[position:][:10]!r}")
+
+    if cells:
+        _end_rows(1)
+
+    rows.extend([0] * (height - len(rows)))
+    return PackedGrid.from_row_bits(GridWindow(0, height, 0, width), rows)
+
+
+def decode_grid(data: bytes, max_dimension: int) -> PackedGrid:
+    # Decodes a PBM image, a grid file or a run length encoded text grid
+    if data.startswith(b"P4"):
+        return decode_pbm(data, max_dimension)
+    if data.startswith(GRID_FILE_MAGIC):
+        return decode_packed_bits(data, max_dimension)
+
+    try:
+        text = data.decode("ascii")
+    except UnicodeDecodeError:
+        raise ValueError("grid should be a PBM image, a grid file or text") from None
+
+    return decode_rle(text, max_dimension)
@@ -0,0 +1,280 @@
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import (
+    GRID_FILE_VERSION,
+    grid_buffer_size,
+    read_grid_buffer,
+    write_grid_buffer,
+)
+
+try:
+    import fcntl
+except ImportError:  # not a POSIX platform
+    fcntl = None  # type: ignore
+
+SHARED_GRID_STORE_ENV = "TRUCHET_SHARED_GRID_STORE"
+SHARED_GRID_STORE_MAX_BYTES_ENV = "TRUCHET_SHARED_GRID_STORE_MAX_BYTES"
+DEFAULT_SHARED_GRID_STORE_MAX_BYTES = 1 << 30
+
+# NOTE: POSIX shared memory objects are files of this directory on Linux, opening them
+# directly keeps their lifetime out of the multiprocessing resource tracker
+SHARED_MEMORY_DIR = Path("/dev/shm")
+
+# Bump when the bits produced for an existing key change, like GRID_CACHE_VERSION
+SHARED_GRID_STORE_VERSION = 2
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def _map_grid(fd: int) -> PackedGrid:
+    # The grid views a read only mapping of its own, so the segment is closed right
+    # away and the mapping lives as long as the grid
+    try:
+        mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+    return read_grid_buffer(memoryview(mapped))
+
+
+class SharedGridStore:
+    # Packed grids published in POSIX shared memory, so that worker processes of the
+    # same host hold one copy of every grid. The first worker to compute a grid
+    # publishes it and the others attach to it without copying.
+    # The index file maps segment names to their size, the time they were last used
+    # and the pids referencing them. Segments no live process references stay for
+    # later processes, and the least recently used of them are unlinked when the
+    # segments outgrow max_bytes. Processes drop their references to the grids they
+    # used least recently when those outgrow max_bytes too.
+    def __init__(
+        self,
+        namespace: str = "truchet",
+        max_bytes: int = DEFAULT_SHARED_GRID_STORE_MAX_BYTES,
+    ) -> None:
+        if fcntl is None or not SHARED_MEMORY_DIR.is_dir():
+            raise RuntimeError(f"shared grid store requires {SHARED_MEMORY_DIR}")
+
+        self._namespace = namespace
+        self._max_bytes = max_bytes
+        self._directory = Path(tempfile.gettempdir()) / f"truchet_tiles_{namespace}"
+        self._directory.mkdir(exist_ok=True)
+        self._grids: OrderedDict[str, PackedGrid] = OrderedDict()
+        self._grid_bytes = 0
+        # NOTE: The index lock only serializes processes, render threads of this
+        # process share the grids it keeps
+        self._lock = threading.Lock()
+        atexit.register(self.release_all)
+
+    def _segment_name(self, key: tuple[Hashable, ...]) -> str:
+        text = repr(
+            (self._namespace, SHARED_GRID_STORE_VERSION, GRID_FILE_VERSION, *key)
+        )
+        # NOTE: Some platforms limit shared memory names to 31 characters
+        return f"tt_{hashlib.sha256(text.encode()).hexdigest()[:24]}"
+
+    @contextmanager
+    def _locked_index(self) -> Iterator[dict[str, dict]]:
+        with open(self._directory / "index.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            index_path = self._directory / "index.json"
+            try:
+                index = json.loads(index_path.read_text())
+            except (FileNotFoundError, ValueError):
+                index = {}
+
+            yield index
+
+            temp_path = index_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(index))
+            os.replace(temp_path, index_path)
+
+    def _prune(self, index: dict[str, dict]) -> None:
+        # Drops the references of processes that are gone
+        for entry in index.values():
+            entry["pids"] = [pid for pid in entry["pids"] if _process_alive(pid)]
+
+    def _evict(self, index: dict[str, dict], size: int) -> bool:
+        # Unlinks the least recently used segments no process references, until size
+        # more bytes fit in max_bytes, and whether they fit
+        total = sum(entry["size"] for entry in index.values())
+        unreferenced = sorted(
+            (entry["used"], name) for name, entry in index.items() if not entry["pids"]
+        )
+        for _, name in unreferenced:
+            if total + size <= self._max_bytes:
+                break
+
+            total -= index.pop(name)["size"]
+            self._unlink(name)
+
+        return total + size <= self._max_bytes
+
+    def _unlink(self, name: str) -> None:
+        (SHARED_MEMORY_DIR / name).unlink(missing_ok=True)
+
+    def _drop_references(self, index: dict[str, dict], size: int) -> None:
+        # Drops the references of this process to the grids it used least recently,
+        # until size more bytes fit in max_bytes
+        pid = os.getpid()
+        while self._grids and self._grid_bytes + size > self._max_bytes:
+            name, grid = self._grids.popitem(last=False)
+            self._grid_bytes -= grid_buffer_size(grid)
+            if name in index:
+                index[name]["pids"] = [p for p in index[name]["pids"] if p != pid]
+
+    def _keep(self, name: str, grid: PackedGrid) -> PackedGrid:
+        self._grids[name] = grid
+        self._grid_bytes += grid_buffer_size(grid)
+        return grid
+
+    def get(self, key: tuple[Hashable, ...]) -> PackedGrid | None:
+        name = self._segment_name(key)
+        with self._lock:
+            if name in self._grids:
+                self._grids.move_to_end(name)
+                return self._grids[name]
+
+            with self._locked_index() as index:
+                self._prune(index)
+                entry = index.get(name)
+                if entry is None:
+                    return None
+
+                self._drop_references(index, entry["size"])
+                try:
+                    fd = os.open(SHARED_MEMORY_DIR / name, os.O_RDONLY)
+                except FileNotFoundError:
+                    del index[name]
+                    return None
+
+                entry["pids"].append(os.getpid())
+                entry["used"] = time.time()
+
+            return self._keep(name, _map_grid(fd))
+
+    def put(self, key: tuple[Hashable, ...], grid: PackedGrid) -> PackedGrid:
+        # Publishes the grid and returns the shared view of it, or the view of the
+        # same grid published by another process in the meantime. Grids that do not
+        # fit in max_bytes next to the referenced ones are returned unshared.
+        name = self._segment_name(key)
+        path = SHARED_MEMORY_DIR / name
+        with self._lock:
+            if name in self._grids:
+                self._grids.move_to_end(name)
+                return self._grids[name]
+
+            # NOTE: Segments are created, filled and indexed under the index lock, so
+            # other processes never attach to a partially written grid. A segment that
+            # is not indexed was left by a process that died while filling it.
+            with self._locked_index() as index:
+                self._prune(index)
+                entry = index.get(name)
+                if entry is not None:
+                    self._drop_references(index, entry["size"])
+                    fd = os.open(path, os.O_RDONLY)
+                    entry["pids"].append(os.getpid())
+                    entry["used"] = time.time()
+                else:
+                    size = grid_buffer_size(grid)
+                    self._drop_references(index, size)
+                    if not self._evict(index, size):
+                        return grid
+
+                    self._unlink(name)
+                    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+                    try:
+                        os.ftruncate(fd, size)
+                        with mmap.mmap(fd, size) as segment:
+                            write_grid_buffer(memoryview(segment), grid)
+                    except BaseException:
+                        os.close(fd)
+                        self._unlink(name)
+                        raise
+
+                    index[name] = {
+                        "pids": [os.getpid()],
+                        "size": size,
+                        "used": time.time(),
+                    }
+
+            return self._keep(name, _map_grid(fd))
+
+    def release_all(self) -> None:
+        # Drops the references of this process, the segments stay for other processes
+        # until they are evicted
+        with self._lock:
+            if not self._grids:
+                return
+
+            pid = os.getpid()
+            with self._locked_index() as index:
+                for name in self._grids:
+                    if name in index:
+                        index[name]["pids"] = [
+                            p for p in index[name]["pids"] if p != pid
+                        ]
+
+                self._prune(index)
+                self._evict(index, 0)
+
+            # NOTE: Grids of this process keep their mappings after the segments are
+            # unlinked
+            self._grids.clear()
+            self._grid_bytes = 0
+
+
+_shared_grid_store: SharedGridStore | None = None
+
+
+def configure_shared_grid_store(
+    namespace: str | None, max_bytes: int = DEFAULT_SHARED_GRID_STORE_MAX_BYTES
+) -> None:
+    # Grids are shared between processes only when a namespace is configured, either
+    # here or through the TRUCHET_SHARED_GRID_STORE environment variable. Platforms
+    # without POSIX shared memory files go on without sharing.
+    global _shared_grid_store
+    if _shared_grid_store is not None:
+        _shared_grid_store.release_all()
+
+    _shared_grid_store = None
+    if namespace is not None:
+        try:
+            _shared_grid_store = SharedGridStore(namespace, max_bytes)
+        except RuntimeError as error:
+            warnings.warn(f"grids are not shared: {error}", RuntimeWarning)
+
+
+def get_shared_grid_store() -> SharedGridStore | None:
+    return _shared_grid_store
+
+
+configure_shared_grid_store(
+    os.environ.get(SHARED_GRID_STORE_ENV) or None,
+    int(
+        os.environ.get(
+            SHARED_GRID_STORE_MAX_BYTES_ENV, DEFAULT_SHARED_GRID_STORE_MAX_BYTES
+        )
+    ),
+)
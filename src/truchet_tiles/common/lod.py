@@ -0,0 +1,28 @@
+import math
+from dataclasses import dataclass
+
+from truchet_tiles.common.enum import DetailLevel
+
+
+@dataclass(frozen=True)
+class LodPolicy:
+    # Rendered tile sizes in pixels below which the level of detail is reduced
+    drop_strokes_below: float = 3.0
+    straight_fills_below: float = 2.0
+    raster_below: float = 1.0
+
+    def level(self, tile_size: float, animate: bool = False) -> DetailLevel:
+        # NOTE: Rasters can not carry tile animations, so animated renders stop before them
+        if tile_size < self.raster_below and not animate:
+            return DetailLevel.raster
+        if tile_size < self.straight_fills_below:
+            return DetailLevel.straight_fills
+        if tile_size < self.drop_strokes_below:
+            return DetailLevel.no_strokes
+        return DetailLevel.full
+
+
+DEFAULT_LOD_POLICY = LodPolicy()
+FULL_DETAIL = LodPolicy(0.0, 0.0, 0.0)
+# Rasters whenever possible, e.g. for cheap previews
+RASTER_DETAIL = LodPolicy(math.inf, math.inf, math.inf)
@@ -1,6 +1,10 @@
 def parity(x: int) -> int:
+    if x >= 0:
+        return x.bit_count() & 1
+
+    # Halves towards zero like int(x / 2), without going through floats
     par = 0
     while x != 0 and x != -1:
         par ^= x & 1
-        x = int(x / 2)
+        x = -(-x // 2)
     return par
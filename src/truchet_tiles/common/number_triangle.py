@@ -1,3 +1,5 @@
+import threading
+from collections.abc import Callable
 from functools import cache
 
 
@@ -58,47 +60,81 @@ class NumberTriangle:
         return out
 
 
-@cache
-def get_pascal_triangle(height: int) -> NumberTriangle:
-    rows = [[1]]
-    for i in range(1, height):
-        row = [1]
-        for j in range(1, i):
-            row.append(rows[i - 1][j - 1] + rows[i - 1][j])
+# NOTE: Rows of these triangles only depend on the rows above them, so every triangle
+# is grown from the rows of the largest one of its kind computed so far
+_rows_lock = threading.Lock()
+_pascal_rows: list[list[int]] = []
+_hosoya_rows: list[list[int]] = []
+_baysal_rows: list[list[int]] = []
 
-        row.append(1)
-        rows.append(row)
 
-    return NumberTriangle(as_rows=rows)
+def _grow_rows(
+    rows: list[list[int]],
+    height: int,
+    next_row: Callable[[list[list[int]]], list[int]],
+) -> list[list[int]]:
+    with _rows_lock:
+        while len(rows) < height:
+            rows.append(next_row(rows))
 
+        return rows[:height]
 
-@cache
-def get_hosoya_triangle(height: int) -> NumberTriangle:
-    rows = [[1] * (i + 1) for i in range(height)]
 
-    for row in range(2, height):
-        edge_value = rows[row - 1][-1] + rows[row - 2][-1]
-        rows[row][-1] = edge_value
-        if row < height - 1:
-            rows[row + 1][-2] = edge_value
+def _next_pascal_row(rows: list[list[int]]) -> list[int]:
+    if not rows:
+        return [1]
+
+    above = rows[-1]
+    return [1, *(above[j - 1] + above[j] for j in range(1, len(above))), 1]
+
+
+def _next_hosoya_row(rows: list[list[int]]) -> list[int]:
+    i = len(rows)
+    if i < 2:
+        return [1] * (i + 1)
+
+    above, above2 = rows[-1], rows[-2]
+    return [
+        *(above[col] + above2[col] for col in range(i - 1)),
+        above[-1],
+        above[-1] + above2[-1],
+    ]
+
 
-    for col in range(height):
-        for row in range(col + 2, height):
-            rows[row][col] = rows[row - 1][col] + rows[row - 2][col]
+def _next_baysal_row(rows: list[list[int]]) -> list[int]:
+    i = len(rows)
+    if i < 2:
+        return [1] * (i + 1)
 
-    return NumberTriangle(as_rows=rows)
+    above = rows[-1]
+    row = [0, *(above[col - 1] + above[col] for col in range(1, i)), 0]
+    edge_value = above[0] + row[1]
+    row[0] = edge_value
+    row[-1] = edge_value
+    return row
+
+
+@cache
+def get_pascal_triangle(height: int) -> NumberTriangle:
+    return NumberTriangle(as_rows=_grow_rows(_pascal_rows, height, _next_pascal_row))
+
+
+@cache
+def get_hosoya_triangle(height: int) -> NumberTriangle:
+    return NumberTriangle(as_rows=_grow_rows(_hosoya_rows, height, _next_hosoya_row))
 
 
 @cache
 def get_baysal_triangle(height: int) -> NumberTriangle:
-    rows = [[1] * (i + 1) for i in range(height)]
+    return NumberTriangle(as_rows=_grow_rows(_baysal_rows, height, _next_baysal_row))
 
-    for row in range(2, height):
-        for col in range(1, row):
-            rows[row][col] = rows[row - 1][col - 1] + rows[row - 1][col]
 
-        edge_value = rows[row - 1][0] + rows[row][1]
-        rows[row][0] = edge_value
-        rows[row][-1] = edge_value
+def clear_number_triangles() -> None:
+    # Drops the triangles and the rows they are grown from
+    with _rows_lock:
+        for rows in (_pascal_rows, _hosoya_rows, _baysal_rows):
+            rows.clear()
 
-    return NumberTriangle(as_rows=rows)
+    get_pascal_triangle.cache_clear()
+    get_hosoya_triangle.cache_clear()
+    get_baysal_triangle.cache_clear()
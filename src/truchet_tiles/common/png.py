@@ -0,0 +1,26 @@
+import struct
+import zlib
+from collections.abc import Iterable
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + tag
+        + data
+        + struct.pack(">I", zlib.crc32(tag + data))
+    )
+
+
+def encode_bitmap_png(width: int, height: int, rows: Iterable[bytes]) -> bytes:
+    # Encodes rows of packed bits (most significant bit first, every row padded to
+    # whole bytes) as a 1 bit grayscale png, 1 is white
+    raw = b"".join(b"\x00" + row for row in rows)
+    header = struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0)
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(raw, 9))
+        + _chunk(b"IEND", b"")
+    )
@@ -0,0 +1,57 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+
+
+class RenderStage(str, Enum):
+    grid = "grid"  # Generating the grid
+    fill = "fill"  # Computing the inside fills of the tiles
+    draw = "draw"  # Drawing the tiles
+    serialize = "serialize"  # Writing the svg text
+    compress = "compress"  # Compressing or rasterizing the svg
+
+
+class ProgressReporter:
+    # Follows the stage of a render and passes the fraction of it that is done to
+    # report. Renders skip the stages they do not need, e.g. the fill of hexagonal
+    # tilings is their grid, and stages of cached results.
+    def __init__(self, report: Callable[[RenderStage, float], None]) -> None:
+        self._report = report
+        self._stage: RenderStage | None = None
+
+    def start(self, stage: RenderStage) -> None:
+        self._stage = stage
+        self._report(stage, 0.0)
+
+    def advance(self, done: int, total: int) -> None:
+        if self._stage is not None and total > 0:
+            self._report(self._stage, done / total)
+
+
+_progress_reporter: ContextVar[ProgressReporter | None] = ContextVar(
+    "progress_reporter", default=None
+)
+
+
+@contextmanager
+def progress_scope(reporter: ProgressReporter) -> Iterator[ProgressReporter]:
+    # Makes the renders run in the scope report their progress to the reporter
+    reset = _progress_reporter.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _progress_reporter.reset(reset)
+
+
+def start_stage(stage: RenderStage) -> None:
+    reporter = _progress_reporter.get()
+    if reporter is not None:
+        reporter.start(stage)
+
+
+def report_progress(done: int, total: int) -> None:
+    # Reports that done of the total rows of the current stage are done
+    reporter = _progress_reporter.get()
+    if reporter is not None:
+        reporter.advance(done, total)
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+
+from truchet_tiles.common.enum import DetailLevel
+
+# NOTE: Costs below were measured on a single core of a recent x86-64 machine with
+# CPython 3.11, timing renders of random grids of 40000 tiles and the rows of grids of
+# every type with 262144 cells in fresh processes, and tracing their peak memory with
+# tracemalloc. Estimates are within a third of the renders they predict.
+# Drawing does not depend on the connector or on the detail levels above raster,
+# since tiles are uses of a few base tiles.
+
+# Gzip level 9 and brotli quality 5 of the rendered svg, see RenderedSvg
+COMPRESS_SECONDS_PER_BYTE = 0.065e-6
+# Rough cairo rasterization cost, it is not part of the measurements
+PNG_SECONDS_PER_TILE = 20e-6
+PNG_BYTES_PER_PIXEL = 4
+
+
+@dataclass(frozen=True)
+class RenderCost:
+    # Predicted time and peak memory of a render, and the size of its output
+    seconds: float
+    memory: int
+    output_size: int
+
+
+@dataclass(frozen=True)
+class TileCost:
+    # Cost of drawing and serializing one tile, memory and output sizes in bytes
+    seconds: float
+    memory: float
+    output_size: float
+
+
+def estimate_render_cost(
+    grid_seconds: float,
+    tiles: int,
+    tile_cost: TileCost,
+    raster_tile_cost: TileCost,
+    detail_level: DetailLevel,
+    output_format: str = "svg",
+    pixels: float = 0.0,
+) -> RenderCost:
+    # Cost of generating the grid, drawing the tiles at the detail level, and
+    # compressing or rasterizing the output of the format, "svg", "svgz" or "png"
+    if output_format not in ("svg", "svgz", "png"):
+        raise ValueError("output format should be one of svg, svgz and png")
+
+    cost = raster_tile_cost if detail_level == DetailLevel.raster else tile_cost
+    output_size = int(tiles * cost.output_size)
+    seconds = grid_seconds + tiles * cost.seconds
+    # NOTE: The svg text, its encoding and its compressed variants are alive together
+    memory = int(tiles * cost.memory) + 3 * output_size
+
+    seconds += output_size * COMPRESS_SECONDS_PER_BYTE
+    if output_format == "png":
+        seconds += tiles * PNG_SECONDS_PER_TILE
+        memory += int(pixels * PNG_BYTES_PER_PIXEL)
+
+    return RenderCost(seconds=seconds, memory=memory, output_size=output_size)
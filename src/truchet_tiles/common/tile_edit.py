@@ -0,0 +1,47 @@
+from collections.abc import Iterable
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.tiling_data import TilingData
+
+
+class TilingEditor:
+    # Flips cells of a tiling and tells which tiles to redraw, without drawing it
+    # again. The inside fill of a cell only depends on its own value, it is the value
+    # flipped on every other cell of rectangular tilings and the value itself on
+    # hexagonal ones, so a flip changes the value and the fill of that cell only.
+    def __init__(self, data: TilingData) -> None:
+        # NOTE: Works on copies, the tiling data may be shared by a cache
+        self._grid = PackedGrid(data.grid.window, bytearray(data.grid.data))
+        if data.fill is data.grid:
+            self._fill = self._grid
+        else:
+            self._fill = PackedGrid(data.fill.window, bytearray(data.fill.data))
+
+        self._edge_length = data.edge_length
+        self._base_tiles = data.base_tiles
+
+    @property
+    def data(self) -> TilingData:
+        return TilingData(self._grid, self._fill, self._edge_length, self._base_tiles)
+
+    def base_tile(self, key: tuple[int, int]) -> str:
+        # Key of the base tile drawn at the cell, see TilingData
+        return f"{self._grid[key]}{self._fill[key]}"
+
+    def flip(self, key: tuple[int, int]) -> str:
+        # Flips the cell and returns the key of its new base tile
+        self._grid[key] = self._grid[key] ^ 1
+        if self._fill is not self._grid:
+            self._fill[key] = self._fill[key] ^ 1
+
+        return self.base_tile(key)
+
+    def flip_cells(self, keys: Iterable[tuple[int, int]]) -> dict[tuple[int, int], str]:
+        # Flips the cells and returns the new base tiles of the cells that changed,
+        # cells flipped an even number of times keep their tiles
+        flipped: set[tuple[int, int]] = set()
+        for key in keys:
+            flipped ^= {key}
+            self.flip(key)
+
+        return {key: self.base_tile(key) for key in flipped}
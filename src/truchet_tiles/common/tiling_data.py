@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+import drawsvg as dw  # type: ignore
+
+from truchet_tiles.common.grid import PackedGrid
+
+
+@dataclass(frozen=True)
+class TilingData:
+    # The cells of a tiling without their drawing, for clients that draw the tiles
+    # themselves. Both grids cover the window. base_tiles holds the svg of the base
+    # tile drawn for every cell value and inside fill, keyed as f"{value}{fill}".
+    grid: PackedGrid
+    fill: PackedGrid
+    edge_length: float
+    base_tiles: dict[str, str]
+
+
+def base_tile_svg(
+    tile: dw.Group, width: float, height: float, origin: str | tuple[float, float]
+) -> str:
+    drawing = dw.Drawing(width, height, origin=origin)
+    drawing.append(tile)
+    return drawing.as_svg()
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class GridWindow:
+    # Half open coordinate bounds of a rectangular sub-region of a grid.
+    # Rows and columns are (row, col) for rectangular grids and axial (q, r) for
+    # hexagonal grids, matching the keys of the grid dictionaries.
+    row_start: int
+    row_stop: int
+    col_start: int
+    col_stop: int
+
+    def __post_init__(self):
+        if self.row_start > self.row_stop or self.col_start > self.col_stop:
+            raise ValueError("window start should not be greater than its stop")
+
+    @classmethod
+    def square(cls, start: int, stop: int) -> "GridWindow":
+        return cls(start, stop, start, stop)
+
+    @property
+    def rows(self) -> range:
+        return range(self.row_start, self.row_stop)
+
+    @property
+    def cols(self) -> range:
+        return range(self.col_start, self.col_stop)
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        row, col = key
+        return (
+            self.row_start <= row < self.row_stop
+            and self.col_start <= col < self.col_stop
+        )
+
+    def intersect(self, other: "GridWindow") -> "GridWindow":
+        row_start = max(self.row_start, other.row_start)
+        col_start = max(self.col_start, other.col_start)
+        return GridWindow(
+            row_start,
+            max(row_start, min(self.row_stop, other.row_stop)),
+            col_start,
+            max(col_start, min(self.col_stop, other.col_stop)),
+        )
@@ -1,8 +1,15 @@
-from collections import defaultdict
+from functools import cached_property
+import math
 import drawsvg as dw  # type: ignore
 
+from truchet_tiles.common.cancel import check_cancelled
 from truchet_tiles.common.constants import ANIMATION_BEGIN, ANIMATION_DELAY
-from truchet_tiles.common.enum import SvgColors, Connector
+from truchet_tiles.common.enum import DetailLevel, SvgColors, Connector
+from truchet_tiles.common.grid import ConstantGrid, Grid, PackedGrid
+from truchet_tiles.common.lod import DEFAULT_LOD_POLICY, LodPolicy
+from truchet_tiles.common.png import encode_bitmap_png
+from truchet_tiles.common.progress import RenderStage, report_progress, start_stage
+from truchet_tiles.common.window import GridWindow
 from truchet_tiles.hexagonal.draw.enum import HexAnimationMethod, HexTop
 from truchet_tiles.hexagonal.draw.tile_generator import (
     create_inside_filled_curved_base_tile,
@@ -21,6 +28,63 @@ from truchet_tiles.hexagonal.hex_grid import (
 )
 
 
+# NOTE: A pointy top layout is the flat top one rotated by -30 degrees around the origin
+POINTY_TOP_ROTATION = -30
+
+
+def get_view_box(
+    dimension: int,
+    edge_length: float,
+    flat_top: bool = True,
+    window: GridWindow | None = None,
+) -> tuple[float, float, float, float]:
+    draw_size = 2 * (2 * dimension - 1) * edge_length
+    if window is None:
+        return (-draw_size / 2, -draw_size / 2, draw_size, draw_size)
+
+    window = window.intersect(GridWindow.square(-dimension + 1, dimension))
+    orientation = ORIENTATIONS[HexTop.flat]
+    angle = 0.0 if flat_top else math.radians(POINTY_TOP_ROTATION)
+    cos, sin = math.cos(angle), math.sin(angle)
+
+    def _rotated(x: float, y: float) -> tuple[float, float]:
+        return x * cos - y * sin, x * sin + y * cos
+
+    corner_offsets = [
+        _rotated(
+            edge_length * math.cos(math.pi * (orientation.start_angle - i) / 3),
+            edge_length * math.sin(math.pi * (orientation.start_angle - i) / 3),
+        )
+        for i in range(6)
+    ]
+    half_width = max(abs(x) for x, _ in corner_offsets)
+    half_height = max(abs(y) for _, y in corner_offsets)
+
+    # Centers are linear in (q, r), so the extremes of every window row are at the
+    # first and the last hex of the row that are inside the tiling
+    centers = []
+    for q in window.rows:
+        r_start = max(window.col_start, -dimension + 1 - q)
+        r_stop = min(window.col_stop, dimension - q)
+        for r in {r_start, r_stop - 1} if r_start < r_stop else ():
+            centers.append(
+                _rotated(
+                    (orientation.f0 * q + orientation.f1 * r) * edge_length,
+                    (orientation.f2 * q + orientation.f3 * r) * edge_length,
+                )
+            )
+
+    if not centers:
+        return (0.0, 0.0, 0.0, 0.0)
+
+    x_min = min(x for x, _ in centers) - half_width
+    y_min = min(y for _, y in centers) - half_height
+    x_max = max(x for x, _ in centers) + half_width
+    y_max = max(y for _, y in centers) + half_height
+
+    return (x_min, y_min, x_max - x_min, y_max - y_min)
+
+
 class HexTilingDrawer:
     tile_function_map = {
         (Connector.curved, 0): create_outside_filled_curved_base_tile,
@@ -34,7 +98,7 @@ class HexTilingDrawer:
     def __init__(
         self,
         dimension: int,
-        grid: defaultdict[tuple[int, int], int],
+        grid: Grid,
         edge_length: float,
         flat_top: bool = False,
         connector: str = "twoline",
@@ -49,6 +113,8 @@ class HexTilingDrawer:
         bg_color: str = SvgColors.WHITE,
         fill_color: str = SvgColors.BLACK,
         grid_color: str = SvgColors.RED,
+        window: GridWindow | None = None,
+        lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
     ) -> None:
         assert dimension > 0, "dimension must be positive"
         self._dimension = dimension
@@ -56,10 +122,14 @@ class HexTilingDrawer:
         self._edge_length = edge_length
         self._draw_size = 2 * (2 * self._dimension - 1) * self._edge_length
 
-        self._orientation_name = HexTop.flat if flat_top else HexTop.pointy
+        # Tiles are always laid out flat top, pointy top is a rotation of the root group
+        self._hex_top = HexTop.flat if flat_top else HexTop.pointy
+        self._orientation_name = HexTop.flat
         self._orientation = ORIENTATIONS[self._orientation_name]
         self._grid = grid
-        self._hex_grid = self._calculate_hex_grid()
+        # NOTE: Only the hexes inside the axial window are drawn, the view box is cropped to them
+        self._window = window
+        self._view_box = get_view_box(dimension, edge_length, flat_top, window)
 
         self._line_width = line_width
 
@@ -79,14 +149,17 @@ class HexTilingDrawer:
 
         self._animate = animate
         self._animation_method = HexAnimationMethod(animation_method)
-        self._animation_prev_grid = {
-            key: 0 for key in grid
-        }  # TODO: Add hex grid version.
+        self._animation_prev_grid: Grid = ConstantGrid(0)
         self._animation_duration = animation_duration
 
+        # Neighbouring tile centers are sqrt(3) edge lengths apart
+        self._detail_level = lod_policy.level(
+            math.sqrt(3) * self._edge_length, self._animate
+        )
+
         self._svg = dw.Drawing(
-            self._draw_size,
-            self._draw_size,
+            self._view_box[2],
+            self._view_box[3],
             origin=(0, 0),
             id_prefix="hex_truchet_tiling",
         )
@@ -94,6 +167,20 @@ class HexTilingDrawer:
             id="truchet_group", fill="none"
         )  # To handle translations
 
+    @property
+    def _drawn_window(self) -> GridWindow:
+        # The axial window of the hexes that are drawn
+        full_window = GridWindow.square(-self._dimension + 1, self._dimension)
+        if self._window is None:
+            return full_window
+
+        return full_window.intersect(self._window)
+
+    @cached_property
+    def _hex_grid(self) -> HexGrid:
+        # NOTE: Computed on first use, rasters do not need the tile geometry
+        return self._calculate_hex_grid()
+
     def _calculate_hex_grid(self) -> HexGrid:
         layout = Layout(
             orientation=self._orientation,
@@ -101,7 +188,12 @@ class HexTilingDrawer:
             origin=Point(0, 0),
         )
 
-        return HexGrid(dimension=self._dimension, hex_grid=self._grid, layout=layout)
+        return HexGrid(
+            dimension=self._dimension,
+            hex_grid=self._grid,
+            layout=layout,
+            window=self._window,
+        )
 
     @property
     def svg(self):
@@ -109,36 +201,51 @@ class HexTilingDrawer:
 
     def draw(self):
         self._clear_screan()
-        self._draw()
 
-        if self._show_grid_lines:
-            self._draw_grid_lines()
+        if self._detail_level == DetailLevel.raster:
+            # NOTE: Grid lines are not drawn on rasters, they would cover the tiles
+            self._draw_raster()
+        else:
+            self._draw()
+
+            if self._show_grid_lines:
+                self._draw_grid_lines()
 
+        # NOTE: Last chance to stop before the svg is serialized
+        check_cancelled()
         self._update_svg()
 
     def _clear_screan(self):
         self._svg.clear()
         self._svg = dw.Drawing(
-            self._draw_size, self._draw_size, id_prefix="truchet_tiling"
+            self._view_box[2], self._view_box[3], id_prefix="truchet_tiling"
         )
         self._svg_top_group = dw.Group(id="truchet_group", fill="none")
 
     def _update_svg(self):
-        self._svg.view_box = (
-            -self._draw_size / 2,
-            -self._draw_size / 2,
-            self._draw_size,
-            self._draw_size,
-        )
+        self._svg.view_box = self._view_box
+
+        kwargs = {}
+        if self._hex_top == HexTop.pointy:
+            kwargs["transform"] = f"rotate({POINTY_TOP_ROTATION})"
 
         self._svg.set_render_size()
-        self._svg.append(dw.Use(self._svg_top_group, 0, 0))
+        self._svg.append(dw.Use(self._svg_top_group, 0, 0, **kwargs))
 
     def _draw(self):
         anim_start = ANIMATION_BEGIN
         hex_index = 0
+        q = None
 
+        start_stage(RenderStage.draw)
+        rows = self._drawn_window.rows
         for hex_, hex_data in self._hex_grid.items():
+            # NOTE: Hexes come q by q, so this checks once per row of the grid
+            if hex_.q != q:
+                check_cancelled()
+                q = hex_.q
+                report_progress(q - rows.start, len(rows))
+
             coord = (hex_.q, hex_.r)
             animate = self._animate and (
                 self._animation_prev_grid[coord] != self._grid[coord]
@@ -181,11 +288,88 @@ class HexTilingDrawer:
             _get_rotation(anim_start, self._animation_duration, 60, 120)
         )
 
+    def _draw_raster(self):
+        qs, rs = self._drawn_window.rows, self._drawn_window.cols
+        if not qs or not rs:
+            return
+
+        start_stage(RenderStage.draw)
+
+        def _inside(q: int, r: int) -> bool:
+            return -self._dimension < q + r < self._dimension
+
+        # Image columns run along q and image rows along r
+        image_window = GridWindow(rs.start, rs.stop, qs.start, qs.stop)
+        inside = PackedGrid.from_function(lambda r, q: int(_inside(q, r)), image_window)
+        filled = PackedGrid.from_function(
+            lambda r, q: int(_inside(q, r) and self._grid[(q, r)] == 1), image_window
+        )
+        inside_bitmap = encode_bitmap_png(
+            len(qs), len(rs), (inside.row_bytes(r) for r in rs)
+        )
+        filled_bitmap = encode_bitmap_png(
+            len(qs), len(rs), (filled.row_bytes(r) for r in rs)
+        )
+
+        # Maps the center of pixel (q, r) to the center of hex (q, r)
+        M = self._orientation
+        a, b = M.f0 * self._edge_length, M.f2 * self._edge_length
+        c, d = M.f1 * self._edge_length, M.f3 * self._edge_length
+        e = a * (qs.start - 0.5) + c * (rs.start - 0.5)
+        f = b * (qs.start - 0.5) + d * (rs.start - 0.5)
+        transform = f"matrix({a} {b} {c} {d} {e} {f})"
+
+        corners = [
+            (a * u + c * v + e, b * u + d * v + f)
+            for u in (0, len(qs))
+            for v in (0, len(rs))
+        ]
+        x_min = min(x for x, _ in corners)
+        y_min = min(y for _, y in corners)
+        width = max(x for x, _ in corners) - x_min
+        height = max(y for _, y in corners) - y_min
+
+        # The bitmaps are masks of the background and fill colors
+        for bitmap, color in (
+            (inside_bitmap, self._bg_color),
+            (filled_bitmap, self._fill_color),
+        ):
+            mask = dw.Mask()
+            mask.append(
+                dw.Image(
+                    0,
+                    0,
+                    len(qs),
+                    len(rs),
+                    data=bitmap,
+                    mime_type="image/png",
+                    transform=transform,
+                    style="image-rendering:pixelated",
+                )
+            )
+            self._svg_top_group.append(
+                dw.Rectangle(x_min, y_min, width, height, fill=color, mask=mask)
+            )
+
+    def base_tiles(self) -> dict[int, dw.Group]:
+        # Unanimated base tile of every hex value, which is also its inside fill
+        return {
+            value: self._get_base_tile(value, ANIMATION_BEGIN, False)
+            for value in (0, 1)
+        }
+
     def _get_tile(self, hex_data: HexGridData, anim_start: float, animate: bool):
-        connector = self._connector if hex_data.value == 0 else self._hybrid_connector
-        func = self.tile_function_map[(connector, hex_data.value)]
+        base_tile = self._get_base_tile(hex_data.value, anim_start, animate)
+        return dw.Use(base_tile, hex_data.center.x, hex_data.center.y)
 
-        base_tile = func(
+    def _get_base_tile(self, value: int, anim_start: float, animate: bool) -> dw.Group:
+        if self._detail_level == DetailLevel.straight_fills:
+            connector = Connector.line
+        else:
+            connector = self._connector if value == 0 else self._hybrid_connector
+        func = self.tile_function_map[(connector, value)]
+
+        return func(
             self._edge_length,
             self._orientation_name,
             self._line_width,
@@ -195,8 +379,8 @@ class HexTilingDrawer:
             animate,
             anim_start,
             self._animation_duration,
+            self._detail_level == DetailLevel.full,
         )
-        return dw.Use(base_tile, hex_data.center.x, hex_data.center.y)
 
     def _draw_grid_lines(self):
         for hex_data in self._hex_grid.values():
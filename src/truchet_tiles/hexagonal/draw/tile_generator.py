@@ -149,6 +149,7 @@ def create_outside_filled_line_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     hex_geometry = _get_hex_geometry(hex_top, edge_length)
     lines = _get_lines(0, hex_geometry, line_width, line_color)
@@ -178,8 +179,9 @@ def create_outside_filled_line_base_tile(
     ofl.append(bg_hexagon)
     for i in range(3):
         ofl.append(triangles[i])
-    for i in range(3):
-        ofl.append(lines[i])
+    if strokes:
+        for i in range(3):
+            ofl.append(lines[i])
 
     return ofl
 
@@ -195,6 +197,7 @@ def create_inside_filled_line_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     hex_geometry = _get_hex_geometry(hex_top, edge_length)
     lines = _get_lines(1, hex_geometry, line_width, line_color)
@@ -222,8 +225,9 @@ def create_inside_filled_line_base_tile(
 
     ifl.append(bg_hexagon)
     ifl.append(polygon)
-    for i in range(3):
-        ifl.append(lines[i])
+    if strokes:
+        for i in range(3):
+            ifl.append(lines[i])
 
     return ifl
 
@@ -239,6 +243,7 @@ def create_outside_filled_curved_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     hex_geometry = _get_hex_geometry(hex_top, edge_length)
 
@@ -275,8 +280,9 @@ def create_outside_filled_curved_base_tile(
     ofc.append(bg_hexagon)
     for i in range(3):
         ofc.append(pies[i])
-    for i in range(3):
-        ofc.append(arcs[i])
+    if strokes:
+        for i in range(3):
+            ofc.append(arcs[i])
 
     return ofc
 
@@ -292,6 +298,7 @@ def create_inside_filled_curved_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     hex_geometry = _get_hex_geometry(hex_top, edge_length)
 
@@ -327,8 +334,9 @@ def create_inside_filled_curved_base_tile(
     ifc.append(bg_hexagon)
     for i in range(3):
         ifc.append(pies[i])
-    for i in range(3):
-        ifc.append(arcs[i])
+    if strokes:
+        for i in range(3):
+            ifc.append(arcs[i])
 
     return ifc
 
@@ -344,6 +352,7 @@ def create_outside_filled_twoline_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     hex_geometry = _get_hex_geometry(hex_top, edge_length)
 
@@ -377,8 +386,9 @@ def create_outside_filled_twoline_base_tile(
     oft.append(bg_hexagon)
     for i in range(3):
         oft.append(parallelograms[i])
-    for i in range(3):
-        oft.append(twolines[i])
+    if strokes:
+        for i in range(3):
+            oft.append(twolines[i])
 
     return oft
 
@@ -394,6 +404,7 @@ def create_inside_filled_twoline_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     hex_geometry = _get_hex_geometry(hex_top, edge_length)
 
@@ -421,7 +432,8 @@ def create_inside_filled_twoline_base_tile(
     ift = dw.Group(fill="none")
     ift.append(bg_hexagon)
     ift.append(polygon)
-    for i in range(3):
-        ift.append(twolines[i])
+    if strokes:
+        for i in range(3):
+            ift.append(twolines[i])
 
     return ift
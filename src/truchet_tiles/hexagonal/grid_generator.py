@@ -1,10 +1,20 @@
-from collections import defaultdict
 from enum import Enum
-from functools import cache
-from random import randint
+from functools import lru_cache
+from random import Random
 from typing import Callable
 
+from truchet_tiles.common.counter_random import counter_random_row
+from truchet_tiles.common.grid import (
+    ConstantGrid,
+    FunctionalGrid,
+    Grid,
+    PackedGrid,
+    reusing_row_function,
+    row_bits,
+)
+from truchet_tiles.common.grid_cache import get_or_create_cached_grid
 from truchet_tiles.common.math import parity
+from truchet_tiles.common.window import GridWindow
 
 
 class HexGridType(str, Enum):
@@ -17,10 +27,29 @@ class HexGridType(str, Enum):
     XONESCOMPQR = "xonescompqr"  # Like xonescomp, but only q and r coordinates are used
     XTWOSCOMPQR = "xtwoscompqr"  # Like xtwoscomp, but only q and r coordinates are used
     RANDOM = "random"
+    HASHRANDOM = "hashrandom"  # Like random, but every hex is a hash of seed and (q, r)
     ZEROS = "zeros"
     ONES = "ones"
 
 
+# Grids that depend on the random seed
+SEEDED_GRID_TYPES = frozenset({HexGridType.RANDOM, HexGridType.HASHRANDOM})
+
+# Seconds to generate a cell of every grid type, see truchet_tiles.common.render_cost
+GRID_SECONDS_PER_CELL = {
+    HexGridType.XSIGNMAG: 0.6e-6,
+    HexGridType.XONESCOMP: 0.79e-6,
+    HexGridType.XTWOSCOMP: 0.73e-6,
+    HexGridType.XSIGNMAGQR: 0.44e-6,
+    HexGridType.XONESCOMPQR: 0.61e-6,
+    HexGridType.XTWOSCOMPQR: 0.5e-6,
+    HexGridType.RANDOM: 0.017e-6,
+    HexGridType.HASHRANDOM: 0.024e-6,
+    HexGridType.ZEROS: 0.001e-6,
+    HexGridType.ONES: 0.001e-6,
+}
+
+
 def parity_if_positive(func: Callable) -> Callable:
     def decorated(x: int):
         return parity(x) if x >= 0 else func(x)
@@ -43,10 +72,45 @@ def tc_parity(x: int) -> int:  # parity for twos copmlement (tc) form
     return parity(-x + 1)
 
 
-@cache
 def get_hex_grid(
-    grid_dimension: int, grid_type: str
-) -> defaultdict[tuple[int, int], int]:
+    grid_dimension: int,
+    grid_type: str,
+    window: GridWindow | None = None,
+    rand_seed: int = 0,
+) -> Grid:
+    # NOTE: When a window is given, only the hexes inside its axial box are evaluated.
+    # rand_seed only affects RANDOM grids, others are shared between seeds.
+    if grid_type not in SEEDED_GRID_TYPES:
+        rand_seed = 0
+
+    return _get_hex_grid(grid_dimension, grid_type, window, rand_seed)
+
+
+def _hexagon_row_mask(grid_dimension: int, q: int, cols: range) -> int:
+    # Bits of the hexes of row q inside the hexagon, in the layout of row_bits
+    start = max(cols.start, -grid_dimension + 1 - q)
+    stop = min(cols.stop, grid_dimension - q)
+    if start >= stop:
+        return 0
+
+    return ((1 << (stop - start)) - 1) << (cols.stop - stop)
+
+
+# NOTE: Grids are cached by window and seed too, so the cache is bounded to keep
+# servers from keeping a grid for every viewport and seed they are asked for
+GRID_CACHE_SIZE = 64
+
+# The last full grid built for every grid type, with its dimension
+_last_full_grids: dict[str, tuple[int, Grid]] = {}
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def _get_hex_grid(
+    grid_dimension: int, grid_type: str, window: GridWindow | None, rand_seed: int
+) -> Grid:
+    full_window = GridWindow.square(-grid_dimension + 1, grid_dimension)
+    window = full_window if window is None else full_window.intersect(window)
+
     match grid_type:
         case HexGridType.XSIGNMAG:
             grid_func = lambda q, r: sm_parity(q) ^ sm_parity(r) ^ sm_parity(-q - r)  # noqa: E731
@@ -64,15 +128,91 @@ def get_hex_grid(
             grid_func = lambda q, r: 0  # noqa: E731
         case HexGridType.ONES:
             grid_func = lambda q, r: 1  # noqa: E731
+        case HexGridType.HASHRANDOM:
+            # NOTE: Rows are hashed on demand, no matter how large the grid or where
+            # the window is
+            return FunctionalGrid.from_row_function(
+                lambda q, cols: (
+                    counter_random_row(rand_seed, q, cols)
+                    & _hexagon_row_mask(grid_dimension, q, cols)
+                ),
+                window,
+            )
         case _:
-            grid_func = lambda q, r: randint(0, 1)  # noqa: E731
-
-    return defaultdict(
-        int,
-        (
-            ((q, r), grid_func(q, r))
-            for q in range(-grid_dimension + 1, grid_dimension)
-            for r in range(-grid_dimension + 1, grid_dimension)
-            if -grid_dimension < (q + r) < grid_dimension
-        ),
+            # NOTE: Random bits come from a generator of this call, so concurrent renders
+            # neither share nor reseed the global random state. Windows are cut from the
+            # bits of the full grid, so they show the cells of the full tiling.
+            if window != full_window:
+                return PackedGrid.from_grid(
+                    _get_hex_grid(grid_dimension, grid_type, None, rand_seed), window
+                )
+            random_grid = PackedGrid.from_random(full_window, Random(rand_seed))
+            return PackedGrid.from_row_bits(
+                full_window,
+                (
+                    row_bits(random_grid, q, full_window.cols)
+                    & _hexagon_row_mask(grid_dimension, q, full_window.cols)
+                    for q in full_window.rows
+                ),
+            )
+
+    # NOTE: Each grid type uses the cheapest backend. Constant grids store nothing and
+    # closed form grids are evaluated lazily.
+    if grid_type in (HexGridType.ZEROS, HexGridType.ONES):
+        return ConstantGrid(grid_func(0, 0))
+
+    def _hexagon_func(q: int, r: int) -> int:
+        return grid_func(q, r) if -grid_dimension < (q + r) < grid_dimension else 0
+
+    row_func = _growing_row_function(grid_dimension, grid_type, window, _hexagon_func)
+
+    # NOTE: With a shared store or disk cache, the grid is computed once for all processes
+    key = ("hex", HexGridType(grid_type).value, grid_dimension, window)
+    grid = get_or_create_cached_grid(
+        key, lambda: PackedGrid.from_row_function(row_func, window)
     )
+    if grid is None:
+        grid = FunctionalGrid.from_row_function(row_func, window)
+
+    if window == full_window:
+        _last_full_grids[grid_type] = (grid_dimension, grid)
+
+    return grid
+
+
+def clear_grid_caches() -> None:
+    # Drops the grids kept in memory, e.g. after rendering a tiling that is rarely
+    # asked for again
+    _get_hex_grid.cache_clear()
+    _last_full_grids.clear()
+
+
+def _growing_row_function(
+    grid_dimension: int,
+    grid_type: str,
+    window: GridWindow,
+    grid_func: Callable[[int, int], int],
+) -> Callable[[int, range], int]:
+    # NOTE: Full grids of the same type but another dimension share the hexes of the
+    # smaller hexagon. Those are copied from the last full grid, so changing the
+    # dimension only computes the hexes that are new.
+    last = _last_full_grids.get(grid_type)
+    if last is None or window != GridWindow.square(-grid_dimension + 1, grid_dimension):
+        return reusing_row_function(grid_func)
+
+    # NOTE: Lazy grids are copied into packed bits first. Reading from them would keep
+    # every grid they grew from alive, a chain as long as the dimension changes.
+    last_dimension, last_grid = last
+    shared = min(last_dimension, grid_dimension)
+    if not isinstance(last_grid, PackedGrid):
+        last_grid = PackedGrid.from_grid(
+            last_grid, GridWindow.square(-shared + 1, shared)
+        )
+
+    def _known_cols(q: int) -> range:
+        if not -shared < q < shared:
+            return range(0)
+
+        return range(max(-shared + 1, -shared + 1 - q), min(shared, shared - q))
+
+    return reusing_row_function(grid_func, last_grid, _known_cols)
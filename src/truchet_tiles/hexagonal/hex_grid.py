@@ -1,9 +1,11 @@
 # NOTE: Adapted from: https://www.redblobgames.com/grids/hexagons/
 
-from collections import defaultdict
 from dataclasses import dataclass
 import math
 
+from truchet_tiles.common.cancel import check_cancelled
+from truchet_tiles.common.grid import Grid
+from truchet_tiles.common.window import GridWindow
 from truchet_tiles.hexagonal.draw.enum import HexTop
 
 
@@ -129,10 +131,13 @@ class HexGrid(dict):
     def __init__(
         self,
         dimension: int,
-        hex_grid: defaultdict[tuple[int, int], int],
+        hex_grid: Grid,
         layout: Layout,
+        window: GridWindow | None = None,
     ) -> None:
         self._dimension = dimension
+        full_window = GridWindow.square(-dimension + 1, dimension)
+        self._window = full_window if window is None else full_window.intersect(window)
         self._hex_grid: dict[Hex, HexGridData] = {}
         self._layout = layout
         self._calculate_hex_grid(hex_grid)
@@ -149,9 +154,10 @@ class HexGrid(dict):
     def items(self):
         return self._hex_grid.items()
 
-    def _calculate_hex_grid(self, hex_grid: dict[tuple[int, int], int]):
-        for q in range(-self._dimension + 1, self._dimension):
-            for r in range(-self._dimension + 1, self._dimension):
+    def _calculate_hex_grid(self, hex_grid: Grid):
+        for q in self._window.rows:
+            check_cancelled()
+            for r in self._window.cols:
                 if -self._dimension < (q + r) < self._dimension:
                     s = -q - r
                     hex_ = Hex(q, r, s)
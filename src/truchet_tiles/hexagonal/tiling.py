@@ -1,13 +1,43 @@
-import random
+import math
+import re
 
-from functools import cache
+from functools import lru_cache
 
 from truchet_tiles.common.enum import SvgColors
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.lod import DEFAULT_LOD_POLICY, LodPolicy
+from truchet_tiles.common.progress import RenderStage, start_stage
+from truchet_tiles.common.render_cost import RenderCost, TileCost, estimate_render_cost
+from truchet_tiles.common.tiling_data import TilingData, base_tile_svg
+from truchet_tiles.common.window import GridWindow
 from truchet_tiles.hexagonal.draw import HexTilingDrawer
-from truchet_tiles.hexagonal.grid_generator import HexGridType, get_hex_grid
+from truchet_tiles.hexagonal.draw.draw import POINTY_TOP_ROTATION, get_view_box
+from truchet_tiles.hexagonal.draw.enum import HexAnimationMethod
+from truchet_tiles.hexagonal.grid_generator import (
+    GRID_SECONDS_PER_CELL,
+    HexGridType,
+    get_hex_grid,
+)
+
+# Cost of a tile by animation method, see truchet_tiles.common.render_cost. Tiles of
+# animated renders carry their animations, which is most of their cost.
+_TILE_COSTS = {
+    None: TileCost(seconds=80e-6, memory=3240, output_size=72),
+    "at_once": TileCost(seconds=130e-6, memory=4500, output_size=238),
+    "by_ring": TileCost(seconds=116e-6, memory=4500, output_size=238),
+    "by_tile": TileCost(seconds=455e-6, memory=12240, output_size=892),
+}
+_RASTER_TILE_COST = TileCost(seconds=2.7e-6, memory=11, output_size=0.2)
+
+# NOTE: Tiling data is cached by window, seed and colors too, so the cache is bounded
+# to keep servers from keeping the data of every tiling they are asked for
+TILING_DATA_CACHE_SIZE = 64
+
+# NOTE: Rendered svgs are large and the web UI keeps them in its own render cache,
+# bounded by bytes, so only the last few of them are cached here
+TILING_CACHE_SIZE = 8
 
 
-@cache
 def get_hexagonal_tiling(
     function: str = "XSIGNMAG",
     flat_top: bool = True,
@@ -26,12 +56,200 @@ def get_hexagonal_tiling(
     bg_color: str = SvgColors.WHITE,
     fill_color: str = SvgColors.BLACK,
     grid_color: str = SvgColors.RED,
+    window: GridWindow | None = None,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
 ) -> str | None:
+    # NOTE: Orientation does not take part in the render, toggling it only wraps the
+    # cached flat top svg into a rotated group
+    svg_text = _get_flat_top_hexagonal_tiling(
+        function=function,
+        connector=connector,
+        hybrid_connector=hybrid_connector,
+        animate=animate,
+        animation_method=animation_method,
+        show_grid=show_grid,
+        line_width=line_width,
+        dimension=dimension,
+        edge_length=edge_length,
+        animation_duration=animation_duration,
+        rand_seed=rand_seed,
+        grid_line_width=grid_line_width,
+        line_color=line_color,
+        bg_color=bg_color,
+        fill_color=fill_color,
+        grid_color=grid_color,
+        window=window,
+        lod_policy=lod_policy,
+    )
+
+    if flat_top:
+        return svg_text
+
+    view_box = get_view_box(dimension, edge_length, flat_top, window)
+    return _rotate_svg(svg_text, POINTY_TOP_ROTATION, view_box)
+
+
+def _rotate_svg(
+    svg_text: str, degrees: float, view_box: tuple[float, float, float, float]
+) -> str:
+    # Wraps everything inside the root svg element into a group rotated around the
+    # origin, and replaces the size and the view box of the root element
+    content_start = svg_text.index(">", svg_text.index("<svg")) + 1
+    content_end = svg_text.rindex("</svg>")
+
+    svg_start = svg_text[:content_start]
+    svg_start = re.sub(r' width="[^"]*"', f' width="{view_box[2]}"', svg_start, 1)
+    svg_start = re.sub(r' height="[^"]*"', f' height="{view_box[3]}"', svg_start, 1)
+    svg_start = re.sub(
+        r' viewBox="[^"]*"',
+        f' viewBox="{" ".join(map(str, view_box))}"',
+        svg_start,
+        1,
+    )
+
+    return (
+        f'{svg_start}\n<g transform="rotate({degrees})">'
+        f"{svg_text[content_start:content_end]}</g>\n{svg_text[content_end:]}"
+    )
+
+
+@lru_cache(maxsize=TILING_CACHE_SIZE)
+def _get_flat_top_hexagonal_tiling(
+    function: str,
+    connector: str,
+    hybrid_connector: str | None,
+    animate: bool,
+    animation_method: str,
+    show_grid: bool,
+    line_width: int,
+    dimension: int,
+    edge_length: float,
+    animation_duration: float,
+    rand_seed: int,
+    grid_line_width: float,
+    line_color: str,
+    bg_color: str,
+    fill_color: str,
+    grid_color: str,
+    window: GridWindow | None,
+    lod_policy: LodPolicy,
+) -> str:
     # NOTE: Use rand_seed to control when to create new tiling in random mode
     # Pass the same rand_seed to update visual settings of the existing random tiling
-    random.seed(rand_seed)
+    start_stage(RenderStage.grid)
+    grid = get_hex_grid(dimension, HexGridType(function.lower()), window, rand_seed)
+
+    drawer = HexTilingDrawer(
+        dimension=dimension,
+        grid=grid,
+        edge_length=edge_length,
+        flat_top=True,
+        connector=connector,
+        hybrid_connector=hybrid_connector,
+        animate=animate,
+        animation_method=animation_method,
+        animation_duration=animation_duration,
+        show_grid=show_grid,
+        line_width=line_width,
+        grid_line_width=grid_line_width,
+        line_color=line_color,
+        bg_color=bg_color,
+        fill_color=fill_color,
+        grid_color=grid_color,
+        window=window,
+        lod_policy=lod_policy,
+    )
+
+    drawer.draw()
+    start_stage(RenderStage.serialize)
+    return drawer.svg.as_svg()
 
-    grid = get_hex_grid(dimension, HexGridType(function.lower()))
+
+@lru_cache(maxsize=TILING_DATA_CACHE_SIZE)
+def get_hexagonal_tiling_data(
+    function: str = "XSIGNMAG",
+    connector: str = "twoline",
+    hybrid_connector: str | None = None,
+    line_width: int = 1,
+    dimension: int = 8,
+    edge_length: float = 32,
+    rand_seed: int = 0,
+    line_color: str = SvgColors.BLACK,
+    bg_color: str = SvgColors.WHITE,
+    fill_color: str = SvgColors.BLACK,
+    window: GridWindow | None = None,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+) -> TilingData:
+    # The grid, the inside fills and the base tiles of a tiling, without drawing it.
+    # The grids cover the axial box of the window, hexes with |q + r| >= dimension are
+    # outside the tiling. The tile of (q, r) is centered at the flat top layout center
+    # (sqrt(3) * (q + r / 2), 1.5 * r) * edge_length, pointy top tilings are rotated
+    # by POINTY_TOP_ROTATION degrees around the origin.
+    full_window = GridWindow.square(-dimension + 1, dimension)
+    window = full_window if window is None else full_window.intersect(window)
+    grid = get_hex_grid(dimension, HexGridType(function.lower()), window, rand_seed)
+
+    drawer = HexTilingDrawer(
+        dimension=dimension,
+        grid=grid,
+        edge_length=edge_length,
+        flat_top=True,
+        connector=connector,
+        hybrid_connector=hybrid_connector,
+        line_width=line_width,
+        line_color=line_color,
+        bg_color=bg_color,
+        fill_color=fill_color,
+        window=window,
+        lod_policy=lod_policy,
+    )
+
+    # NOTE: The inside of a hex is filled when its value is 1
+    packed_grid = PackedGrid.from_grid(grid, window)
+    return TilingData(
+        grid=packed_grid,
+        fill=packed_grid,
+        edge_length=edge_length,
+        base_tiles={
+            f"{value}{value}": base_tile_svg(
+                tile, math.sqrt(3) * edge_length, 2 * edge_length, "center"
+            )
+            for value, tile in drawer.base_tiles().items()
+        },
+    )
+
+
+def get_hexagonal_tiling_from_grid(
+    grid: PackedGrid,
+    flat_top: bool = True,
+    connector: str = "twoline",
+    hybrid_connector: str | None = None,
+    animate: bool = False,
+    animation_method: str = "at_once",
+    show_grid: bool = False,
+    line_width: int = 1,
+    edge_length: float = 32,
+    animation_duration: float = 1.0,
+    grid_line_width: float = 0.5,
+    line_color: str = SvgColors.BLACK,
+    bg_color: str = SvgColors.WHITE,
+    fill_color: str = SvgColors.BLACK,
+    grid_color: str = SvgColors.RED,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+) -> str | None:
+    # The tiling of a user given grid, e.g. one of truchet_tiles.common.grid_formats.
+    # The grid is the axial box of the tiling, a square of odd side 2 * dimension - 1
+    # starting at (0, 0), whose cells with |q + r| >= dimension are not drawn.
+    # NOTE: Not cached, grids are neither hashable nor likely to repeat
+    rows, cols = len(grid.window.rows), len(grid.window.cols)
+    if rows != cols or rows % 2 == 0:
+        raise ValueError(
+            f"hexagonal grids should be square with an odd side, not {cols}x{rows}"
+        )
+
+    # NOTE: Shares the data, only moves the center of the grid to (0, 0)
+    dimension = (rows + 1) // 2
+    grid = PackedGrid(GridWindow.square(-dimension + 1, dimension), grid.data)
 
     drawer = HexTilingDrawer(
         dimension=dimension,
@@ -50,7 +268,72 @@ def get_hexagonal_tiling(
         bg_color=bg_color,
         fill_color=fill_color,
         grid_color=grid_color,
+        lod_policy=lod_policy,
     )
 
     drawer.draw()
+    start_stage(RenderStage.serialize)
     return drawer.svg.as_svg()
+
+
+def estimate_hexagonal_tiling_cost(
+    function: str = "XSIGNMAG",
+    flat_top: bool = True,
+    animate: bool = False,
+    animation_method: str = "at_once",
+    dimension: int = 8,
+    edge_length: float = 32,
+    window: GridWindow | None = None,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+    output_format: str = "svg",
+) -> RenderCost:
+    # Predicted cost of get_hexagonal_tiling with the same arguments, without
+    # rendering anything. Raises ValueError for unknown grid types.
+    grid_type = HexGridType(function.lower())
+    full_window = GridWindow.square(-dimension + 1, dimension)
+    window = full_window if window is None else full_window.intersect(window)
+    # NOTE: Grids cover the axial box of the window, tiles only its hexes
+    cells = len(window.rows) * len(window.cols)
+    tiles = min(cells, 3 * dimension * (dimension - 1) + 1)
+
+    _, _, width, height = get_view_box(dimension, edge_length, flat_top, window)
+    return estimate_render_cost(
+        grid_seconds=cells * GRID_SECONDS_PER_CELL[grid_type],
+        tiles=tiles,
+        tile_cost=_TILE_COSTS[
+            HexAnimationMethod(animation_method) if animate else None
+        ],
+        raster_tile_cost=_RASTER_TILE_COST,
+        detail_level=lod_policy.level(math.sqrt(3) * edge_length, animate),
+        output_format=output_format,
+        pixels=width * height,
+    )
+
+
+def estimate_hexagonal_tiling_from_grid_cost(
+    grid: PackedGrid,
+    flat_top: bool = True,
+    animate: bool = False,
+    animation_method: str = "at_once",
+    edge_length: float = 32,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+    output_format: str = "svg",
+) -> RenderCost:
+    # Predicted cost of get_hexagonal_tiling_from_grid with the same arguments. The
+    # grid is given, so only drawing it costs.
+    rows, cols = len(grid.window.rows), len(grid.window.cols)
+    dimension = (max(rows, cols) + 1) // 2
+    tiles = min(rows * cols, 3 * dimension * (dimension - 1) + 1)
+
+    _, _, width, height = get_view_box(dimension, edge_length, flat_top)
+    return estimate_render_cost(
+        grid_seconds=0.0,
+        tiles=tiles,
+        tile_cost=_TILE_COSTS[
+            HexAnimationMethod(animation_method) if animate else None
+        ],
+        raster_tile_cost=_RASTER_TILE_COST,
+        detail_level=lod_policy.level(math.sqrt(3) * edge_length, animate),
+        output_format=output_format,
+        pixels=width * height,
+    )
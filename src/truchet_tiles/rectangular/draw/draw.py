@@ -1,8 +1,14 @@
-from collections import defaultdict
+import math
 import drawsvg as dw  # type: ignore
 
+from truchet_tiles.common.cancel import check_cancelled
 from truchet_tiles.common.constants import ANIMATION_BEGIN, ANIMATION_DELAY
-from truchet_tiles.common.enum import SvgColors, Connector
+from truchet_tiles.common.enum import DetailLevel, SvgColors, Connector
+from truchet_tiles.common.grid import ConstantGrid, Grid, PackedGrid, row_bits
+from truchet_tiles.common.lod import DEFAULT_LOD_POLICY, LodPolicy
+from truchet_tiles.common.png import encode_bitmap_png
+from truchet_tiles.common.progress import RenderStage, report_progress, start_stage
+from truchet_tiles.common.window import GridWindow
 from truchet_tiles.rectangular.draw.enum import (
     RectAnimationMethod,
     AxisAlignment,
@@ -30,7 +36,7 @@ class RectTilingDrawer:
     def __init__(
         self,
         dimension: int,
-        grid: defaultdict[tuple[int, int], int],
+        grid: Grid,
         edge_length: float,
         align_to_axis: bool = False,
         connector: str = "line",
@@ -45,8 +51,10 @@ class RectTilingDrawer:
         bg_color: str = SvgColors.WHITE,
         fill_color: str = SvgColors.BLACK,
         grid_color: str = SvgColors.RED,
+        window: GridWindow | None = None,
+        lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
     ) -> None:
-        self._grid: defaultdict[tuple[int, int], int] = grid
+        self._grid: Grid = grid
 
         assert edge_length > 0, "eldge_length must be positive"
         self._edge_length = edge_length
@@ -54,6 +62,11 @@ class RectTilingDrawer:
         self._dimension = dimension
         self._draw_size = self._dimension * self._edge_length
 
+        # NOTE: Only the tiles inside the window are drawn and the view box is cropped to it
+        full_window = GridWindow.square(0, self._dimension)
+        self._windowed = window is not None
+        self._window = full_window if window is None else full_window.intersect(window)
+
         self._line_width = line_width
 
         self._connector = Connector(connector)
@@ -76,11 +89,20 @@ class RectTilingDrawer:
 
         self._animate = animate
         self._animation_method = RectAnimationMethod(animation_method)
-        self._animation_prev_grid: defaultdict[tuple[int, int], int] = defaultdict(int)
+        self._animation_prev_grid: Grid = ConstantGrid(0)
         self._animation_duration = animation_duration
 
+        self._view_box = self._get_view_box()
+        self._render_width, self._render_height = self._get_render_size()
+
+        # Aligned renders show tiles rotated and scaled by sqrt(2)
+        tile_size = self._edge_length * (
+            math.sqrt(2) if self._alignment_style == AxisAlignment.aligned else 1
+        )
+        self._detail_level = lod_policy.level(tile_size, self._animate)
+
         self._svg = dw.Drawing(
-            self._draw_size, self._draw_size, id_prefix="rect_truchet_tiling"
+            self._render_width, self._render_height, id_prefix="rect_truchet_tiling"
         )
         self._svg_top_group = dw.Group(
             id="truchet_group", fill="none"
@@ -92,17 +114,24 @@ class RectTilingDrawer:
 
     def draw(self):
         self._clear_screan()
-        self._draw()
 
-        if self._show_grid_lines:
-            self._draw_grid_lines()
+        if self._detail_level == DetailLevel.raster:
+            # NOTE: Grid lines are not drawn on rasters, they would cover the tiles
+            self._draw_raster()
+        else:
+            self._draw()
+
+            if self._show_grid_lines:
+                self._draw_grid_lines()
 
+        # NOTE: Last chance to stop before the svg is serialized
+        check_cancelled()
         self._update_svg()
 
     def _clear_screan(self):
         self._svg.clear()
         self._svg = dw.Drawing(
-            self._draw_size, self._draw_size, id_prefix="truchet_tiling"
+            self._render_width, self._render_height, id_prefix="truchet_tiling"
         )
         self._svg_top_group = dw.Group(id="truchet_group", fill="none")
 
@@ -113,19 +142,57 @@ class RectTilingDrawer:
             else None
         )
 
-    def _update_svg(self):
-        kwargs = {}
-        transform = self._get_transform()
+    def _get_view_box(self) -> tuple[float, float, float, float] | None:
+        aligned = self._alignment_style == AxisAlignment.aligned
 
-        if transform:
-            kwargs["transform"] = transform
-            self._svg.view_box = (
+        if not self._windowed:
+            if not aligned:
+                return None
+
+            return (
                 self._draw_size / 4,
                 self._draw_size / 4,
                 self._draw_size / 2,
                 self._draw_size / 2,
             )
 
+        rows, cols = self._window.rows, self._window.cols
+        if not aligned:
+            return (
+                cols.start * self._edge_length,
+                rows.start * self._edge_length,
+                len(cols) * self._edge_length,
+                len(rows) * self._edge_length,
+            )
+
+        # Bounding box of the transformed window, cropped to the aligned view
+        half_edge = self._edge_length / 2
+        low, high = self._draw_size / 4, 3 * self._draw_size / 4
+        x_min = max(low, (rows.start + cols.start) * half_edge)
+        x_max = min(high, (rows.stop + cols.stop) * half_edge)
+        y_min = max(low, (rows.start - cols.stop) * half_edge + self._draw_size / 2)
+        y_max = min(high, (rows.stop - cols.start) * half_edge + self._draw_size / 2)
+
+        return (x_min, y_min, max(0.0, x_max - x_min), max(0.0, y_max - y_min))
+
+    def _get_render_size(self) -> tuple[float, float]:
+        if self._view_box is None:
+            return self._draw_size, self._draw_size
+
+        # Aligned renders show half of the drawing at the full draw size
+        scale = 2 if self._alignment_style == AxisAlignment.aligned else 1
+        return scale * self._view_box[2], scale * self._view_box[3]
+
+    def _update_svg(self):
+        kwargs = {}
+        transform = self._get_transform()
+
+        if transform:
+            kwargs["transform"] = transform
+
+        if self._view_box is not None:
+            self._svg.view_box = self._view_box
+
         self._svg.set_render_size()
         self._svg.append(dw.Use(self._svg_top_group, 0, 0, **kwargs))
 
@@ -133,9 +200,24 @@ class RectTilingDrawer:
         anim_start = ANIMATION_BEGIN
         grid_of_fill_inside = self._generate_fill_inside_grid()
 
-        for row in range(self._dimension):
+        start_stage(RenderStage.draw)
+        rows = self._window.rows
+        for row in rows:
+            check_cancelled()
+            report_progress(row - rows.start, len(rows))
             y_offset = row * self._edge_length
-            for col in range(self._dimension):
+            visible_cols = self._visible_cols(row)
+            for col in self._window.cols:
+                if col not in visible_cols:
+                    # Culled tiles still take their turn in by_tile animations
+                    if (
+                        self._animation_method == RectAnimationMethod.by_tile
+                        and self._grid[(row, col)]
+                        != self._animation_prev_grid[(row, col)]
+                    ):
+                        anim_start += self._animation_duration
+                    continue
+
                 x_offset = col * self._edge_length
 
                 tile_type = self._grid[(row, col)]
@@ -166,6 +248,23 @@ class RectTilingDrawer:
             if self._animation_method == RectAnimationMethod.by_row:
                 anim_start += self._animation_duration
 
+    def _visible_cols(self, row: int) -> range:
+        if self._alignment_style == AxisAlignment.rotated:
+            return self._window.cols
+
+        # In grid units, the aligned view box shows the diamond n/2 < x + y < 3n/2,
+        # |y - x| < n/2. Keep the tiles of the row whose square intersects it, padded
+        # by the line width so that stroke caps crossing the border are not lost.
+        half = self._dimension / 2
+        pad = self._line_width / self._edge_length
+        low = max(half - 2 - row, row - 1 - half) - pad
+        high = min(3 * half - row, row + 1 + half) + pad
+
+        return range(
+            max(self._window.col_start, math.floor(low) + 1),
+            min(self._window.col_stop, math.ceil(high)),
+        )
+
     def _append_rotation(
         self, row: int, col: int, used_tile: dw.Use, anim_start: float
     ):
@@ -190,31 +289,77 @@ class RectTilingDrawer:
             _get_rotation(anim_start, self._animation_duration, 90, 180)
         )
 
-    def _generate_fill_inside_grid(self) -> defaultdict[tuple[int, int], int]:
-        fill_inside_grid: defaultdict[tuple[int, int], int] = defaultdict(int)
-        for grid_row in range(self._dimension):
-            for grid_col in range(self._dimension):
-                neighbor = self._neighbor_cell(self._grid, grid_row, grid_col)
-                bit_changed = self._grid[(grid_row, grid_col)] ^ neighbor
-                if grid_row == 0 and grid_col == 0:
-                    neighbor_fill = self._grid[(0, 0)]
-                else:
-                    neighbor_fill = self._neighbor_cell(
-                        fill_inside_grid, grid_row, grid_col
-                    )
-                fill_inside_grid[(grid_row, grid_col)] = neighbor_fill ^ bit_changed ^ 1
-
-        return fill_inside_grid
-
-    @staticmethod
-    def _neighbor_cell(_grid: dict[tuple[int, int], int], row: int, col: int) -> int:
-        if row == 0 and col == 0:
-            return _grid[(row, col)]
-        if col > 0:
-            return _grid[(row, col - 1)]
-        if row > 0:
-            return _grid[(row - 1, col)]
-        raise ValueError("Invalid row and column")
+    def _generate_fill_inside_grid(self) -> PackedGrid:
+        # The fill of a tile is the fill of its left neighbor (the upper one in the first
+        # column) flipped, and flipped again if the grid bit changes. Along any path from
+        # (0, 0) the grid bit changes telescope, so the fill is the grid bit flipped once
+        # for (0, 0) and once more for every step, i.e. g ^ 1 ^ ((row + col) & 1).
+        # That lets whole rows of any window be computed with integer operations.
+        start_stage(RenderStage.fill)
+        cols = self._window.cols
+        all_ones = (1 << len(cols)) - 1
+        checkerboard = int("01" * len(cols), 2) >> len(cols) if cols else 0
+
+        def _fill_row(row: int) -> int:
+            flips = all_ones ^ checkerboard
+            if (row + cols.start) & 1:
+                flips ^= all_ones
+
+            return row_bits(self._grid, row, cols) ^ flips
+
+        return PackedGrid.from_row_bits(
+            self._window, (_fill_row(row) for row in self._window.rows)
+        )
+
+    def _draw_raster(self):
+        rows, cols = self._window.rows, self._window.cols
+        if not rows or not cols:
+            return
+
+        grid_of_fill_inside = self._generate_fill_inside_grid()
+        start_stage(RenderStage.draw)
+        bitmap = encode_bitmap_png(
+            len(cols), len(rows), (grid_of_fill_inside.row_bytes(row) for row in rows)
+        )
+
+        x = cols.start * self._edge_length
+        y = rows.start * self._edge_length
+        width = len(cols) * self._edge_length
+        height = len(rows) * self._edge_length
+
+        # The bitmap is a mask of the fill color over the background color
+        mask = dw.Mask()
+        mask.append(
+            dw.Image(
+                x,
+                y,
+                width,
+                height,
+                data=bitmap,
+                mime_type="image/png",
+                style="image-rendering:pixelated",
+            )
+        )
+        self._svg_top_group.append(
+            dw.Rectangle(x, y, width, height, fill=self._bg_color)
+        )
+        self._svg_top_group.append(
+            dw.Rectangle(x, y, width, height, fill=self._fill_color, mask=mask)
+        )
+
+    def fill_inside_grid(self) -> PackedGrid:
+        # Whether the inside of each tile of the window is filled
+        return self._generate_fill_inside_grid()
+
+    def base_tiles(self) -> dict[tuple[int, int], dw.Group]:
+        # Unanimated base tile of every tile type and inside fill
+        return {
+            (tile_type, inside_filled): self._get_base_tile(
+                tile_type, inside_filled, ANIMATION_BEGIN, False
+            )
+            for tile_type in (0, 1)
+            for inside_filled in (0, 1)
+        }
 
     def _get_tile(
         self,
@@ -225,10 +370,19 @@ class RectTilingDrawer:
         anim_start: float,
         animate: bool,
     ):
-        connector = self._connector if inside_filled else self._hybrid_connector
+        base_tile = self._get_base_tile(tile_type, inside_filled, anim_start, animate)
+        return dw.Use(base_tile, x_offset, y_offset)
+
+    def _get_base_tile(
+        self, tile_type: int, inside_filled: int, anim_start: float, animate: bool
+    ) -> dw.Group:
+        if self._detail_level == DetailLevel.straight_fills:
+            connector = Connector.line
+        else:
+            connector = self._connector if inside_filled else self._hybrid_connector
         func = self.tile_function_map[(connector, inside_filled)]
 
-        base_tile = func(
+        return func(
             tile_type,
             self._edge_length,
             self._line_width,
@@ -238,28 +392,29 @@ class RectTilingDrawer:
             animate,
             anim_start,
             self._animation_duration,
+            self._detail_level == DetailLevel.full,
         )
 
-        return dw.Use(base_tile, x_offset, y_offset)
-
     def _draw_grid_lines(self):
-        for i in range(self._dimension + 1):
+        rows, cols = self._window.rows, self._window.cols
+        for i in range(rows.start, rows.stop + 1):
             self._svg_top_group.append(
                 dw.Line(
-                    0,
+                    cols.start * self._edge_length,
                     i * self._edge_length,
-                    self._draw_size,
+                    cols.stop * self._edge_length,
                     i * self._edge_length,
                     stroke=self._grid_color,
                     stroke_width=self._grid_line_width,
                 )
             )
+        for i in range(cols.start, cols.stop + 1):
             self._svg_top_group.append(
                 dw.Line(
                     i * self._edge_length,
-                    0,
+                    rows.start * self._edge_length,
                     i * self._edge_length,
-                    self._draw_size,
+                    rows.stop * self._edge_length,
                     stroke=self._grid_color,
                     stroke_width=self._grid_line_width,
                 )
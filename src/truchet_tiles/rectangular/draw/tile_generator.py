@@ -268,6 +268,7 @@ def create_outside_filled_line_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     ofl = dw.Group(fill="none")
     bg_square = _get_bg_square(bg_color, edge_length)
@@ -300,9 +301,12 @@ def create_outside_filled_line_base_tile(
     ofl.append(triangle_left)
     ofl.append(triangle_right)
 
-    line_left, line_right = _get_lines(tile_type, edge_length, line_width, line_color)
-    ofl.append(line_left)
-    ofl.append(line_right)
+    if strokes:
+        line_left, line_right = _get_lines(
+            tile_type, edge_length, line_width, line_color
+        )
+        ofl.append(line_left)
+        ofl.append(line_right)
 
     return ofl
 
@@ -318,6 +322,7 @@ def create_inside_filled_line_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     ifl = dw.Group(fill="none")
     bg_square = _get_bg_square(bg_color, edge_length)
@@ -337,9 +342,12 @@ def create_inside_filled_line_base_tile(
 
     ifl.append(hexagon)
 
-    line_left, line_right = _get_lines(tile_type, edge_length, line_width, line_color)
-    ifl.append(line_left)
-    ifl.append(line_right)
+    if strokes:
+        line_left, line_right = _get_lines(
+            tile_type, edge_length, line_width, line_color
+        )
+        ifl.append(line_left)
+        ifl.append(line_right)
 
     return ifl
 
@@ -355,6 +363,7 @@ def create_outside_filled_curved_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     ofc = dw.Group(fill="none")
     bg_square = _get_bg_square(bg_color, edge_length)
@@ -379,9 +388,12 @@ def create_outside_filled_curved_base_tile(
     ofc.append(pie_left)
     ofc.append(pie_right)
 
-    curve_left, curve_right = _get_arcs(tile_type, edge_length, line_width, line_color)
-    ofc.append(curve_left)
-    ofc.append(curve_right)
+    if strokes:
+        curve_left, curve_right = _get_arcs(
+            tile_type, edge_length, line_width, line_color
+        )
+        ofc.append(curve_left)
+        ofc.append(curve_right)
 
     return ofc
 
@@ -397,6 +409,7 @@ def create_inside_filled_curved_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ) -> dw.Group:
     ifc = dw.Group(fill="none")
     bg_square = _get_bg_square(fill_color, edge_length)
@@ -421,9 +434,12 @@ def create_inside_filled_curved_base_tile(
     ifc.append(pie_left)
     ifc.append(pie_right)
 
-    curve_left, curve_right = _get_arcs(tile_type, edge_length, line_width, line_color)
-    ifc.append(curve_left)
-    ifc.append(curve_right)
+    if strokes:
+        curve_left, curve_right = _get_arcs(
+            tile_type, edge_length, line_width, line_color
+        )
+        ifc.append(curve_left)
+        ifc.append(curve_right)
 
     return ifc
 
@@ -439,6 +455,7 @@ def create_outside_filled_twoline_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ):
     oft = dw.Group(fill="none")
     bg_square = _get_bg_square(bg_color, edge_length)
@@ -473,11 +490,12 @@ def create_outside_filled_twoline_base_tile(
     oft.append(poly_left)
     oft.append(poly_right)
 
-    lines_left, lines_right = _get_twolines(
-        tile_type, edge_length, line_width, line_color
-    )
-    oft.append(lines_left)
-    oft.append(lines_right)
+    if strokes:
+        lines_left, lines_right = _get_twolines(
+            tile_type, edge_length, line_width, line_color
+        )
+        oft.append(lines_left)
+        oft.append(lines_right)
 
     return oft
 
@@ -493,6 +511,7 @@ def create_inside_filled_twoline_base_tile(
     animate_colors: bool,
     anim_start: float,
     anim_dur: float,
+    strokes: bool = True,
 ):
     ift = dw.Group(fill="none")
     bg_square = _get_bg_square(bg_color, edge_length)
@@ -511,10 +530,11 @@ def create_inside_filled_twoline_base_tile(
     if animate_colors:
         _append_color_fade(octagon, bg_color, fill_color, anim_start, anim_dur)
 
-    lines_left, lines_right = _get_twolines(
-        tile_type, edge_length, line_width, line_color
-    )
-    ift.append(lines_left)
-    ift.append(lines_right)
+    if strokes:
+        lines_left, lines_right = _get_twolines(
+            tile_type, edge_length, line_width, line_color
+        )
+        ift.append(lines_left)
+        ift.append(lines_right)
 
     return ift
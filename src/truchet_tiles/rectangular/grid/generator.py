@@ -1,17 +1,27 @@
-from collections import defaultdict
+from collections.abc import Callable
 from enum import Enum
-from functools import cache
-from random import randint
+from functools import lru_cache
+from random import Random
 
+from truchet_tiles.common.counter_random import counter_random_row
+from truchet_tiles.common.grid import (
+    ConstantGrid,
+    FunctionalGrid,
+    Grid,
+    PackedGrid,
+    reusing_row_function,
+)
+from truchet_tiles.common.grid_cache import get_or_create_cached_grid
 from truchet_tiles.common.math import parity
 from truchet_tiles.common.number_triangle import (
     get_baysal_triangle,
     get_hosoya_triangle,
     get_pascal_triangle,
 )
+from truchet_tiles.common.window import GridWindow
 from truchet_tiles.rectangular.grid.triangle_converter import (
-    triangle_to_reflected_square,
-    triangle_to_subsquare,
+    reflected_square_value,
+    subsquare_value,
 )
 
 
@@ -25,6 +35,7 @@ class RectGridType(str, Enum):
     ORXOR = "orxor"
     MOD = "mod"
     RANDOM = "random"
+    HASHRANDOM = "hashrandom"  # Like random, every cell a hash of seed and (x, y)
     THUESHIFT = "thueshift"
     ZEROS = "zeros"
     ONES = "ones"
@@ -42,40 +53,96 @@ class RectGridType(str, Enum):
     HOSOYAREFMOD = "hosoyarefmod"
 
 
-@cache
-def baysal_reflected_square(grid_size: int) -> defaultdict[tuple[int, int], int]:
-    return triangle_to_reflected_square(get_baysal_triangle(grid_size))
-
+# Grids that depend on the random seed
+SEEDED_GRID_TYPES = frozenset({RectGridType.RANDOM, RectGridType.HASHRANDOM})
 
-@cache
-def baysal_subsquare(grid_size: int) -> defaultdict[tuple[int, int], int]:
-    return triangle_to_subsquare(get_baysal_triangle(2 * grid_size))
+# Grids made of a triangle and its mirror, their cells depend on the dimension
+REFLECTED_GRID_TYPES = frozenset(
+    {
+        RectGridType.PASCALREFXOR,
+        RectGridType.PASCALREFMOD,
+        RectGridType.BAYSALREFXOR,
+        RectGridType.BAYSALREFMOD,
+        RectGridType.HOSOYAREFXOR,
+        RectGridType.HOSOYAREFMOD,
+    }
+)
 
+# NOTE: Grids are cached by window and seed too, so the cache is bounded to keep
+# servers from keeping a grid for every viewport and seed they are asked for
+GRID_CACHE_SIZE = 64
 
-@cache
-def hosoya_reflected_square(grid_size: int) -> defaultdict[tuple[int, int], int]:
-    return triangle_to_reflected_square(get_hosoya_triangle(grid_size))
+# The last full grid built for every grid type, with its size
+_last_full_grids: dict[RectGridType, tuple[int, Grid]] = {}
 
+# Grids whose cells are computed independently from a closed form function
+CLOSED_FORM_GRID_TYPES = frozenset(
+    {
+        RectGridType.XOR,
+        RectGridType.MULTXOR,
+        RectGridType.POWXOR,
+        RectGridType.SUMXOR,
+        RectGridType.SYMPOWSUMXOR,
+        RectGridType.ANDXOR,
+        RectGridType.ORXOR,
+        RectGridType.MOD,
+        RectGridType.THUESHIFT,
+    }
+)
 
-@cache
-def hosoya_subsquare(grid_size: int) -> defaultdict[tuple[int, int], int]:
-    return triangle_to_subsquare(get_hosoya_triangle(2 * grid_size))
+# Seconds to generate a cell of every grid type, see truchet_tiles.common.render_cost.
+# Cells of the power grids take longer the larger the grid, as their numbers grow.
+GRID_SECONDS_PER_CELL = {
+    RectGridType.XOR: 0.34e-6,
+    RectGridType.MULTXOR: 0.3e-6,
+    RectGridType.POWXOR: 10e-9,  # times the dimension
+    RectGridType.SUMXOR: 0.34e-6,
+    RectGridType.SYMPOWSUMXOR: 16e-9,  # times the dimension
+    RectGridType.ANDXOR: 0.39e-6,
+    RectGridType.ORXOR: 0.36e-6,
+    RectGridType.MOD: 0.3e-6,
+    RectGridType.RANDOM: 0.01e-6,
+    RectGridType.HASHRANDOM: 0.012e-6,
+    RectGridType.THUESHIFT: 0.53e-6,
+    RectGridType.ZEROS: 0.001e-6,
+    RectGridType.ONES: 0.002e-6,
+    RectGridType.PASCALSUBXOR: 1.5e-6,
+    RectGridType.PASCALSUBMOD: 1.05e-6,
+    RectGridType.PASCALREFXOR: 1.05e-6,
+    RectGridType.PASCALREFMOD: 0.68e-6,
+    RectGridType.BAYSALSUBXOR: 1.34e-6,
+    RectGridType.BAYSALSUBMOD: 1.35e-6,
+    RectGridType.BAYSALREFXOR: 1.2e-6,
+    RectGridType.BAYSALREFMOD: 1.04e-6,
+    RectGridType.HOSOYASUBXOR: 1.26e-6,
+    RectGridType.HOSOYASUBMOD: 1.08e-6,
+    RectGridType.HOSOYAREFXOR: 0.9e-6,
+    RectGridType.HOSOYAREFMOD: 0.9e-6,
+}
+POWER_GRID_TYPES = frozenset({RectGridType.POWXOR, RectGridType.SYMPOWSUMXOR})
 
 
-@cache
-def pascal_reflected_square(grid_size: int) -> defaultdict[tuple[int, int], int]:
-    return triangle_to_reflected_square(get_pascal_triangle(grid_size))
+def get_rect_grid(
+    grid_size: int,
+    grid_type: RectGridType,
+    window: GridWindow | None = None,
+    rand_seed: int = 0,
+) -> Grid:
+    # NOTE: When a window is given, only the cells inside it are evaluated.
+    # rand_seed only affects RANDOM grids, others are shared between seeds.
+    if grid_type not in SEEDED_GRID_TYPES:
+        rand_seed = 0
 
+    return _get_rect_grid(grid_size, grid_type, window, rand_seed)
 
-@cache
-def pascal_subsquare(grid_size: int) -> defaultdict[tuple[int, int], int]:
-    return triangle_to_subsquare(get_pascal_triangle(2 * grid_size))
 
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def _get_rect_grid(
+    grid_size: int, grid_type: RectGridType, window: GridWindow | None, rand_seed: int
+) -> Grid:
+    full_window = GridWindow.square(0, grid_size)
+    window = full_window if window is None else full_window.intersect(window)
 
-@cache
-def get_rect_grid(
-    grid_size: int, grid_type: RectGridType
-) -> defaultdict[tuple[int, int], int]:
     match grid_type:
         case RectGridType.XOR:
             grid_func = lambda x, y: parity(x ^ y)  # noqa: E731
@@ -100,33 +167,129 @@ def get_rect_grid(
         case RectGridType.ONES:
             grid_func = lambda x, y: 1  # noqa: E731
         case RectGridType.PASCALSUBXOR:
-            grid_func = lambda x, y: parity(pascal_subsquare(grid_size)[(x, y)])  # noqa: E731
+            grid_func = lambda x, y: parity(  # noqa: E731
+                subsquare_value(get_pascal_triangle(2 * grid_size), x, y)
+            )
         case RectGridType.PASCALSUBMOD:
-            grid_func = lambda x, y: pascal_subsquare(grid_size)[(x, y)] % 2  # noqa: E731
+            grid_func = lambda x, y: (  # noqa: E731
+                subsquare_value(get_pascal_triangle(2 * grid_size), x, y) % 2
+            )
         case RectGridType.PASCALREFXOR:
-            grid_func = lambda x, y: parity(pascal_reflected_square(grid_size)[(x, y)])  # noqa: E731
+            grid_func = lambda x, y: parity(  # noqa: E731
+                reflected_square_value(get_pascal_triangle(grid_size), x, y)
+            )
         case RectGridType.PASCALREFMOD:
-            grid_func = lambda x, y: pascal_reflected_square(grid_size)[(x, y)] % 2  # noqa: E731
+            grid_func = lambda x, y: (  # noqa: E731
+                reflected_square_value(get_pascal_triangle(grid_size), x, y) % 2
+            )
         case RectGridType.BAYSALSUBXOR:
-            grid_func = lambda x, y: parity(baysal_subsquare(grid_size)[(x, y)])  # noqa: E731
+            grid_func = lambda x, y: parity(  # noqa: E731
+                subsquare_value(get_baysal_triangle(2 * grid_size), x, y)
+            )
         case RectGridType.BAYSALSUBMOD:
-            grid_func = lambda x, y: baysal_subsquare(grid_size)[(x, y)] % 2  # noqa: E731
+            grid_func = lambda x, y: (  # noqa: E731
+                subsquare_value(get_baysal_triangle(2 * grid_size), x, y) % 2
+            )
         case RectGridType.BAYSALREFXOR:
-            grid_func = lambda x, y: parity(baysal_reflected_square(grid_size)[(x, y)])  # noqa: E731
+            grid_func = lambda x, y: parity(  # noqa: E731
+                reflected_square_value(get_baysal_triangle(grid_size), x, y)
+            )
         case RectGridType.BAYSALREFMOD:
-            grid_func = lambda x, y: baysal_reflected_square(grid_size)[(x, y)] % 2  # noqa: E731
+            grid_func = lambda x, y: (  # noqa: E731
+                reflected_square_value(get_baysal_triangle(grid_size), x, y) % 2
+            )
         case RectGridType.HOSOYASUBXOR:
-            grid_func = lambda x, y: parity(hosoya_subsquare(grid_size)[(x, y)])  # noqa: E731
+            grid_func = lambda x, y: parity(  # noqa: E731
+                subsquare_value(get_hosoya_triangle(2 * grid_size), x, y)
+            )
         case RectGridType.HOSOYASUBMOD:
-            grid_func = lambda x, y: hosoya_subsquare(grid_size)[(x, y)] % 2  # noqa: E731
+            grid_func = lambda x, y: (  # noqa: E731
+                subsquare_value(get_hosoya_triangle(2 * grid_size), x, y) % 2
+            )
         case RectGridType.HOSOYAREFXOR:
-            grid_func = lambda x, y: parity(hosoya_reflected_square(grid_size)[(x, y)])  # noqa: E731
+            grid_func = lambda x, y: parity(  # noqa: E731
+                reflected_square_value(get_hosoya_triangle(grid_size), x, y)
+            )
         case RectGridType.HOSOYAREFMOD:
-            grid_func = lambda x, y: hosoya_reflected_square(grid_size)[(x, y)] % 2  # noqa: E731
+            grid_func = lambda x, y: (  # noqa: E731
+                reflected_square_value(get_hosoya_triangle(grid_size), x, y) % 2
+            )
+        case RectGridType.HASHRANDOM:
+            # NOTE: Rows are hashed on demand, no matter how large the grid or where
+            # the window is
+            return FunctionalGrid.from_row_function(
+                lambda row, cols: counter_random_row(rand_seed, row, cols), window
+            )
         case _:
-            grid_func = lambda x, y: randint(0, 1)  # noqa: E731
+            # NOTE: Random bits come from a generator of this call, so concurrent renders
+            # neither share nor reseed the global random state. Windows are cut from the
+            # bits of the full grid, so they show the cells of the full tiling.
+            if window != full_window:
+                return PackedGrid.from_grid(
+                    _get_rect_grid(grid_size, grid_type, None, rand_seed), window
+                )
+            return PackedGrid.from_random(full_window, Random(rand_seed))
+
+    # NOTE: Each grid type uses the cheapest backend. Constant grids store nothing,
+    # closed form grids are evaluated lazily and triangle derived grids are
+    # materialized once as packed bits.
+    if grid_type in (RectGridType.ZEROS, RectGridType.ONES):
+        return ConstantGrid(grid_func(0, 0))
+
+    row_func = _growing_row_function(grid_size, grid_type, window, grid_func)
+
+    # NOTE: With a shared store or disk cache, deterministic grids are computed once for
+    # all processes. Triangles are only built on a miss, as entries hold the derived bits.
+    key = ("rect", grid_type.value, grid_size, window)
+    grid = get_or_create_cached_grid(
+        key, lambda: PackedGrid.from_row_function(row_func, window)
+    )
+    if grid is None and grid_type in CLOSED_FORM_GRID_TYPES:
+        grid = FunctionalGrid.from_row_function(row_func, window)
+    elif grid is None:
+        grid = PackedGrid.from_row_function(row_func, window)
+
+    if window == full_window:
+        _last_full_grids[grid_type] = (grid_size, grid)
+
+    return grid
+
+
+def clear_grid_caches() -> None:
+    # Drops the grids kept in memory, e.g. after rendering a tiling that is rarely
+    # asked for again
+    _get_rect_grid.cache_clear()
+    _last_full_grids.clear()
+
+
+def _growing_row_function(
+    grid_size: int,
+    grid_type: RectGridType,
+    window: GridWindow,
+    grid_func: Callable[[int, int], int],
+) -> Callable[[int, range], int]:
+    # NOTE: Full grids of the same type but another size share their top left cells,
+    # reflected ones only above the anti-diagonal of the smaller one. Those cells are
+    # copied from the last full grid, so changing the dimension only computes the
+    # cells that are new.
+    last = _last_full_grids.get(grid_type)
+    if last is None or window != GridWindow.square(0, grid_size):
+        return reusing_row_function(grid_func)
+
+    # NOTE: Lazy grids are copied into packed bits first. Reading from them would keep
+    # every grid they grew from alive, a chain as long as the dimension changes.
+    last_size, last_grid = last
+    shared_size = min(last_size, grid_size)
+    if not isinstance(last_grid, PackedGrid):
+        last_grid = PackedGrid.from_grid(last_grid, GridWindow.square(0, shared_size))
+
+    if grid_type in REFLECTED_GRID_TYPES:
+        return reusing_row_function(
+            grid_func, last_grid, lambda row: range(max(0, shared_size - row))
+        )
 
-    return defaultdict(
-        int,
-        (((x, y), grid_func(x, y)) for x in range(grid_size) for y in range(grid_size)),
+    return reusing_row_function(
+        grid_func,
+        last_grid,
+        lambda row: range(shared_size) if row < shared_size else range(0),
     )
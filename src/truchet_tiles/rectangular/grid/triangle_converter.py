@@ -41,3 +41,17 @@ def triangle_to_reflected_square(
             reflected_square[(row, col)] = reflected_square[(n - 1 - col, n - 1 - row)]
 
     return reflected_square
+
+
+def subsquare_value(triangle: NumberTriangle, row: int, col: int) -> int:
+    # Cell of triangle_to_subsquare(triangle), without building the square
+    return triangle.as_rows[row + col][col]
+
+
+def reflected_square_value(triangle: NumberTriangle, row: int, col: int) -> int:
+    # Cell of triangle_to_reflected_square(triangle), without building the square
+    n = len(triangle.as_rows)
+    if row + col < n:
+        return triangle.as_rows[row + col][col]
+
+    return triangle.as_rows[2 * n - 2 - row - col][n - 1 - row]
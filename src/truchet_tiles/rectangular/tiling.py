@@ -1,13 +1,42 @@
-import random
-
-from functools import cache
+import math
+from functools import lru_cache
 
 from truchet_tiles.common.enum import SvgColors
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.lod import DEFAULT_LOD_POLICY, LodPolicy
+from truchet_tiles.common.progress import RenderStage, start_stage
+from truchet_tiles.common.render_cost import RenderCost, TileCost, estimate_render_cost
+from truchet_tiles.common.tiling_data import TilingData, base_tile_svg
+from truchet_tiles.common.window import GridWindow
 from truchet_tiles.rectangular.draw import RectTilingDrawer
-from truchet_tiles.rectangular.grid.generator import RectGridType, get_rect_grid
+from truchet_tiles.rectangular.draw.enum import RectAnimationMethod
+from truchet_tiles.rectangular.grid.generator import (
+    GRID_SECONDS_PER_CELL,
+    POWER_GRID_TYPES,
+    RectGridType,
+    get_rect_grid,
+)
+
+# Cost of a tile by animation method, see truchet_tiles.common.render_cost. Tiles of
+# animated renders carry their animations, which is most of their cost.
+_TILE_COSTS = {
+    None: TileCost(seconds=26e-6, memory=990, output_size=60),
+    "at_once": TileCost(seconds=78e-6, memory=2250, output_size=226),
+    "by_row": TileCost(seconds=85e-6, memory=2250, output_size=226),
+    "by_tile": TileCost(seconds=380e-6, memory=10000, output_size=880),
+}
+_RASTER_TILE_COST = TileCost(seconds=0.005e-6, memory=8, output_size=0.2)
+
+# NOTE: Tiling data is cached by window, seed and colors too, so the cache is bounded
+# to keep servers from keeping the data of every tiling they are asked for
+TILING_DATA_CACHE_SIZE = 64
 
+# NOTE: Rendered svgs are large and the web UI keeps them in its own render cache,
+# bounded by bytes, so only the last few of them are cached here
+TILING_CACHE_SIZE = 8
 
-@cache
+
+@lru_cache(maxsize=TILING_CACHE_SIZE)
 def get_rectangular_tiling(
     function: str = "XOR",
     align_to_axis: bool = False,
@@ -26,12 +55,118 @@ def get_rectangular_tiling(
     bg_color: str = SvgColors.WHITE,
     fill_color: str = SvgColors.BLACK,
     grid_color: str = SvgColors.RED,
+    window: GridWindow | None = None,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
 ) -> str | None:
     # NOTE: Use rand_seed to control when to create new tiling in random mode
     # Pass the same rand_seed to update visual settings of the existing random tiling
-    random.seed(rand_seed)
+    start_stage(RenderStage.grid)
+    grid = get_rect_grid(dimension, RectGridType(function.lower()), window, rand_seed)
 
-    grid = get_rect_grid(dimension, RectGridType(function.lower()))
+    drawer = RectTilingDrawer(
+        dimension=dimension,
+        grid=grid,
+        edge_length=edge_length,
+        align_to_axis=align_to_axis,
+        connector=connector,
+        hybrid_connector=hybrid_connector,
+        animate=animate,
+        animation_method=animation_method,
+        animation_duration=animation_duration,
+        show_grid=show_grid,
+        line_width=line_width,
+        grid_line_width=grid_line_width,
+        line_color=line_color,
+        bg_color=bg_color,
+        fill_color=fill_color,
+        grid_color=grid_color,
+        window=window,
+        lod_policy=lod_policy,
+    )
+
+    drawer.draw()
+    start_stage(RenderStage.serialize)
+    return drawer.svg.as_svg()
+
+
+@lru_cache(maxsize=TILING_DATA_CACHE_SIZE)
+def get_rectangular_tiling_data(
+    function: str = "XOR",
+    align_to_axis: bool = False,
+    connector: str = "line",
+    hybrid_connector: str | None = None,
+    line_width: int = 1,
+    dimension: int = 8,
+    edge_length: float = 32.0,
+    rand_seed: int = 0,
+    line_color: str = SvgColors.BLACK,
+    bg_color: str = SvgColors.WHITE,
+    fill_color: str = SvgColors.BLACK,
+    window: GridWindow | None = None,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+) -> TilingData:
+    # The grid, the inside fills and the base tiles of a tiling, without drawing it.
+    # The tile of (row, col) is the base tile of its grid value and fill, at
+    # (col * edge_length, row * edge_length). Base tiles are those of the tiling drawn
+    # with align_to_axis, whose larger tiles may keep more detail.
+    full_window = GridWindow.square(0, dimension)
+    window = full_window if window is None else full_window.intersect(window)
+    grid = get_rect_grid(dimension, RectGridType(function.lower()), window, rand_seed)
+
+    drawer = RectTilingDrawer(
+        dimension=dimension,
+        grid=grid,
+        edge_length=edge_length,
+        align_to_axis=align_to_axis,
+        connector=connector,
+        hybrid_connector=hybrid_connector,
+        line_width=line_width,
+        line_color=line_color,
+        bg_color=bg_color,
+        fill_color=fill_color,
+        window=window,
+        lod_policy=lod_policy,
+    )
+
+    return TilingData(
+        grid=PackedGrid.from_grid(grid, window),
+        fill=drawer.fill_inside_grid(),
+        edge_length=edge_length,
+        base_tiles={
+            f"{tile_type}{inside_filled}": base_tile_svg(
+                tile, edge_length, edge_length, (0, 0)
+            )
+            for (tile_type, inside_filled), tile in drawer.base_tiles().items()
+        },
+    )
+
+
+def get_rectangular_tiling_from_grid(
+    grid: PackedGrid,
+    align_to_axis: bool = False,
+    connector: str = "line",
+    hybrid_connector: str | None = None,
+    animate: bool = False,
+    animation_method: str = "at_once",
+    show_grid: bool = False,
+    line_width: int = 1,
+    edge_length: float = 32.0,
+    animation_duration: float = 1.0,
+    grid_line_width: float = 0.5,
+    line_color: str = SvgColors.BLACK,
+    bg_color: str = SvgColors.WHITE,
+    fill_color: str = SvgColors.BLACK,
+    grid_color: str = SvgColors.RED,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+) -> str | None:
+    # The tiling of a user given grid, e.g. one of truchet_tiles.common.grid_formats.
+    # The grid window starts at (0, 0) and does not need to be square.
+    # NOTE: Not cached, grids are neither hashable nor likely to repeat
+    window: GridWindow | None = grid.window
+    dimension = max(len(grid.window.rows), len(grid.window.cols))
+    # Square grids are drawn like the tilings of their dimension, e.g. edited tilings
+    if grid.window == GridWindow.square(0, dimension):
+        window = None
 
     drawer = RectTilingDrawer(
         dimension=dimension,
@@ -50,7 +185,72 @@ def get_rectangular_tiling(
         bg_color=bg_color,
         fill_color=fill_color,
         grid_color=grid_color,
+        window=window,
+        lod_policy=lod_policy,
     )
 
     drawer.draw()
+    start_stage(RenderStage.serialize)
     return drawer.svg.as_svg()
+
+
+def estimate_rectangular_tiling_cost(
+    function: str = "XOR",
+    align_to_axis: bool = False,
+    animate: bool = False,
+    animation_method: str = "at_once",
+    dimension: int = 8,
+    edge_length: float = 32.0,
+    window: GridWindow | None = None,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+    output_format: str = "svg",
+) -> RenderCost:
+    # Predicted cost of get_rectangular_tiling with the same arguments, without
+    # rendering anything. Raises ValueError for unknown grid types.
+    grid_type = RectGridType(function.lower())
+    full_window = GridWindow.square(0, dimension)
+    window = full_window if window is None else full_window.intersect(window)
+    cells = len(window.rows) * len(window.cols)
+
+    grid_seconds = cells * GRID_SECONDS_PER_CELL[grid_type]
+    if grid_type in POWER_GRID_TYPES:
+        grid_seconds *= dimension
+
+    tile_size = edge_length * (math.sqrt(2) if align_to_axis else 1)
+    return estimate_render_cost(
+        grid_seconds=grid_seconds,
+        tiles=cells,
+        tile_cost=_TILE_COSTS[
+            RectAnimationMethod(animation_method) if animate else None
+        ],
+        raster_tile_cost=_RASTER_TILE_COST,
+        detail_level=lod_policy.level(tile_size, animate),
+        output_format=output_format,
+        pixels=cells * edge_length**2,
+    )
+
+
+def estimate_rectangular_tiling_from_grid_cost(
+    grid: PackedGrid,
+    align_to_axis: bool = False,
+    animate: bool = False,
+    animation_method: str = "at_once",
+    edge_length: float = 32.0,
+    lod_policy: LodPolicy = DEFAULT_LOD_POLICY,
+    output_format: str = "svg",
+) -> RenderCost:
+    # Predicted cost of get_rectangular_tiling_from_grid with the same arguments. The
+    # grid is given, so only drawing it costs.
+    cells = len(grid.window.rows) * len(grid.window.cols)
+    tile_size = edge_length * (math.sqrt(2) if align_to_axis else 1)
+    return estimate_render_cost(
+        grid_seconds=0.0,
+        tiles=cells,
+        tile_cost=_TILE_COSTS[
+            RectAnimationMethod(animation_method) if animate else None
+        ],
+        raster_tile_cost=_RASTER_TILE_COST,
+        detail_level=lod_policy.level(tile_size, animate),
+        output_format=output_format,
+        pixels=cells * edge_length**2,
+    )
@@ -1,4 +1,12 @@
 from django.urls import path  # type: ignore
 from . import views
 
-urlpatterns = [path("", views.index, name="hexagonal_tiling_index")]
+urlpatterns = [
+    path("", views.index, name="hexagonal_tiling_index"),
+    path("svg", views.svg, name="hexagonal_tiling_svg"),
+    path("download", views.download, name="hexagonal_tiling_download"),
+    path("data", views.data, name="hexagonal_tiling_data"),
+    path("upload", views.upload, name="hexagonal_tiling_upload"),
+    path("edit", views.edit, name="hexagonal_tiling_edit"),
+    path("live", views.live, name="hexagonal_tiling_live"),
+]
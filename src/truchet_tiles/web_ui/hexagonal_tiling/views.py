@@ -1,48 +1,49 @@
 import copy
 from random import randint
+from typing import Any
 
 from django.shortcuts import render  # type: ignore
+from django.http import HttpResponse, HttpResponseBadRequest  # type: ignore
 from django.http.request import HttpRequest  # type: ignore
+from django.urls import reverse  # type: ignore
+from django.views.decorators.csrf import csrf_exempt  # type: ignore
 
 from truchet_tiles.web_ui.hexagonal_tiling.forms import (
     INITIAL_TILING_VALUES,
     HexTilingForm,
 )
-from truchet_tiles.hexagonal.tiling import get_hexagonal_tiling
+from truchet_tiles.web_ui.truchet_ui.grid_api import tiling_data_response
+from truchet_tiles.web_ui.truchet_ui.grid_edit import tiling_edit_response
+from truchet_tiles.web_ui.truchet_ui.grid_upload import tiling_upload_response
+from truchet_tiles.web_ui.truchet_ui.live_preview import (
+    live_preview_response,
+    live_previews_enabled,
+    live_update_response,
+    render_progressively,
+)
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderUnavailable,
+    render_unavailable_response,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import render_key, tiling_query
+from truchet_tiles.web_ui.truchet_ui.svg import (
+    tiling_svg_response,
+    tiling_download_response,
+)
+from truchet_tiles.web_ui.truchet_ui.svg_patch import (
+    get_patch_format,
+    tiling_patch_response,
+)
 
 
-def index(request: HttpRequest):
+async def index(request: HttpRequest):
     if request.method == "POST":
         form = HexTilingForm(request.POST)
         if not form.is_valid():
             raise Exception(f"Invalid form: {form.errors}")
 
-        cleaned_data = form.cleaned_data
-
         rand_seed = int(request.COOKIES.get("X-TRUCHET-TILING-SEED"))
-        image_height = cleaned_data["image_height"]
-        dimension = cleaned_data["dimension"]
-        edge_length = image_height / (2 * (2 * dimension - 1))
-
-        svg_text = get_hexagonal_tiling(
-            function=cleaned_data["function"],
-            flat_top=cleaned_data["flat_top"],
-            fill_color=cleaned_data["fill_color"],
-            line_color=cleaned_data["line_color"],
-            bg_color=cleaned_data["bg_color"],
-            connector=cleaned_data["connector"].lower(),
-            hybrid_connector=cleaned_data["hybrid_connector"].lower(),
-            animate=cleaned_data["animate"],
-            animation_method=cleaned_data["animation_method"],
-            show_grid=cleaned_data["show_grid"],
-            grid_line_width=cleaned_data["grid_line_width"],
-            grid_color=cleaned_data["grid_color"],
-            line_width=cleaned_data["line_width"],
-            dimension=cleaned_data["dimension"],
-            edge_length=edge_length,
-            animation_duration=float(cleaned_data["animation_duration"]),
-            rand_seed=rand_seed,
-        )
+        tiling_kwargs = _form_tiling_kwargs(form.cleaned_data, rand_seed)
     else:
         rand_seed = randint(0, 1 << 32)
         form = HexTilingForm()
@@ -51,22 +52,143 @@ def index(request: HttpRequest):
         dimension = tiling_initial_values["dimension"]
         edge_length = image_height / (2 * (2 * dimension - 1))
         tiling_initial_values["edge_length"] = edge_length
-        svg_text = get_hexagonal_tiling(rand_seed=rand_seed, **tiling_initial_values)
+        tiling_kwargs = {"rand_seed": rand_seed, **tiling_initial_values}
+
+    try:
+        rendered, live_query = await render_progressively(request, "hex", tiling_kwargs)
+    except RenderUnavailable as error:
+        return render_unavailable_response(error)
+
+    if rendered is None:
+        return HttpResponse(status=204)  # the live preview of the page has it
+
+    context = _tiling_context(tiling_kwargs)
+
+    patch_format = get_patch_format(request)
+    if patch_format is not None:
+        response = tiling_patch_response(request, patch_format, rendered, context)
+    else:
+        response = render(
+            request,
+            "hexagonal_tiling/viewer.html",
+            context={
+                "template": _base_template(request),
+                "form": form,
+                "svg_text": rendered.text,
+                "live_preview": live_previews_enabled(request),
+                "live_query": live_query,
+                **context,
+            },
+        )
 
-    response = render(
-        request,
-        "hexagonal_tiling/viewer.html",
-        context={
-            "template": _base_template(request),
-            "form": form,
-            "svg_text": svg_text,
-        },
-    )
     response.set_cookie("X-TRUCHET-TILING-SEED", rand_seed)
 
     return response
 
 
+async def svg(request: HttpRequest):
+    max_dimension = HexTilingForm.base_fields["dimension"].max_value
+    return await tiling_svg_response(request, "hex", max_dimension)
+
+
+async def download(request: HttpRequest):
+    max_dimension = HexTilingForm.base_fields["dimension"].max_value
+    return await tiling_download_response(request, "hex", max_dimension)
+
+
+async def data(request: HttpRequest):
+    max_dimension = HexTilingForm.base_fields["dimension"].max_value
+    return await tiling_data_response(request, "hex", max_dimension)
+
+
+# NOTE: An API for non browser clients, and rendering a posted grid changes nothing
+@csrf_exempt
+async def upload(request: HttpRequest):
+    return await tiling_upload_response(request, "hex")
+
+
+async def edit(request: HttpRequest):
+    # The tiling of the posted form with the posted cells flipped, as a diff update
+    if request.method != "POST":
+        return HttpResponse(status=405, headers={"Allow": "POST"})
+
+    form = HexTilingForm(request.POST)
+    if not form.is_valid():
+        return HttpResponseBadRequest(
+            f"Invalid form: {form.errors}", content_type="text/plain"
+        )
+
+    rand_seed = _cookie_rand_seed(request)
+    return await tiling_edit_response(
+        request,
+        "hex",
+        _form_tiling_kwargs(form.cleaned_data, rand_seed),
+        _tiling_context,
+    )
+
+
+async def live(request: HttpRequest):
+    # Live preview stream of the page, updated by posting the form to it
+    if request.method != "POST":
+        return live_preview_response(request, "hex", _tiling_context)
+
+    form = HexTilingForm(request.POST)
+    if not form.is_valid():
+        return HttpResponseBadRequest(
+            f"Invalid form: {form.errors}", content_type="text/plain"
+        )
+
+    rand_seed = _cookie_rand_seed(request)
+    return live_update_response(
+        request, _form_tiling_kwargs(form.cleaned_data, rand_seed)
+    )
+
+
+def _cookie_rand_seed(request: HttpRequest) -> int:
+    # NOTE: API clients may post without the seed cookie of the pages, they get the
+    # tiling of seed 0
+    try:
+        return int(request.COOKIES.get("X-TRUCHET-TILING-SEED", 0))
+    except ValueError:
+        return 0
+
+
+def _form_tiling_kwargs(cleaned_data: dict[str, Any], rand_seed: int) -> dict[str, Any]:
+    image_height = cleaned_data["image_height"]
+    dimension = cleaned_data["dimension"]
+    edge_length = image_height / (2 * (2 * dimension - 1))
+
+    return {
+        "function": cleaned_data["function"],
+        "flat_top": cleaned_data["flat_top"],
+        "fill_color": cleaned_data["fill_color"],
+        "line_color": cleaned_data["line_color"],
+        "bg_color": cleaned_data["bg_color"],
+        "connector": cleaned_data["connector"].lower(),
+        "hybrid_connector": cleaned_data["hybrid_connector"].lower(),
+        "animate": cleaned_data["animate"],
+        "animation_method": cleaned_data["animation_method"],
+        "show_grid": cleaned_data["show_grid"],
+        "grid_line_width": cleaned_data["grid_line_width"],
+        "grid_color": cleaned_data["grid_color"],
+        "line_width": cleaned_data["line_width"],
+        "dimension": cleaned_data["dimension"],
+        "edge_length": edge_length,
+        "animation_duration": float(cleaned_data["animation_duration"]),
+        "rand_seed": rand_seed,
+    }
+
+
+def _tiling_context(tiling_kwargs: dict[str, Any]) -> dict[str, Any]:
+    # Urls of the render, shared by the page, its diff updates and live previews
+    query = tiling_query("hex", tiling_kwargs)
+    return {
+        "render_key": render_key("hex", tiling_kwargs),
+        "svg_url": f"{reverse('hexagonal_tiling_svg')}?{query}",
+        "download_url": f"{reverse('hexagonal_tiling_download')}?{query}",
+    }
+
+
 def _base_template(request):
     return (
         "base_empty.html"
@@ -1,6 +1,18 @@
 from django.apps import AppConfig  # type: ignore
+from django.conf import settings  # type: ignore
+
+from truchet_tiles.common.grid_cache import configure_grid_cache
+from truchet_tiles.common.grid_store import configure_shared_grid_store
 
 
 class MainPageConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main_page"
+
+    def ready(self):
+        configure_grid_cache(settings.GRID_CACHE_DIR, settings.GRID_CACHE_MAX_BYTES)
+        # NOTE: Without a namespace, TRUCHET_SHARED_GRID_STORE may still enable it
+        if settings.SHARED_GRID_STORE is not None:
+            configure_shared_grid_store(
+                settings.SHARED_GRID_STORE, settings.SHARED_GRID_STORE_MAX_BYTES
+            )
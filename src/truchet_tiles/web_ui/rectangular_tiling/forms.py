@@ -37,98 +37,98 @@ class RectTilingForm(forms.Form):
     function = forms.ChoiceField(
         choices=grid_types,
         initial=INITIAL_TILING_VALUES["function"],
-        widget=forms.Select(attrs={"onchange": "submit();"}),
+        widget=forms.Select(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     dimension = forms.IntegerField(
         initial=INITIAL_TILING_VALUES["dimension"],
         min_value=1,
         max_value=1024,
-        widget=forms.NumberInput(attrs={"onchange": "submit();"}),
+        widget=forms.NumberInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     connector = forms.ChoiceField(
         choices=connectors,
         initial=INITIAL_TILING_VALUES["connector"],
-        widget=forms.Select(attrs={"onchange": "submit();"}),
+        widget=forms.Select(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     hybrid_connector = forms.ChoiceField(
         choices=[(None, "NONE"), *connectors],
         initial=INITIAL_TILING_VALUES["hybrid_connector"],
-        widget=forms.Select(attrs={"onchange": "submit();"}),
+        widget=forms.Select(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     align_to_axis = forms.BooleanField(
         initial=INITIAL_TILING_VALUES["align_to_axis"],
-        widget=forms.CheckboxInput(attrs={"onchange": "submit();"}),
+        widget=forms.CheckboxInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     line_width = forms.IntegerField(
         initial=INITIAL_TILING_VALUES["line_width"],
         min_value=1,
         max_value=32,
-        widget=forms.NumberInput(attrs={"onchange": "submit();"}),
+        widget=forms.NumberInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     line_color = forms.CharField(
         initial=INITIAL_TILING_VALUES["line_color"],
         max_length=20,
-        widget=forms.TextInput(attrs={"onchange": "submit();"}),
+        widget=forms.TextInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     fill_color = forms.CharField(
         initial=INITIAL_TILING_VALUES["fill_color"],
         max_length=20,
-        widget=forms.TextInput(attrs={"onchange": "submit();"}),
+        widget=forms.TextInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     bg_color = forms.CharField(
         initial=INITIAL_TILING_VALUES["bg_color"],
         max_length=20,
-        widget=forms.TextInput(attrs={"onchange": "submit();"}),
+        widget=forms.TextInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     animate = forms.BooleanField(
         initial=INITIAL_TILING_VALUES["animate"],
-        widget=forms.CheckboxInput(attrs={"onchange": "submit();"}),
+        widget=forms.CheckboxInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     animation_method = forms.ChoiceField(
         choices=animation_methods,
         initial=INITIAL_TILING_VALUES["animation_method"],
-        widget=forms.Select(attrs={"onchange": "submit();"}),
+        widget=forms.Select(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     animation_duration = forms.FloatField(
         initial=INITIAL_TILING_VALUES["animation_duration"],
         min_value=0.01,
         max_value=10.0,
-        widget=forms.NumberInput(attrs={"onchange": "submit();", "step": "0.1"}),
+        widget=forms.NumberInput(attrs={"onchange": "requestSubmit();", "step": "0.1"}),
         required=False,
     )
     show_grid = forms.BooleanField(
         initial=INITIAL_TILING_VALUES["show_grid"],
-        widget=forms.CheckboxInput(attrs={"onchange": "submit();"}),
+        widget=forms.CheckboxInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     grid_line_width = forms.FloatField(
         initial=INITIAL_TILING_VALUES["grid_line_width"],
         min_value=0.01,
         max_value=5.0,
-        widget=forms.NumberInput(attrs={"onchange": "submit();", "step": "0.1"}),
+        widget=forms.NumberInput(attrs={"onchange": "requestSubmit();", "step": "0.1"}),
         required=False,
     )
     grid_color = forms.CharField(
         initial=INITIAL_TILING_VALUES["grid_color"],
         max_length=20,
-        widget=forms.TextInput(attrs={"onchange": "submit();"}),
+        widget=forms.TextInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
     image_height = forms.IntegerField(
         initial=INITIAL_TILING_VALUES["image_height"],
         min_value=200,
         max_value=10000,
-        widget=forms.NumberInput(attrs={"onchange": "submit();"}),
+        widget=forms.NumberInput(attrs={"onchange": "requestSubmit();"}),
         required=False,
     )
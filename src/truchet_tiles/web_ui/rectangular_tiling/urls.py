@@ -1,4 +1,12 @@
 from django.urls import path  # type: ignore
 from . import views
 
-urlpatterns = [path("", views.index, name="rectangular_tiling_index")]
+urlpatterns = [
+    path("", views.index, name="rectangular_tiling_index"),
+    path("svg", views.svg, name="rectangular_tiling_svg"),
+    path("download", views.download, name="rectangular_tiling_download"),
+    path("data", views.data, name="rectangular_tiling_data"),
+    path("upload", views.upload, name="rectangular_tiling_upload"),
+    path("edit", views.edit, name="rectangular_tiling_edit"),
+    path("live", views.live, name="rectangular_tiling_live"),
+]
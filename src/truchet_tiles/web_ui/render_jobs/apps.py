@@ -0,0 +1,6 @@
+from django.apps import AppConfig  # type: ignore
+
+
+class RenderJobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "render_jobs"
@@ -0,0 +1,216 @@
+import gzip
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import timedelta
+from functools import cache
+from pathlib import Path
+
+import django  # type: ignore
+from django.conf import settings  # type: ignore
+from django.db import connections  # type: ignore
+from django.http import QueryDict  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from truchet_tiles.common.cancel import CancelToken, cancel_scope
+from truchet_tiles.common.number_triangle import clear_number_triangles
+from truchet_tiles.common.progress import (
+    ProgressReporter,
+    RenderStage,
+    progress_scope,
+    start_stage,
+)
+from truchet_tiles.hexagonal import grid_generator as hexagonal_grid_generator
+from truchet_tiles.hexagonal import tiling as hexagonal_tiling
+from truchet_tiles.rectangular import tiling as rectangular_tiling
+from truchet_tiles.rectangular.grid import generator as rectangular_grid_generator
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    TILING_FUNCTIONS,
+    tiling_kwargs_from_query,
+)
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import svg_to_png
+
+from .models import RenderJob
+
+# NOTE: Running jobs are cancelled after RENDER_JOB_TIMEOUT, jobs still running this
+# long after it were interrupted, e.g. by a restart
+_STALE_JOB_GRACE = 5 * 60.0  # seconds
+
+
+def job_output_path(job: RenderJob) -> Path:
+    return Path(settings.RENDER_JOB_DIR) / f"{job.id}.{job.output_format}"
+
+
+class _JobProgress:
+    # Writes the progress of a job to the database, at most once per interval seconds
+    # within a stage
+    def __init__(self, job_id: str, interval: float) -> None:
+        self._job_id = job_id
+        self._interval = interval
+        self._stage: RenderStage | None = None
+        self._written_at = 0.0
+
+    def __call__(self, stage: RenderStage, fraction: float) -> None:
+        now = time.monotonic()
+        if stage == self._stage and now - self._written_at < self._interval:
+            return
+
+        self._stage = stage
+        self._written_at = now
+        RenderJob.objects.filter(id=self._job_id).update(
+            stage=stage.value, progress=fraction
+        )
+
+
+def _render_job_output(job: RenderJob) -> bytes:
+    tiling_kwargs = tiling_kwargs_from_query(job.kind, QueryDict(job.query).dict())
+    svg_text = TILING_FUNCTIONS[job.kind](**tiling_kwargs)
+    assert svg_text is not None
+
+    start_stage(RenderStage.compress)
+    match job.output_format:
+        case RenderJob.OutputFormat.SVGZ:
+            return gzip.compress(svg_text.encode(), compresslevel=9, mtime=0)
+        case RenderJob.OutputFormat.PNG:
+            return svg_to_png(svg_text)
+        case _:
+            return svg_text.encode()
+
+
+def _clear_tiling_caches() -> None:
+    # NOTE: Job outputs are large and rarely asked for twice, so job workers do not
+    # keep them, or the tiling data, grids and triangles they were drawn from, in the
+    # caches of the worker
+    rectangular_tiling.get_rectangular_tiling.cache_clear()
+    rectangular_tiling.get_rectangular_tiling_data.cache_clear()
+    hexagonal_tiling._get_flat_top_hexagonal_tiling.cache_clear()
+    hexagonal_tiling.get_hexagonal_tiling_data.cache_clear()
+    rectangular_grid_generator.clear_grid_caches()
+    hexagonal_grid_generator.clear_grid_caches()
+    clear_number_triangles()
+
+
+def _claim_queued_job() -> str | None:
+    # Marks the oldest queued job as running and gives its id, or None when no job is
+    # queued. The update only succeeds for a single worker, others try the next job.
+    while True:
+        job_id = (
+            RenderJob.objects.filter(state=RenderJob.State.QUEUED)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+
+        claimed = RenderJob.objects.filter(
+            id=job_id, state=RenderJob.State.QUEUED
+        ).update(state=RenderJob.State.RUNNING, started_at=timezone.now())
+        if claimed:
+            return str(job_id)
+
+
+def _run_claimed_job(job_id: str) -> None:
+    # Runs a claimed job, and writes its output to the job directory or the reason it
+    # failed to the job
+    job = RenderJob.objects.get(id=job_id)
+    reporter = ProgressReporter(
+        _JobProgress(job_id, settings.RENDER_JOB_PROGRESS_INTERVAL)
+    )
+    try:
+        with (
+            cancel_scope(CancelToken(settings.RENDER_JOB_TIMEOUT)),
+            progress_scope(reporter),
+        ):
+            content = _render_job_output(job)
+
+        # NOTE: Written under another name first, so downloads never see a partial file
+        path = job_output_path(job)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = path.with_name(f"{path.name}.partial")
+        partial_path.write_bytes(content)
+        os.replace(partial_path, path)
+    # NOTE: e.g. a job that ran out of time or memory, or png outputs without cairosvg.
+    # Any error fails the job, so that it is never left running.
+    except Exception as error:  # noqa: BLE001
+        RenderJob.objects.filter(id=job_id).update(
+            state=RenderJob.State.FAILED,
+            error=str(error) or type(error).__name__,
+            finished_at=timezone.now(),
+        )
+    else:
+        RenderJob.objects.filter(id=job_id).update(
+            state=RenderJob.State.DONE, progress=1.0, finished_at=timezone.now()
+        )
+    finally:
+        _clear_tiling_caches()
+
+
+def _fail_stale_jobs() -> None:
+    stale_at = timezone.now() - timedelta(
+        seconds=settings.RENDER_JOB_TIMEOUT + _STALE_JOB_GRACE
+    )
+    RenderJob.objects.filter(
+        state=RenderJob.State.RUNNING, started_at__lt=stale_at
+    ).update(
+        state=RenderJob.State.FAILED,
+        error="render job was interrupted",
+        finished_at=timezone.now(),
+    )
+
+
+def _remove_expired_jobs() -> None:
+    # Removes the jobs and the outputs older than RENDER_JOB_MAX_AGE, with the partial
+    # outputs of interrupted jobs
+    expired_at = timezone.now() - timedelta(seconds=settings.RENDER_JOB_MAX_AGE)
+    RenderJob.objects.filter(
+        state__in=(RenderJob.State.DONE, RenderJob.State.FAILED),
+        finished_at__lt=expired_at,
+    ).delete()
+
+    job_dir = Path(settings.RENDER_JOB_DIR)
+    if not job_dir.is_dir():
+        return
+
+    expired_mtime = time.time() - settings.RENDER_JOB_MAX_AGE
+    for path in job_dir.iterdir():
+        try:
+            if path.stat().st_mtime < expired_mtime:
+                path.unlink()
+        except FileNotFoundError:  # removed by another worker
+            pass
+
+
+def run_queued_jobs() -> None:
+    # Runs the queued jobs in a job worker, oldest first, until none is left. Jobs are
+    # claimed from the database, so the jobs queued by any web worker are run, also
+    # the ones of web workers that stopped before running them.
+    _fail_stale_jobs()
+    _remove_expired_jobs()
+    while (job_id := _claim_queued_job()) is not None:
+        _run_claimed_job(job_id)
+
+
+def _init_job_worker() -> None:
+    # NOTE: Workers may be spawned instead of forked, and must not share the database
+    # connections of the web worker that forked them
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "truchet_ui.settings")
+    django.setup()
+    connections.close_all()
+
+
+@cache
+def get_job_pool() -> Executor:
+    pool = ProcessPoolExecutor(
+        settings.RENDER_JOB_WORKERS, initializer=_init_job_worker
+    )
+    # NOTE: Starts the jobs left queued, e.g. by a restart, when the pool is created
+    for _ in range(settings.RENDER_JOB_WORKERS):
+        pool.submit(run_queued_jobs)
+
+    return pool
+
+
+def start_queued_jobs() -> None:
+    # Wakes a job worker of this web worker to run the queued jobs, e.g. a job that was
+    # just saved
+    get_job_pool().submit(run_queued_jobs)
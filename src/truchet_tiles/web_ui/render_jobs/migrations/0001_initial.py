@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:03
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RenderJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("rect", "rect"), ("hex", "hex")], max_length=4
+                    ),
+                ),
+                ("query", models.TextField()),
+                (
+                    "output_format",
+                    models.CharField(
+                        choices=[("svg", "Svg"), ("svgz", "Svgz"), ("png", "Png")],
+                        max_length=4,
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=7,
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("grid", "grid"),
+                            ("fill", "fill"),
+                            ("draw", "draw"),
+                            ("serialize", "serialize"),
+                            ("compress", "compress"),
+                        ],
+                        max_length=9,
+                    ),
+                ),
+                ("progress", models.FloatField(default=0.0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(null=True)),
+                ("finished_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "ordering": ("created_at",),
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+import uuid
+
+from django.db import models  # type: ignore
+
+from truchet_tiles.common.progress import RenderStage
+
+
+class RenderJob(models.Model):
+    # A tiling rendered by the job workers, see render_jobs.jobs. The tiling is the
+    # canonical query string of its arguments, see truchet_ui.render_key.tiling_query.
+    class State(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    class OutputFormat(models.TextChoices):
+        SVG = "svg"
+        SVGZ = "svgz"
+        PNG = "png"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=4, choices=[("rect", "rect"), ("hex", "hex")])
+    query = models.TextField()
+    output_format = models.CharField(max_length=4, choices=OutputFormat.choices)
+    state = models.CharField(max_length=7, choices=State.choices, default=State.QUEUED)
+    # The stage the job is in and the fraction of it that is done
+    stage = models.CharField(
+        max_length=9,
+        blank=True,
+        choices=[(stage.value, stage.value) for stage in RenderStage],
+    )
+    progress = models.FloatField(default=0.0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        ordering = ("created_at",)
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.kind}-tiling.{self.output_format}"
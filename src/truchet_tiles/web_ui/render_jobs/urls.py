@@ -0,0 +1,9 @@
+from django.urls import path  # type: ignore
+
+from . import views
+
+urlpatterns = [
+    path("<uuid:job_id>", views.job, name="render_jobs_job"),
+    path("<uuid:job_id>/download", views.download, name="render_jobs_download"),
+    path("<str:kind>", views.submit, name="render_jobs_submit"),
+]
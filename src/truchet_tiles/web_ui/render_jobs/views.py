@@ -0,0 +1,142 @@
+import uuid
+
+from django.conf import settings  # type: ignore
+from django.http import (  # type: ignore
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
+from django.http.request import HttpRequest  # type: ignore
+from django.urls import reverse  # type: ignore
+from django.utils.cache import patch_cache_control  # type: ignore
+from django.views.decorators.csrf import csrf_exempt  # type: ignore
+
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderRejected,
+    estimate_tiling_cost,
+    render_unavailable_response,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    TILING_FUNCTIONS,
+    canonical_tiling_kwargs,
+    tiling_kwargs_from_query,
+    tiling_query,
+)
+
+from .jobs import get_job_pool, job_output_path, start_queued_jobs
+from .models import RenderJob
+
+_CONTENT_TYPES = {RenderJob.OutputFormat.PNG: "image/png"}
+
+
+def _job_json(job: RenderJob) -> dict:
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "format": job.output_format,
+        "state": job.state,
+        "stage": job.stage,
+        "progress": job.progress,
+        "error": job.error,
+        "url": reverse("render_jobs_job", args=[job.id]),
+        "download_url": (
+            reverse("render_jobs_download", args=[job.id])
+            if job.state == RenderJob.State.DONE
+            else None
+        ),
+    }
+
+
+async def _get_job(job_id: uuid.UUID) -> RenderJob:
+    job = await RenderJob.objects.filter(id=job_id).afirst()
+    if job is None:
+        raise Http404("unknown render job")
+
+    return job
+
+
+# NOTE: An API for non browser clients, and queueing a render changes no user data
+@csrf_exempt
+async def submit(request: HttpRequest, kind: str):
+    # Queues a render of the "rect" or "hex" tiling given in the query string, with
+    # format=svg, svgz or png, and answers with the job to poll. Jobs may be larger
+    # and take longer than the renders of the other views, up to the job budgets.
+    if kind not in TILING_FUNCTIONS:
+        raise Http404("unknown tiling")
+    if request.method != "POST":
+        return HttpResponse(status=405, headers={"Allow": "POST"})
+
+    query = request.GET.dict()
+    output_format = query.pop("format", RenderJob.OutputFormat.SVG)
+    if output_format not in RenderJob.OutputFormat.values:
+        return HttpResponseBadRequest(
+            "format should be one of svg, svgz and png", content_type="text/plain"
+        )
+
+    try:
+        tiling_kwargs = tiling_kwargs_from_query(kind, query)
+        dimension = canonical_tiling_kwargs(kind, tiling_kwargs)["dimension"]
+        cost = estimate_tiling_cost(kind, tiling_kwargs, output_format)
+    except (TypeError, ValueError) as error:
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    max_dimension = settings.RENDER_JOB_MAX_DIMENSION
+    if not 0 < dimension <= max_dimension:
+        return HttpResponseBadRequest(
+            f"dimension should be between 1 and {max_dimension}",
+            content_type="text/plain",
+        )
+
+    if (
+        cost.seconds > settings.RENDER_JOB_TIMEOUT
+        or cost.memory > settings.RENDER_JOB_BUDGET_BYTES
+    ):
+        return render_unavailable_response(
+            RenderRejected("tiling is too expensive to render, try a smaller one")
+        )
+
+    job = await RenderJob.objects.acreate(
+        kind=kind,
+        query=tiling_query(kind, tiling_kwargs),
+        output_format=output_format,
+    )
+    start_queued_jobs()
+
+    response = JsonResponse(_job_json(job), status=202)
+    response.headers["Location"] = reverse("render_jobs_job", args=[job.id])
+    return response
+
+
+async def job(request: HttpRequest, job_id: uuid.UUID):
+    # The state of a job, with the stage it is in and how much of it is done
+    render_job = await _get_job(job_id)
+    if render_job.state == RenderJob.State.QUEUED:
+        get_job_pool()  # runs the jobs queued before this web worker started
+
+    response = JsonResponse(_job_json(render_job))
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+async def download(request: HttpRequest, job_id: uuid.UUID):
+    # The output of a finished job, as an attachment
+    render_job = await _get_job(job_id)
+    if render_job.state != RenderJob.State.DONE:
+        return HttpResponse(
+            f"render job is {render_job.state}",
+            status=409,
+            content_type="text/plain",
+        )
+
+    path = job_output_path(render_job)
+    if not path.exists():
+        raise Http404("render job output was removed")
+
+    return FileResponse(
+        path.open("rb"),
+        as_attachment=True,
+        filename=render_job.file_name,
+        content_type=_CONTENT_TYPES.get(render_job.output_format, "image/svg+xml"),
+    )
@@ -0,0 +1,123 @@
+import base64
+from typing import Any
+
+from django.http import (  # type: ignore
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
+from django.utils.cache import (  # type: ignore
+    get_conditional_response,
+    patch_cache_control,
+)
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import grid_buffer_size, write_grid_buffer
+from truchet_tiles.common.lod import RASTER_DETAIL
+from truchet_tiles.common.tiling_data import TilingData
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderRejected,
+    RenderUnavailable,
+    estimate_tiling_cost,
+    fits_render_budget,
+    get_render_executor,
+    render_unavailable_response,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    TILING_DATA_FUNCTIONS,
+    canonical_tiling_kwargs,
+    render_key,
+    tiling_kwargs_from_query,
+)
+from truchet_tiles.web_ui.truchet_ui.svg import SVG_MAX_AGE
+
+_FORMATS = ("json", "grid", "fill")
+
+
+def _grid_file_bytes(grid: PackedGrid) -> bytes:
+    data = bytearray(grid_buffer_size(grid))
+    write_grid_buffer(memoryview(data), grid)
+    return bytes(data)
+
+
+def _tiling_data_json(kind: str, dimension: int, data: TilingData) -> dict:
+    window = data.grid.window
+    return {
+        "kind": kind,
+        "dimension": dimension,
+        "edge_length": data.edge_length,
+        "window": [
+            window.row_start,
+            window.row_stop,
+            window.col_start,
+            window.col_stop,
+        ],
+        "row_size": (len(window.cols) + 7) // 8,
+        "grid": base64.b64encode(data.grid.data).decode(),
+        "fill": base64.b64encode(data.fill.data).decode(),
+        "base_tiles": data.base_tiles,
+    }
+
+
+def admit_tiling_data(kind: str, tiling_kwargs: dict[str, Any]) -> None:
+    # NOTE: The data is the grid and the fills of a raster render, without drawing
+    # them, so it costs at most as much as that render
+    cost = estimate_tiling_cost(kind, {**tiling_kwargs, "lod_policy": RASTER_DETAIL})
+    if not fits_render_budget(cost):
+        raise RenderRejected("tiling data is too expensive to compute")
+
+
+async def tiling_data_response(
+    request: HttpRequest, kind: str, max_dimension: int
+) -> HttpResponse:
+    # The cells of the "rect" or "hex" tiling given in the query string, for clients
+    # that draw it themselves. With format=json, the grid and the inside fills are
+    # base64 packed bits, see PackedGrid, with the svg of the base tiles. With
+    # format=grid or format=fill, the grid or the fills are sent as a grid file, see
+    # truchet_tiles.common.grid_file.
+    query = request.GET.dict()
+    data_format = query.pop("format", "json")
+    if data_format not in _FORMATS:
+        return HttpResponseBadRequest(
+            "format should be one of json, grid and fill", content_type="text/plain"
+        )
+
+    try:
+        tiling_kwargs = tiling_kwargs_from_query(kind, query, TILING_DATA_FUNCTIONS)
+        key = render_key(kind, tiling_kwargs)
+        dimension = canonical_tiling_kwargs(kind, tiling_kwargs)["dimension"]
+    except (TypeError, ValueError) as error:
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    if not 0 < dimension <= max_dimension:
+        return HttpResponseBadRequest(
+            f"dimension should be between 1 and {max_dimension}",
+            content_type="text/plain",
+        )
+
+    # NOTE: The data is a function of the render key arguments, like the svg
+    etag = f'"{key}-data-{data_format}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            admit_tiling_data(kind, tiling_kwargs)
+            data = await get_render_executor().run(
+                TILING_DATA_FUNCTIONS[kind], **tiling_kwargs
+            )
+        except RenderUnavailable as error:
+            return render_unavailable_response(error)
+        except ValueError as error:  # e.g. an unknown function or connector
+            return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+        if data_format == "json":
+            response = JsonResponse(_tiling_data_json(kind, dimension, data))
+        else:
+            grid = data.grid if data_format == "grid" else data.fill
+            response = HttpResponse(
+                _grid_file_bytes(grid), content_type="application/octet-stream"
+            )
+
+    response.headers["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=SVG_MAX_AGE, immutable=True)
+    return response
@@ -0,0 +1,180 @@
+import hashlib
+import inspect
+import json
+import math
+from collections.abc import Callable
+from typing import Any
+
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest  # type: ignore
+
+from truchet_tiles.common.enum import DetailLevel
+from truchet_tiles.common.tile_edit import TilingEditor
+from truchet_tiles.common.window import GridWindow
+from truchet_tiles.hexagonal.draw.enum import HexTop
+from truchet_tiles.hexagonal.hex_grid import (
+    ORIENTATIONS,
+    Hex,
+    HexGeometry,
+    Layout,
+    Point,
+)
+from truchet_tiles.web_ui.truchet_ui.grid_api import admit_tiling_data
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderUnavailable,
+    get_render_executor,
+    render_unavailable_response,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    TILING_DATA_FUNCTIONS,
+    canonical_tiling_kwargs,
+    render_key,
+)
+from truchet_tiles.web_ui.truchet_ui.svg_patch import (
+    SvgPatch,
+    base_tile_def,
+    get_patch_format,
+    patch_response,
+)
+
+MAX_EDITED_CELLS = 4096
+
+
+def _parse_cells(text: str) -> list[tuple[int, int]]:
+    # Cells given as "row,col;row,col", or "q,r;q,r" for hexagonal tilings
+    cells = []
+    for pair in filter(None, text.split(";")):
+        coordinates = pair.split(",")
+        if len(coordinates) != 2:
+            raise ValueError(f"{pair!r} is not a pair of coordinates")
+        cells.append((int(coordinates[0]), int(coordinates[1])))
+
+    if len(cells) > MAX_EDITED_CELLS:
+        raise ValueError(f"at most {MAX_EDITED_CELLS} cells can be edited")
+
+    return cells
+
+
+def _in_tiling(kind: str, window: GridWindow, cell: tuple[int, int]) -> bool:
+    # NOTE: Hexagonal grids cover the axial box of the tiling, only its hexes are tiles
+    dimension = (len(window.rows) + 1) // 2
+    return cell in window and (kind != "hex" or abs(sum(cell)) < dimension)
+
+
+def _arguments(function: Callable[..., Any], tiling_kwargs: dict[str, Any]) -> dict:
+    parameters = inspect.signature(function).parameters
+    return {name: value for name, value in tiling_kwargs.items() if name in parameters}
+
+
+def _detail_level(kind: str, tiling_kwargs: dict[str, Any]) -> DetailLevel:
+    # Level of detail of the render, see the tile sizes of the drawers
+    arguments = canonical_tiling_kwargs(kind, tiling_kwargs)
+    if kind == "hex":
+        tile_size = math.sqrt(3) * arguments["edge_length"]
+    elif arguments["align_to_axis"]:
+        tile_size = math.sqrt(2) * arguments["edge_length"]
+    else:
+        tile_size = arguments["edge_length"]
+
+    return arguments["lod_policy"].level(tile_size, arguments["animate"])
+
+
+def _tile_position(
+    kind: str, edge_length: float, cell: tuple[int, int]
+) -> tuple[float, float]:
+    # Position of the tile of the cell as the drawers give it, see TilingData
+    if kind == "hex":
+        q, r = cell
+        layout = Layout(
+            orientation=ORIENTATIONS[HexTop.flat],
+            size=Point(edge_length, edge_length),
+            origin=Point(0, 0),
+        )
+        center = HexGeometry(layout, Hex(q, r, -q - r)).center
+        return center.x, center.y
+
+    row, col = cell
+    return col * edge_length, row * edge_length
+
+
+def _edit_patch(
+    kind: str, editor: TilingEditor, cells: set[tuple[int, int]]
+) -> SvgPatch:
+    # The tiles of the cells with their current base tiles. Cells flipped back keep
+    # their tiles, but the page may show them flipped by an earlier edit.
+    data = editor.data
+    base_tiles = {}
+    tiles = []
+    for cell in sorted(cells):
+        tile_key = editor.base_tile(cell)
+        if tile_key not in base_tiles:
+            base_tiles[tile_key] = base_tile_def(data.base_tiles[tile_key])
+
+        x, y = _tile_position(kind, data.edge_length, cell)
+        tiles.append((str(x), str(y), base_tiles[tile_key][0]))
+
+    return SvgPatch(defs=dict(base_tiles.values()), tiles=tiles)
+
+
+async def tiling_edit_response(
+    request: HttpRequest,
+    kind: str,
+    tiling_kwargs: dict[str, Any],
+    context: Callable[[dict[str, Any]], dict[str, Any]],
+) -> HttpResponse:
+    # The "rect" or "hex" tiling with the posted "cells" flipped, see TilingEditor.
+    # Pages post every cell flipped so far with the render key of the svg they show,
+    # like their diff updates, and get the tiles of those cells, see svg_patch. The
+    # tiles are taken from the tiling data, the edited tiling is never drawn, and
+    # edits keep no state on the server.
+    patch_format = get_patch_format(request)
+    if patch_format is None:
+        return HttpResponseBadRequest(
+            "post the render key of the shown svg, accepting turbo streams or json",
+            content_type="text/plain",
+        )
+
+    try:
+        cells = _parse_cells(request.POST.get("cells", ""))
+    except ValueError as error:
+        return HttpResponseBadRequest(
+            f"invalid cells: {error}", content_type="text/plain"
+        )
+
+    if _detail_level(kind, tiling_kwargs) == DetailLevel.raster:
+        return HttpResponseBadRequest(
+            "tilings drawn as rasters have no tiles to edit",
+            content_type="text/plain",
+        )
+
+    data_function = TILING_DATA_FUNCTIONS[kind]
+    data_kwargs = _arguments(data_function, tiling_kwargs)
+    try:
+        admit_tiling_data(kind, data_kwargs)
+        data = await get_render_executor().run(data_function, **data_kwargs)
+    except RenderUnavailable as error:
+        return render_unavailable_response(error)
+    except ValueError as error:  # e.g. an unknown function or connector
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    if not all(_in_tiling(kind, data.grid.window, cell) for cell in cells):
+        return HttpResponseBadRequest(
+            "cells should be inside the tiling", content_type="text/plain"
+        )
+
+    # NOTE: Edited tiles are drawn without animation, like the tiles that do not change
+    # in animated tilings
+    editor = TilingEditor(data)
+    flipped = sorted(editor.flip_cells(cells))
+    patch = _edit_patch(kind, editor, set(cells))
+    key = hashlib.sha256(
+        json.dumps([render_key(kind, tiling_kwargs), flipped]).encode()
+    ).hexdigest()
+
+    # NOTE: The links stay those of the unedited tiling
+    return patch_response(
+        request,
+        patch_format,
+        patch,
+        None,
+        {**context(tiling_kwargs), "render_key": key},
+    )
@@ -0,0 +1,122 @@
+import inspect
+from typing import Any
+
+from django.conf import settings  # type: ignore
+from django.http import (  # type: ignore
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+)
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_formats import decode_grid
+from truchet_tiles.common.render_cost import RenderCost
+from truchet_tiles.hexagonal.tiling import (
+    estimate_hexagonal_tiling_from_grid_cost,
+    get_hexagonal_tiling_from_grid,
+)
+from truchet_tiles.rectangular.tiling import (
+    estimate_rectangular_tiling_from_grid_cost,
+    get_rectangular_tiling_from_grid,
+)
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderUnavailable,
+    admit_estimated_render,
+    get_render_executor,
+    render_unavailable_response,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import tiling_kwargs_from_query
+
+TILING_FROM_GRID_FUNCTIONS = {
+    "rect": get_rectangular_tiling_from_grid,
+    "hex": get_hexagonal_tiling_from_grid,
+}
+TILING_FROM_GRID_COST_FUNCTIONS = {
+    "rect": estimate_rectangular_tiling_from_grid_cost,
+    "hex": estimate_hexagonal_tiling_from_grid_cost,
+}
+
+
+def estimate_grid_tiling_cost(
+    kind: str, grid: PackedGrid, tiling_kwargs: dict[str, Any]
+) -> RenderCost:
+    # Predicted cost of drawing the "rect" or "hex" tiling of a grid
+    cost_function = TILING_FROM_GRID_COST_FUNCTIONS[kind]
+    parameters = inspect.signature(cost_function).parameters
+    return cost_function(
+        grid,
+        **{name: value for name, value in tiling_kwargs.items() if name in parameters},
+    )
+
+
+def _too_large_response(max_bytes: int) -> HttpResponse:
+    return HttpResponse(
+        f"grids should be at most {max_bytes} bytes",
+        status=413,
+        content_type="text/plain",
+    )
+
+
+async def tiling_upload_response(request: HttpRequest, kind: str) -> HttpResponse:
+    # The svg of the "rect" or "hex" tiling of a posted grid, either a "grid" file or
+    # a "grid_text" field, in one of the formats of truchet_tiles.common.grid_formats.
+    # The drawing options are given in the query string. Sizes are checked before the
+    # grid is read or decoded.
+    if request.method != "POST":
+        return HttpResponse(status=405, headers={"Allow": "POST"})
+
+    max_bytes = settings.GRID_UPLOAD_MAX_BYTES
+    try:
+        content_length = int(request.headers.get("Content-Length") or 0)
+    except ValueError:
+        return HttpResponseBadRequest(
+            "invalid Content-Length header", content_type="text/plain"
+        )
+
+    # NOTE: Leaves room for the multipart boundaries and the other fields, see
+    # DATA_UPLOAD_MAX_MEMORY_SIZE
+    if content_length > 2 * max_bytes:
+        return _too_large_response(max_bytes)
+
+    try:
+        tiling_kwargs = tiling_kwargs_from_query(
+            kind, request.GET.dict(), TILING_FROM_GRID_FUNCTIONS
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    upload = request.FILES.get("grid")
+    if upload is not None:
+        if upload.size > max_bytes:
+            return _too_large_response(max_bytes)
+        data = upload.read()
+    elif request.POST.get("grid_text"):
+        data = request.POST["grid_text"].encode()
+        if len(data) > max_bytes:
+            return _too_large_response(max_bytes)
+    else:
+        return HttpResponseBadRequest(
+            "post a grid file or a grid_text field", content_type="text/plain"
+        )
+
+    # NOTE: Decodes in the executor too, large run length encoded grids take a while.
+    # The size of the grid is only known once it is decoded, so renders are admitted
+    # in between, see admit_estimated_render.
+    executor = get_render_executor()
+    try:
+        grid = await executor.run(
+            decode_grid, data=data, max_dimension=settings.GRID_UPLOAD_MAX_DIMENSION
+        )
+        tiling_kwargs = admit_estimated_render(
+            lambda kwargs: estimate_grid_tiling_cost(kind, grid, kwargs),
+            tiling_kwargs,
+        )
+        svg_text = await executor.run(
+            TILING_FROM_GRID_FUNCTIONS[kind], grid=grid, **tiling_kwargs
+        )
+    except RenderUnavailable as error:
+        return render_unavailable_response(error)
+    except ValueError as error:  # e.g. an invalid grid or connector
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    return HttpResponse(svg_text, content_type="image/svg+xml")
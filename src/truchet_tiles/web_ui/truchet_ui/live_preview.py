@@ -0,0 +1,273 @@
+import asyncio
+import json
+import secrets
+import threading
+from collections.abc import AsyncIterator, Callable
+from functools import cache
+from typing import Any
+
+from django.conf import settings  # type: ignore
+from django.core.handlers.asgi import ASGIRequest  # type: ignore
+from django.http import (  # type: ignore
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.template.loader import render_to_string  # type: ignore
+
+from truchet_tiles.web_ui.truchet_ui.progressive import needs_preview, render_preview
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderUnavailable,
+    render_tiling,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    render_key,
+    tiling_kwargs_from_query,
+    tiling_query,
+)
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import RenderedSvg
+
+
+class LivePreview:
+    # The newest tiling arguments of a page and the renders of them. Updates arriving
+    # within debounce seconds of each other are rendered once, and a render that is
+    # superseded by an update before it finishes is cancelled.
+    def __init__(self, kind: str, debounce: float) -> None:
+        self._kind = kind
+        self._debounce = debounce
+        self._tiling_kwargs: dict[str, Any] | None = None
+        # Render key of the tiling whose preview the page already got elsewhere
+        self._previewed_key: str | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Event | None = None
+
+    @property
+    def tiling_kwargs(self) -> dict[str, Any] | None:
+        return self._tiling_kwargs
+
+    def update(self, tiling_kwargs: dict[str, Any], previewed: bool = False) -> None:
+        # Sets the tiling to render, previewed when the page already shows its preview
+        # NOTE: Updates come from other requests, which may run in other event loops
+        # or threads than the one rendering
+        self._previewed_key = (
+            render_key(self._kind, tiling_kwargs) if previewed else None
+        )
+        self._tiling_kwargs = tiling_kwargs
+        if self._loop is not None and self._changed is not None:
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+    async def _settled(self) -> dict[str, Any]:
+        assert self._changed is not None
+        await self._changed.wait()
+        while True:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self._debounce)
+            except asyncio.TimeoutError:
+                break
+
+        assert self._tiling_kwargs is not None
+        return self._tiling_kwargs
+
+    async def renders(
+        self,
+    ) -> AsyncIterator[tuple[dict[str, Any], RenderedSvg | Exception, bool]]:
+        # Renders of the settled updates, or the errors of the ones that failed, and
+        # whether they are final or previews
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        if self._tiling_kwargs is not None:
+            self._changed.set()
+
+        render: asyncio.Future | None = None
+        changed: asyncio.Future | None = None
+        try:
+            while True:
+                tiling_kwargs = await self._settled()
+                # NOTE: Large tilings get a preview first, see truchet_ui.progressive
+                if needs_preview(self._kind, tiling_kwargs) and (
+                    render_key(self._kind, tiling_kwargs) != self._previewed_key
+                ):
+                    stages = (False, True)
+                else:
+                    stages = (True,)
+
+                for final in stages:
+                    render = asyncio.ensure_future(
+                        render_tiling(self._kind, tiling_kwargs)
+                        if final
+                        else render_preview(self._kind, tiling_kwargs)
+                    )
+                    changed = asyncio.ensure_future(self._changed.wait())
+                    await asyncio.wait(
+                        {render, changed}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not render.done():
+                        render.cancel()  # superseded by an update
+                        break
+
+                    changed.cancel()
+                    try:
+                        result: RenderedSvg | Exception | None = render.result()
+                    except (RenderUnavailable, ValueError) as error:
+                        result = error
+
+                    if result is not None:
+                        yield tiling_kwargs, result, final
+        finally:
+            # NOTE: Cancelled renders stop at their next row, see RenderExecutor.run
+            for future in (render, changed):
+                if future is not None:
+                    future.cancel()
+
+
+class LivePreviews:
+    # Live previews of the pages connected to this worker, by channel id
+    def __init__(self, debounce: float) -> None:
+        self._debounce = debounce
+        self._previews: dict[str, LivePreview] = {}
+        self._lock = threading.Lock()
+
+    def open(self, kind: str) -> tuple[str, LivePreview]:
+        channel = secrets.token_urlsafe(16)
+        preview = LivePreview(kind, self._debounce)
+        with self._lock:
+            self._previews[channel] = preview
+
+        return channel, preview
+
+    def get(self, channel: str) -> LivePreview | None:
+        with self._lock:
+            return self._previews.get(channel)
+
+    def close(self, channel: str) -> None:
+        with self._lock:
+            self._previews.pop(channel, None)
+
+
+@cache
+def get_live_previews() -> LivePreviews:
+    return LivePreviews(settings.LIVE_PREVIEW_DEBOUNCE)
+
+
+def _event(name: str, data: dict[str, Any]) -> str:
+    # NOTE: json.dumps escapes new lines, so the data fits in a single data line
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def live_previews_enabled(request: HttpRequest) -> bool:
+    # NOTE: Live previews stream their renders for as long as the page is open. WSGI
+    # servers, e.g. runserver, hold a thread for each stream and collect async streams
+    # before sending them, so live previews are only served over ASGI.
+    return isinstance(request, ASGIRequest)
+
+
+async def _preview_events(
+    kind: str,
+    start_kwargs: dict[str, Any] | None,
+    context: Callable[[dict[str, Any]], dict[str, Any]],
+) -> AsyncIterator[str]:
+    # NOTE: The channel is opened once the response is streamed, so that responses
+    # that are never streamed leave no channel behind
+    channel, preview = get_live_previews().open(kind)
+    if start_kwargs is not None:
+        preview.update(start_kwargs)
+
+    try:
+        yield _event("channel", {"channel": channel})
+        async for tiling_kwargs, rendered, final in preview.renders():
+            if isinstance(rendered, Exception):
+                yield _event("failed", {"error": str(rendered)})
+                continue
+            if not final:
+                yield _event("preview", {"svg": rendered.text})
+                continue
+
+            tiling_context = context(tiling_kwargs)
+            yield _event(
+                "tiling",
+                {
+                    **tiling_context,
+                    "svg": rendered.text,
+                    "links": render_to_string("tiling_links.html", tiling_context),
+                },
+            )
+    finally:
+        get_live_previews().close(channel)
+
+
+def live_preview_response(
+    request: HttpRequest,
+    kind: str,
+    context: Callable[[dict[str, Any]], dict[str, Any]],
+) -> HttpResponse | StreamingHttpResponse:
+    # Server sent events of a new live preview of the "rect" or "hex" tiling. The
+    # first event gives the channel to post updates to, the others the newest render
+    # with its context or its preview, see live_update_response. A tiling query
+    # starts the live preview with the render of its tiling.
+    # NOTE: Updates have to reach the worker holding the stream, e.g. through sticky
+    # sessions when there are several workers
+    if not live_previews_enabled(request):
+        return HttpResponse(
+            "live previews need an ASGI server", status=501, content_type="text/plain"
+        )
+
+    tiling_kwargs = None
+    if request.GET:
+        try:
+            tiling_kwargs = tiling_kwargs_from_query(kind, request.GET.dict())
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    response = StreamingHttpResponse(
+        _preview_events(kind, tiling_kwargs, context),
+        content_type="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # do not buffer in nginx
+    return response
+
+
+def live_update_response(
+    request: HttpRequest, tiling_kwargs: dict[str, Any]
+) -> HttpResponse:
+    # Sets the tiling arguments of the live preview of the channel in the query
+    preview = get_live_previews().get(request.GET.get("channel", ""))
+    if preview is None:
+        return HttpResponseBadRequest(
+            "unknown live preview channel", content_type="text/plain"
+        )
+
+    preview.update(tiling_kwargs)
+    return HttpResponse(status=204)
+
+
+async def render_progressively(
+    request: HttpRequest, kind: str, tiling_kwargs: dict[str, Any]
+) -> tuple[RenderedSvg | None, str | None]:
+    # The preview of a tiling that needs one, with the full render following through
+    # the live preview of the page, and the full render otherwise. Pages posting their
+    # live preview channel get the full render on it, new pages get the query to
+    # start their live preview with. Pages served without live previews get the full
+    # render. Returns no render when the live preview of the page already has the
+    # tiling, e.g. posted by its inputs, since the page shows it or gets it on there.
+    if live_previews_enabled(request) and needs_preview(kind, tiling_kwargs):
+        channel = request.POST.get("live_channel", "")
+        live_preview = get_live_previews().get(channel) if channel else None
+        if (
+            live_preview is not None
+            and live_preview.tiling_kwargs is not None
+            and render_key(kind, live_preview.tiling_kwargs)
+            == render_key(kind, tiling_kwargs)
+        ):
+            return None, None
+        if request.method == "GET" or live_preview is not None:
+            preview = await render_preview(kind, tiling_kwargs)
+            if preview is not None and live_preview is not None:
+                live_preview.update(tiling_kwargs, previewed=True)
+                return preview, None
+            if preview is not None:
+                return preview, tiling_query(kind, tiling_kwargs)
+
+    return await render_tiling(kind, tiling_kwargs), None
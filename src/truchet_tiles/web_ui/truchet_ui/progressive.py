@@ -0,0 +1,43 @@
+from typing import Any
+
+from django.conf import settings  # type: ignore
+
+from truchet_tiles.common.lod import RASTER_DETAIL
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderUnavailable,
+    get_render_cache,
+    render_tiling,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import render_key
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import RenderedSvg
+
+# Large tilings are first shown as a raster of their fills, which only needs the grid,
+# and then replaced by the full render sent through the live preview stream, see
+# truchet_ui.live_preview. The full render reuses the grid of the preview from the
+# grid caches.
+
+
+def preview_tiling_kwargs(tiling_kwargs: dict[str, Any]) -> dict[str, Any]:
+    # NOTE: Rasters can not be animated, see LodPolicy
+    return {**tiling_kwargs, "animate": False, "lod_policy": RASTER_DETAIL}
+
+
+def needs_preview(kind: str, tiling_kwargs: dict[str, Any]) -> bool:
+    return (
+        tiling_kwargs.get("dimension", 0) >= settings.PROGRESSIVE_MIN_DIMENSION
+        and get_render_cache().get(render_key(kind, tiling_kwargs)) is None
+    )
+
+
+async def render_preview(
+    kind: str, tiling_kwargs: dict[str, Any]
+) -> RenderedSvg | None:
+    # The preview of a tiling, None when it takes more than the preview budget
+    try:
+        return await render_tiling(
+            kind,
+            preview_tiling_kwargs(tiling_kwargs),
+            budget=settings.PROGRESSIVE_PREVIEW_BUDGET,
+        )
+    except RenderUnavailable:
+        return None
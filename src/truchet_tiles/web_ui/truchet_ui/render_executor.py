@@ -0,0 +1,274 @@
+import asyncio
+import inspect
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cache
+from typing import Any
+
+from django.conf import settings  # type: ignore
+from django.http import HttpResponse  # type: ignore
+
+from truchet_tiles.common.cancel import (
+    CancelToken,
+    RenderBudgetExceeded,
+    cancel_scope,
+)
+from truchet_tiles.common.lod import RASTER_DETAIL
+from truchet_tiles.common.render_cost import RenderCost
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    TILING_COST_FUNCTIONS,
+    TILING_FUNCTIONS,
+    canonical_tiling_kwargs,
+    render_key,
+)
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import RenderedSvg
+from truchet_tiles.web_ui.truchet_ui.single_flight import SingleFlight
+
+
+class RenderUnavailable(Exception):
+    pass
+
+
+class RenderQueueFull(RenderUnavailable):
+    pass
+
+
+class RenderTimeout(RenderUnavailable):
+    pass
+
+
+class RenderRejected(RenderUnavailable):
+    pass
+
+
+def _run_cancellable(
+    token: CancelToken, func: Callable[..., Any], kwargs: dict[str, Any]
+) -> Any:
+    with cancel_scope(token):
+        return func(**kwargs)
+
+
+class RenderExecutor:
+    # Runs renders in a bounded pool, so that expensive renders neither block the event
+    # loop nor pile up without limit. At most max_workers renders run at a time and at
+    # most max_queue_depth more wait for a worker, the rest are rejected.
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue_depth: int = 16,
+        timeout: float | None = 30.0,
+    ) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError("kind should be either thread or process")
+
+        self._pool: Executor = (
+            ThreadPoolExecutor(max_workers, thread_name_prefix="render")
+            if kind == "thread"
+            else ProcessPoolExecutor(max_workers)
+        )
+        self._capacity = max_workers + max_queue_depth
+        self._timeout = timeout
+        self._pending = 0
+        # NOTE: Async views may run in event loops of different threads under WSGI
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> float | None:
+        return self._timeout
+
+    async def run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        return await self.run_with_budget(self._timeout, func, **kwargs)
+
+    async def run_with_budget(
+        self, budget: float | None, func: Callable[..., Any], **kwargs: Any
+    ) -> Any:
+        # Like run, with a timeout of budget seconds instead of the executor's
+        with self._lock:
+            if self._pending >= self._capacity:
+                raise RenderQueueFull("too many renders are waiting")
+
+            self._pending += 1
+
+        # NOTE: The timeout includes the time spent waiting for a worker. Renders check
+        # the token once per row, so timed out and cancelled renders, e.g. of clients
+        # that went away, free their worker soon after. They are counted until then.
+        token = CancelToken(budget)
+        try:
+            pool_future = self._pool.submit(_run_cancellable, token, func, kwargs)
+        except BaseException:
+            self._done()
+            raise
+
+        pool_future.add_done_callback(lambda _: self._done())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(pool_future), budget)
+        except (asyncio.TimeoutError, RenderBudgetExceeded):
+            token.cancel()
+            raise RenderTimeout("render took too long") from None
+        except asyncio.CancelledError:
+            token.cancel()
+            raise
+
+    def _done(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+class RenderCache:
+    # Recent renders of a worker by render key, least recently used ones are dropped
+    # once the svgs and their compressed variants take more than max_bytes
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._renders: OrderedDict[str, RenderedSvg] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> RenderedSvg | None:
+        with self._lock:
+            rendered = self._renders.get(key)
+            if rendered is not None:
+                self._renders.move_to_end(key)
+
+            return rendered
+
+    def put(self, key: str, rendered: RenderedSvg) -> None:
+        with self._lock:
+            if key in self._renders or rendered.size > self._max_bytes:
+                return
+
+            self._renders[key] = rendered
+            self._size += rendered.size
+            while self._size > self._max_bytes:
+                _, dropped = self._renders.popitem(last=False)
+                self._size -= dropped.size
+
+
+@cache
+def get_render_cache() -> RenderCache:
+    return RenderCache(settings.RENDER_CACHE_MAX_BYTES)
+
+
+@cache
+def get_single_flight() -> SingleFlight:
+    return SingleFlight(settings.SINGLE_FLIGHT_DIR, settings.RENDER_TIMEOUT)
+
+
+def estimate_tiling_cost(
+    kind: str, tiling_kwargs: dict[str, Any], output_format: str = "svg"
+) -> RenderCost:
+    # Predicted cost of rendering a "rect" or "hex" tiling and its output format
+    cost_function = TILING_COST_FUNCTIONS[kind]
+    parameters = inspect.signature(cost_function).parameters
+    arguments = canonical_tiling_kwargs(kind, tiling_kwargs)
+    return cost_function(
+        **{name: value for name, value in arguments.items() if name in parameters},
+        output_format=output_format,
+    )
+
+
+def fits_render_budget(cost: RenderCost, budget: float | None = None) -> bool:
+    # Whether a render of the cost fits the render budgets, and budget seconds when it
+    # is smaller
+    seconds = settings.RENDER_BUDGET_SECONDS
+    if budget is not None:
+        seconds = min(seconds, budget)
+
+    return cost.seconds <= seconds and cost.memory <= settings.RENDER_BUDGET_BYTES
+
+
+def admit_estimated_render(
+    estimate: Callable[[dict[str, Any]], RenderCost],
+    tiling_kwargs: dict[str, Any],
+    budget: float | None = None,
+) -> dict[str, Any]:
+    # Arguments to render a tiling with within the render budgets, or within budget
+    # seconds when it is smaller, given the estimate of the cost of arguments. Tilings
+    # over the budgets are drawn as rasters when that fits, and rejected with
+    # RenderRejected before any work starts otherwise.
+    if fits_render_budget(estimate(tiling_kwargs), budget):
+        return tiling_kwargs
+
+    # NOTE: Animated tilings are never rasters, see LodPolicy
+    raster_kwargs = {**tiling_kwargs, "lod_policy": RASTER_DETAIL}
+    if fits_render_budget(estimate(raster_kwargs), budget):
+        return raster_kwargs
+
+    raise RenderRejected("tiling is too expensive to render, submit a render job")
+
+
+def admit_render(
+    kind: str,
+    tiling_kwargs: dict[str, Any],
+    output_format: str = "svg",
+    budget: float | None = None,
+) -> dict[str, Any]:
+    # Arguments to render a "rect" or "hex" tiling with, see admit_estimated_render
+    return admit_estimated_render(
+        lambda kwargs: estimate_tiling_cost(kind, kwargs, output_format),
+        tiling_kwargs,
+        budget,
+    )
+
+
+def _render_svg(kind: str, tiling_kwargs: dict[str, Any]) -> bytes:
+    # NOTE: Runs in the executor, so compressing does not block the event loop either
+    svg_text = TILING_FUNCTIONS[kind](**tiling_kwargs)
+    return RenderedSvg.from_text(svg_text).to_bytes()
+
+
+async def render_tiling(
+    kind: str, tiling_kwargs: dict[str, Any], budget: float | None = None
+) -> RenderedSvg:
+    # Renders a "rect" or "hex" tiling in the executor, within budget seconds when
+    # given instead of the render timeout. Recent renders come from the render cache
+    # and identical renders that are already running are waited for instead of being
+    # started again. Renders over the render budgets are downgraded or rejected, see
+    # admit_render.
+    key = render_key(kind, tiling_kwargs)
+    rendered = get_render_cache().get(key)
+    if rendered is None:
+        tiling_kwargs = admit_render(kind, tiling_kwargs, budget=budget)
+        key = render_key(kind, tiling_kwargs)
+        rendered = get_render_cache().get(key)
+
+    if rendered is None:
+        executor = get_render_executor()
+        data = await get_single_flight().run(
+            key,
+            lambda: executor.run_with_budget(
+                executor.timeout if budget is None else budget,
+                _render_svg,
+                kind=kind,
+                tiling_kwargs=tiling_kwargs,
+            ),
+        )
+        rendered = RenderedSvg.from_bytes(data)
+        get_render_cache().put(key, rendered)
+
+    return rendered
+
+
+@cache
+def get_render_executor() -> RenderExecutor:
+    return RenderExecutor(
+        kind=settings.RENDER_EXECUTOR,
+        max_workers=settings.RENDER_MAX_WORKERS,
+        max_queue_depth=settings.RENDER_MAX_QUEUE_DEPTH,
+        timeout=settings.RENDER_TIMEOUT,
+    )
+
+
+def render_unavailable_response(error: RenderUnavailable) -> HttpResponse:
+    # NOTE: Rejected renders are rejected again when retried
+    if isinstance(error, RenderRejected):
+        return HttpResponse(str(error), status=422, content_type="text/plain")
+
+    return HttpResponse(
+        str(error),
+        status=503,
+        content_type="text/plain",
+        headers={"Retry-After": str(settings.RENDER_RETRY_AFTER)},
+    )
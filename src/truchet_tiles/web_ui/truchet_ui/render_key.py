@@ -0,0 +1,180 @@
+import hashlib
+import inspect
+import json
+import math
+from collections.abc import Callable, Mapping
+from typing import Any
+from urllib.parse import urlencode
+
+from django import forms  # type: ignore
+
+from truchet_tiles.common.render_cost import RenderCost
+from truchet_tiles.common.tiling_data import TilingData
+from truchet_tiles.hexagonal.grid_generator import (
+    SEEDED_GRID_TYPES as HEX_SEEDED_GRID_TYPES,
+)
+from truchet_tiles.hexagonal.tiling import (
+    estimate_hexagonal_tiling_cost,
+    get_hexagonal_tiling,
+    get_hexagonal_tiling_data,
+)
+from truchet_tiles.rectangular.grid.generator import (
+    SEEDED_GRID_TYPES as RECT_SEEDED_GRID_TYPES,
+)
+from truchet_tiles.rectangular.tiling import (
+    estimate_rectangular_tiling_cost,
+    get_rectangular_tiling,
+    get_rectangular_tiling_data,
+)
+from truchet_tiles.web_ui.hexagonal_tiling.forms import HexTilingForm
+from truchet_tiles.web_ui.rectangular_tiling.forms import RectTilingForm
+
+# Bump when the same arguments start rendering a different svg
+RENDER_KEY_VERSION = 3
+
+TILING_FUNCTIONS: dict[str, Callable[..., str | None]] = {
+    "rect": get_rectangular_tiling,
+    "hex": get_hexagonal_tiling,
+}
+
+TILING_DATA_FUNCTIONS: dict[str, Callable[..., TilingData]] = {
+    "rect": get_rectangular_tiling_data,
+    "hex": get_hexagonal_tiling_data,
+}
+
+TILING_COST_FUNCTIONS: dict[str, Callable[..., RenderCost]] = {
+    "rect": estimate_rectangular_tiling_cost,
+    "hex": estimate_hexagonal_tiling_cost,
+}
+
+# Query arguments are held to the bounds of the fields of the same name in the forms
+_TILING_FORMS: dict[str, type[forms.Form]] = {
+    "rect": RectTilingForm,
+    "hex": HexTilingForm,
+}
+
+_SEEDED_GRID_TYPES = {"rect": RECT_SEEDED_GRID_TYPES, "hex": HEX_SEEDED_GRID_TYPES}
+
+
+def canonical_tiling_kwargs(kind: str, tiling_kwargs: dict[str, Any]) -> dict[str, Any]:
+    # All arguments of the tiling function with defaults filled in, floats as floats
+    # and the seed zeroed for grids that do not use it, so that every way of asking
+    # for the same svg gives the same arguments
+    signature = inspect.signature(TILING_FUNCTIONS[kind])
+    bound = signature.bind(**tiling_kwargs)
+    bound.apply_defaults()
+
+    arguments = dict(bound.arguments)
+    for name, value in arguments.items():
+        if signature.parameters[name].annotation is float:
+            arguments[name] = float(value)
+
+    arguments["function"] = arguments["function"].lower()
+    if arguments["function"] not in _SEEDED_GRID_TYPES[kind]:
+        arguments["rand_seed"] = 0
+
+    return arguments
+
+
+def render_key(kind: str, tiling_kwargs: dict[str, Any]) -> str:
+    arguments = canonical_tiling_kwargs(kind, tiling_kwargs)
+    text = json.dumps(
+        [RENDER_KEY_VERSION, kind, arguments], sort_keys=True, default=repr
+    )
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# Annotations of the arguments that can be given in a query string
+_QUERY_ANNOTATIONS = (bool, int, float, str, str | None)
+
+
+def _parse_query_value(name: str, annotation: Any, text: str) -> Any:
+    if annotation is bool:
+        if text.lower() in ("1", "true", "on", "yes"):
+            return True
+        if text.lower() in ("", "0", "false", "off", "no"):
+            return False
+    elif annotation is int:
+        return int(text)
+    elif annotation is float:
+        value = float(text)
+        if math.isfinite(value):
+            return value
+    elif annotation == str | None:
+        return None if text.lower() in ("", "none") else text
+    elif annotation is str:
+        return text
+    else:
+        raise ValueError(f"{name} can not be given in the query")
+
+    raise ValueError(f"invalid value for {name}: {text}")
+
+
+def _check_query_value(kind: str, name: str, value: Any) -> None:
+    # NOTE: The dimension is bounded by each view, and the edge length, which the
+    # forms derive from the image height, only by the largest image height
+    fields = _TILING_FORMS[kind].base_fields
+    if name == "edge_length":
+        max_height = fields["image_height"].max_value
+        if not 0 < value <= max_height:
+            raise ValueError(f"edge_length should be above 0 and at most {max_height}")
+        return
+
+    field = fields.get(name)
+    if name == "dimension" or field is None or value is None:
+        return
+
+    if isinstance(field, (forms.IntegerField, forms.FloatField)):
+        if not field.min_value <= value <= field.max_value:
+            raise ValueError(
+                f"{name} should be between {field.min_value} and {field.max_value}"
+            )
+    elif isinstance(field, forms.ChoiceField):
+        choices = {str(choice).lower() for choice, _ in field.choices if choice}
+        if value.lower() not in choices:
+            raise ValueError(f"invalid value for {name}: {value}")
+    elif (
+        isinstance(field, forms.CharField)
+        and field.max_length is not None
+        and len(value) > field.max_length
+    ):
+        raise ValueError(f"{name} should be at most {field.max_length} characters")
+
+
+def tiling_kwargs_from_query(
+    kind: str,
+    query: Mapping[str, str],
+    functions: Mapping[str, Callable[..., Any]] = TILING_FUNCTIONS,
+) -> dict[str, Any]:
+    # Arguments of the tiling function, or of another function of the kind, given in a
+    # query string, the rest keep their defaults. Raises ValueError for unknown
+    # arguments and for invalid values or values out of the bounds of the forms.
+    parameters = inspect.signature(functions[kind]).parameters
+    tiling_kwargs = {}
+    for name, text in query.items():
+        if name not in parameters:
+            raise ValueError(f"unknown parameter {name}")
+
+        tiling_kwargs[name] = _parse_query_value(
+            name, parameters[name].annotation, text
+        )
+        _check_query_value(kind, name, tiling_kwargs[name])
+
+    return tiling_kwargs
+
+
+def tiling_query(kind: str, tiling_kwargs: dict[str, Any]) -> str:
+    # Query string of the canonical arguments, the inverse of tiling_kwargs_from_query
+    parameters = inspect.signature(TILING_FUNCTIONS[kind]).parameters
+    arguments = canonical_tiling_kwargs(kind, tiling_kwargs)
+    query = {}
+    for name, value in arguments.items():
+        if parameters[name].annotation not in _QUERY_ANNOTATIONS:
+            if value != parameters[name].default:
+                raise ValueError(f"{name} can not be given in the query")
+        elif isinstance(value, bool):
+            query[name] = "true" if value else "false"
+        else:
+            query[name] = "" if value is None else str(value)
+
+    return urlencode(query)
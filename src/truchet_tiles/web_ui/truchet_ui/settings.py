@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     "main_page",
     "rectangular_tiling",
     "hexagonal_tiling",
+    "render_jobs",
 ]
 
 MIDDLEWARE = [
@@ -126,3 +128,55 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# On-disk grid cache shared by all workers, see truchet_tiles.common.grid_cache
+GRID_CACHE_DIR = BASE_DIR / "grid_cache"
+GRID_CACHE_MAX_BYTES = 1 << 30
+
+# Namespace to share grids in memory between the workers of a host, e.g. "truchet_ui",
+# on platforms with POSIX shared memory, see truchet_tiles.common.grid_store
+SHARED_GRID_STORE = None
+SHARED_GRID_STORE_MAX_BYTES = 1 << 30
+
+# Renders run in a bounded pool, see truchet_ui.render_executor
+RENDER_EXECUTOR = "thread"  # or "process"
+RENDER_MAX_WORKERS = 4
+RENDER_MAX_QUEUE_DEPTH = 16
+RENDER_TIMEOUT = 30.0  # seconds
+RENDER_RETRY_AFTER = 5  # seconds
+# Renders predicted to take more are drawn as rasters or rejected, see
+# truchet_tiles.common.render_cost
+RENDER_BUDGET_SECONDS = 20.0
+RENDER_BUDGET_BYTES = 1 << 30
+
+# Recent renders of a worker, with their gzip and brotli variants
+RENDER_CACHE_MAX_BYTES = 64 << 20
+
+# Live preview updates arriving within this many seconds are rendered once, see
+# truchet_ui.live_preview
+LIVE_PREVIEW_DEBOUNCE = 0.15
+
+# Tilings of at least this dimension are first shown as a raster preview, if it
+# renders within the budget, see truchet_ui.progressive
+PROGRESSIVE_MIN_DIMENSION = 256
+PROGRESSIVE_PREVIEW_BUDGET = 0.5  # seconds
+
+# Heavy renders run as jobs in worker processes, see render_jobs.jobs. Jobs predicted
+# to take longer than the timeout or more than the memory budget are rejected.
+RENDER_JOB_DIR = BASE_DIR / "render_jobs_output"
+RENDER_JOB_WORKERS = 2
+RENDER_JOB_MAX_DIMENSION = 4096
+RENDER_JOB_TIMEOUT = 30 * 60.0  # seconds
+RENDER_JOB_BUDGET_BYTES = 8 << 30
+RENDER_JOB_PROGRESS_INTERVAL = 0.5  # seconds
+# Finished jobs and their outputs are removed after this long
+RENDER_JOB_MAX_AGE = 24 * 60 * 60.0  # seconds
+
+# Limits of the grids posted to the upload views, see truchet_ui.grid_upload
+GRID_UPLOAD_MAX_DIMENSION = 4096
+GRID_UPLOAD_MAX_BYTES = 4 << 20
+# Posted fields are read into memory, grid_text fields up to the grid limit included
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2 * GRID_UPLOAD_MAX_BYTES
+
+# Identical concurrent renders of all workers are coalesced through files in here
+SINGLE_FLIGHT_DIR = Path(tempfile.gettempdir()) / "truchet_ui_single_flight"
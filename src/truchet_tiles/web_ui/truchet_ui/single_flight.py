@@ -0,0 +1,144 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TextIO
+
+try:
+    import fcntl
+except ImportError:  # not a POSIX platform, renders are only coalesced in-process
+    fcntl = None  # type: ignore
+
+# Results are handed over to the waiting workers through files kept this long
+RESULT_TTL = 60.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+class SingleFlight:
+    # Coalesces identical concurrent renders. The first caller for a key renders it and
+    # the others wait for its result, across the threads and event loops of a process
+    # through futures, and across worker processes through a lock file per key. The
+    # worker holding the lock leaves its result in a file for the ones waiting on it.
+    # Workers wait for the lock at most lock_timeout seconds, then render themselves.
+    def __init__(
+        self, directory: str | os.PathLike, lock_timeout: float | None = None
+    ) -> None:
+        self._directory = Path(directory)
+        self._lock_timeout = lock_timeout
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._flights: dict[str, Future] = {}
+
+    async def run(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if future is None:
+                future = self._flights[key] = Future()
+
+        if not leader:
+            # NOTE: Shielded, so that a cancelled waiter does not cancel the render the
+            # others wait for. A cancelled leader leaves the render to a waiter.
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    return await self.run(key, render)
+                raise
+
+        try:
+            result = await self._run_across_workers(key, render)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+        return result
+
+    async def _run_across_workers(
+        self, key: str, render: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        if fcntl is None:
+            return await render()
+
+        result_path = self._directory / f"{key}.result"
+        lock = self._open_lock(key)
+        try:
+            # NOTE: A worker holding the lock longer than lock_timeout is likely stuck,
+            # waiting workers go on without the lock then
+            deadline = None
+            if self._lock_timeout is not None:
+                deadline = time.monotonic() + self._lock_timeout
+            while not self._try_lock(lock):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+            # NOTE: Renders are deterministic, so a recent result of the key is the
+            # render of a worker that held the lock meanwhile or just before
+            result = self._read_recent_result(result_path)
+            if result is None:
+                result = await render()
+                self._write_result(result_path, result)
+
+            return result
+        finally:
+            # Closing the file releases the lock
+            lock.close()
+
+    def _open_lock(self, key: str) -> TextIO:
+        return open(self._directory / f"{key}.lock", "w")
+
+    def _try_lock(self, lock: TextIO) -> bool:
+        assert fcntl is not None
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+
+        return True
+
+    def _read_recent_result(self, result_path: Path) -> bytes | None:
+        try:
+            if time.time() - result_path.stat().st_mtime < RESULT_TTL:
+                return result_path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        return None
+
+    def _write_result(self, result_path: Path, result: bytes) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(result)
+        os.replace(temp_path, result_path)
+
+        # NOTE: Results are only needed by the workers waiting at the time they are
+        # written, old ones are removed while writing new ones. Lock files are only
+        # removed while no worker holds them.
+        expired = time.time() - RESULT_TTL
+        for path in self._directory.iterdir():
+            try:
+                if path.stat().st_mtime >= expired:
+                    continue
+
+                if path.suffix != ".lock":
+                    path.unlink()
+                    continue
+
+                with open(path) as lock:
+                    if self._try_lock(lock):
+                        path.unlink()
+            except FileNotFoundError:
+                continue
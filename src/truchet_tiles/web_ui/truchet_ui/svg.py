@@ -0,0 +1,201 @@
+from collections.abc import Iterator
+
+from django.http import (  # type: ignore
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase  # type: ignore
+from django.utils.cache import (  # type: ignore
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderUnavailable,
+    admit_render,
+    get_render_executor,
+    render_tiling,
+    render_unavailable_response,
+)
+from truchet_tiles.web_ui.truchet_ui.render_key import (
+    render_key,
+    tiling_kwargs_from_query,
+)
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import (
+    BROTLI_AVAILABLE,
+    RenderedSvg,
+    svg_to_png,
+)
+
+# NOTE: The same query always renders the same svg, random tilings included as the
+# seed is part of the query, so responses never go stale
+SVG_MAX_AGE = 365 * 24 * 60 * 60
+# Responses of tilings drawn as rasters to fit the render budgets, see _tiling_response
+DOWNGRADED_SVG_MAX_AGE = 5 * 60
+
+
+def _accepted_encodings(request: HttpRequest) -> set[str]:
+    encodings = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        try:
+            quality = float(params.strip().removeprefix("q=")) if params else 1.0
+        except ValueError:
+            continue
+
+        if quality > 0:
+            encodings.add(coding.strip().lower())
+
+    return encodings
+
+
+def _svg_encoding(request: HttpRequest) -> str:
+    # The best content encoding the client accepts
+    encodings = _accepted_encodings(request)
+    if BROTLI_AVAILABLE and encodings & {"br", "*"}:
+        return "br"
+    if encodings & {"gzip", "*"}:
+        return "gzip"
+
+    return ""
+
+
+# Content types of the variants of a render, see _tiling_response
+_CONTENT_TYPES = {"png": "image/png"}
+_CONTENT_ENCODINGS = ("br", "gzip")
+_DOWNLOAD_VARIANTS = {"svg": "", "svgz": "svgz", "png": "png"}
+# Downloads are streamed in chunks of this many bytes
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+
+async def _variant_content(rendered: RenderedSvg, variant: str) -> bytes:
+    match variant:
+        case "br":
+            assert rendered.brotli is not None
+            return rendered.brotli
+        case "gzip" | "svgz":
+            return rendered.gzip
+        case "png":
+            return await get_render_executor().run(svg_to_png, svg_text=rendered.text)
+        case _:
+            return rendered.text.encode()
+
+
+def _chunks(content: bytes) -> Iterator[bytes]:
+    view = memoryview(content)
+    for start in range(0, len(view), DOWNLOAD_CHUNK_SIZE):
+        yield view[start : start + DOWNLOAD_CHUNK_SIZE]
+
+
+async def _tiling_response(
+    request: HttpRequest,
+    query: dict[str, str],
+    kind: str,
+    max_dimension: int,
+    variant: str,
+    download: bool = False,
+) -> HttpResponseBase:
+    # Responds with a variant of the "rect" or "hex" tiling given in the query, "" for
+    # the svg, "br" or "gzip" for the encoded svg, "svgz" for the gzipped file and "png"
+    # for the rasterized svg. The ETag is the render key, so revalidation does not
+    # need a render. Downloads are streamed as attachments.
+    try:
+        tiling_kwargs = tiling_kwargs_from_query(kind, query)
+        render_key(kind, tiling_kwargs)  # checks the arguments
+    except (TypeError, ValueError) as error:
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    if not 0 < tiling_kwargs.get("dimension", 1) <= max_dimension:
+        return HttpResponseBadRequest(
+            f"dimension should be between 1 and {max_dimension}",
+            content_type="text/plain",
+        )
+
+    # NOTE: The ETag is the key of the render that is sent, which is a raster for
+    # tilings over the render budgets, see admit_render. Rasterizing pngs has its own
+    # cost.
+    try:
+        admitted_kwargs = admit_render(
+            kind, tiling_kwargs, "png" if variant == "png" else "svg"
+        )
+    except RenderUnavailable as error:
+        return render_unavailable_response(error)
+    except ValueError as error:  # e.g. an unknown function
+        return HttpResponseBadRequest(str(error), content_type="text/plain")
+
+    key = render_key(kind, admitted_kwargs)
+    # NOTE: Variants are different representations, so each has its own ETag
+    etag = f'"{key}-{variant}"' if variant else f'"{key}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            rendered = await render_tiling(kind, admitted_kwargs)
+            content = await _variant_content(rendered, variant)
+        except RenderUnavailable as error:
+            return render_unavailable_response(error)
+        except ValueError as error:  # e.g. an unknown function or connector
+            return HttpResponseBadRequest(str(error), content_type="text/plain")
+        except (ImportError, OSError):  # cairosvg or its cairo library is missing
+            return HttpResponse(
+                "png downloads need cairosvg", status=501, content_type="text/plain"
+            )
+
+        content_type = _CONTENT_TYPES.get(variant, "image/svg+xml")
+        if download:
+            response = StreamingHttpResponse(
+                _chunks(content), content_type=content_type
+            )
+            response.headers["Content-Length"] = str(len(content))
+            extension = variant or "svg"
+            response.headers["Content-Disposition"] = (
+                f'attachment; filename="{kind}-tiling.{extension}"'
+            )
+        else:
+            response = HttpResponse(content, content_type=content_type)
+
+        if variant in _CONTENT_ENCODINGS:
+            response.headers["Content-Encoding"] = variant
+
+    response.headers["ETag"] = etag
+    # NOTE: Tilings drawn as rasters to fit the render budgets are drawn in full once
+    # the budgets allow it, so their responses are not kept for long
+    if admitted_kwargs == tiling_kwargs:
+        patch_cache_control(response, public=True, max_age=SVG_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=DOWNGRADED_SVG_MAX_AGE)
+    return response
+
+
+async def tiling_svg_response(
+    request: HttpRequest, kind: str, max_dimension: int
+) -> HttpResponseBase:
+    # The svg, compressed with the best encoding the client accepts
+    response = await _tiling_response(
+        request, request.GET.dict(), kind, max_dimension, _svg_encoding(request)
+    )
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+async def tiling_download_response(
+    request: HttpRequest, kind: str, max_dimension: int
+) -> HttpResponseBase:
+    # The svg, svgz or png file chosen by the format parameter of the query
+    query = request.GET.dict()
+    file_format = query.pop("format", "svg")
+    if file_format not in _DOWNLOAD_VARIANTS:
+        return HttpResponseBadRequest(
+            "format should be one of svg, svgz and png", content_type="text/plain"
+        )
+
+    return await _tiling_response(
+        request,
+        query,
+        kind,
+        max_dimension,
+        _DOWNLOAD_VARIANTS[file_format],
+        download=True,
+    )
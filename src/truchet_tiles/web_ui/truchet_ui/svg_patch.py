@@ -0,0 +1,223 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from django.http import HttpRequest, HttpResponse, JsonResponse  # type: ignore
+from django.shortcuts import render  # type: ignore
+
+from truchet_tiles.web_ui.truchet_ui.render_executor import get_render_cache
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import RenderedSvg
+
+TURBO_STREAM_CONTENT_TYPE = "text/vnd.turbo-stream.html"
+
+# Patches changing more than this ratio of the tiles are sent as whole svgs
+MAX_PATCHED_TILE_RATIO = 0.75
+
+# Id of the group the drawers put the tiles into
+TILE_GROUP_ID = "truchet_group"
+
+_TILE = re.compile(r'<use xlink:href="#([^"]+)" x="([^"]+)" y="([^"]+)" />')
+_ID = re.compile(r' id="([^"]+)"')
+
+
+@dataclass(frozen=True)
+class SvgPatch:
+    # The base tiles and tiles that changed between two renders. Base tiles are named
+    # after their content, since the ids drawsvg gives them depend on the order they
+    # are first used in. Tiles are named after their position.
+    defs: dict[str, str]
+    tiles: list[tuple[str, str, str]]  # x, y and base tile id
+
+    def tile_elements(self) -> list[str]:
+        return [
+            f'<use xlink:href="#{href}" x="{x}" y="{y}" />' for x, y, href in self.tiles
+        ]
+
+
+@dataclass
+class _TilingParts:
+    frame: list[str]  # lines of everything but the base tiles and the tiles
+    defs: dict[str, str]  # base tiles by content id
+    tiles: dict[tuple[str, str], str]  # content ids of the tiles by position
+
+
+def _content_id(content: str) -> str:
+    # Id of an element after its content, without its own id
+    return f"tile_{hashlib.sha1(content.encode()).hexdigest()[:16]}"
+
+
+def _split_elements(lines: list[str], start: int) -> tuple[list[list[str]], int]:
+    # Top level elements starting at lines[start], up to the closing tag of their parent
+    elements = []
+    i = start
+    while not lines[i].startswith("</"):
+        first, depth = i, 0
+        while True:
+            line = lines[i]
+            i += 1
+            if line.startswith("</"):
+                depth -= 1
+            elif not line.endswith("/>") and "</" not in line:
+                depth += 1
+
+            if depth == 0:
+                break
+
+        elements.append(lines[first:i])
+
+    return elements, i
+
+
+def _split_tiling(svg_text: str) -> _TilingParts:
+    # NOTE: Relies on drawsvg writing every tag on its own line, with the base tiles
+    # and the tile group in the defs
+    lines = svg_text.splitlines()
+    frame: list[str | tuple[str, str]] = []
+    elements: dict[str, str] = {}
+    tile_hrefs: dict[tuple[str, str], str] = {}
+
+    i = 0
+    while i < len(lines):
+        frame.append(lines[i])
+        i += 1
+        if lines[i - 1] != "<defs>":
+            continue
+
+        defs, i = _split_elements(lines, i)
+        for element in defs:
+            match = _ID.search(element[0])
+            if match is None:
+                frame.extend(element)
+            elif match.group(1) == TILE_GROUP_ID:
+                frame.append(element[0])
+                for line in element[1:-1]:
+                    tile = _TILE.fullmatch(line)
+                    if tile is None:
+                        frame.append(line)
+                    else:
+                        tile_hrefs[(tile.group(2), tile.group(3))] = tile.group(1)
+                frame.append(element[-1])
+            else:
+                elements[match.group(1)] = "\n".join(element)
+                frame.append(("def", match.group(1)))
+
+    # Elements not used by tiles, like masks, stay in the frame
+    used = set(tile_hrefs.values())
+    content_ids = {
+        element_id: _content_id(element.replace(f' id="{element_id}"', "", 1))
+        for element_id, element in elements.items()
+        if element_id in used
+    }
+    return _TilingParts(
+        frame=[
+            line if isinstance(line, str) else elements[line[1]]
+            for line in frame
+            if isinstance(line, str) or line[1] not in used
+        ],
+        defs={
+            content_ids[element_id]: element.replace(
+                f' id="{element_id}"', f' id="{content_ids[element_id]}"', 1
+            )
+            for element_id, element in elements.items()
+            if element_id in used
+        },
+        tiles={
+            position: content_ids.get(href, href)
+            for position, href in tile_hrefs.items()
+        },
+    )
+
+
+def base_tile_def(base_tile_svg: str) -> tuple[str, str]:
+    # The content id and the def element of a base tile of TilingData, the same as
+    # svg_patch gives for that base tile in a render
+    lines = base_tile_svg.splitlines()
+    start = lines.index("</defs>") + 1
+    element = "\n".join(lines[start : lines.index("</svg>")])
+    content_id = _content_id(element)
+    tag_end = element.index(">")
+    return content_id, f'{element[:tag_end]} id="{content_id}"{element[tag_end:]}'
+
+
+def svg_patch(old_svg: str, new_svg: str) -> SvgPatch | None:
+    # The patch turning the old render into the new one, None when anything but the
+    # tiles changed or when the new svg is cheaper to send
+    try:
+        old, new = _split_tiling(old_svg), _split_tiling(new_svg)
+    except IndexError:  # not an svg of the drawers
+        return None
+
+    if old.frame != new.frame or old.tiles.keys() != new.tiles.keys():
+        return None
+
+    tiles = [
+        (x, y, href) for (x, y), href in new.tiles.items() if old.tiles[(x, y)] != href
+    ]
+    if len(tiles) > MAX_PATCHED_TILE_RATIO * len(new.tiles):
+        return None
+
+    hrefs = {href for _, _, href in tiles}
+    return SvgPatch(
+        defs={
+            content_id: element
+            for content_id, element in new.defs.items()
+            if content_id in hrefs
+        },
+        tiles=tiles,
+    )
+
+
+def get_patch_format(request: HttpRequest) -> str | None:
+    # Diff mode is asked for by posting the render key of the svg shown on the page,
+    # either by Turbo or by accepting json
+    if request.method != "POST" or not request.POST.get("render_key"):
+        return None
+
+    accept = request.headers.get("Accept", "")
+    if TURBO_STREAM_CONTENT_TYPE in accept:
+        return "turbo_stream"
+    if "application/json" in accept:
+        return "json"
+
+    return None
+
+
+def tiling_patch_response(
+    request: HttpRequest,
+    patch_format: str,
+    rendered: RenderedSvg,
+    context: dict[str, Any],
+) -> HttpResponse:
+    # Sends only the changed tiles and base tiles when the previous render is still in
+    # the render cache, and the whole svg otherwise
+    previous = get_render_cache().get(request.POST["render_key"])
+    patch = svg_patch(previous.text, rendered.text) if previous is not None else None
+    return patch_response(request, patch_format, patch, rendered.text, context)
+
+
+def patch_response(
+    request: HttpRequest,
+    patch_format: str,
+    patch: SvgPatch | None,
+    svg_text: str | None,
+    context: dict[str, Any],
+) -> HttpResponse:
+    # Sends the patch, or the whole svg when there is no patch
+    if patch_format == "json":
+        data = {key: context[key] for key in ("render_key", "svg_url", "download_url")}
+        if patch is None:
+            data["svg"] = svg_text
+        else:
+            data["defs"] = patch.defs
+            data["tiles"] = [
+                {"x": x, "y": y, "href": f"#{href}"} for x, y, href in patch.tiles
+            ]
+        return JsonResponse(data)
+
+    return render(
+        request,
+        "tiling_stream.html",
+        context={**context, "svg_text": svg_text, "patch": patch},
+        content_type=TURBO_STREAM_CONTENT_TYPE,
+    )
@@ -20,5 +20,6 @@ from django.urls import include, path
 urlpatterns = [
     path("rect/", include("rectangular_tiling.urls")),
     path("hex/", include("hexagonal_tiling.urls")),
+    path("jobs/", include("render_jobs.urls")),
     path("", include("main_page.urls")),
 ]
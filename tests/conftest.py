@@ -0,0 +1,29 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+WEB_UI_DIR = Path(__file__).parents[1] / "src" / "truchet_tiles" / "web_ui"
+
+
+@pytest.fixture(scope="session")
+def django_app():
+    # Sets up the web UI with the test settings, like manage.py run in web_ui
+    sys.path.insert(0, str(WEB_UI_DIR))
+    os.environ["DJANGO_SETTINGS_MODULE"] = "web_ui_settings"
+
+    import django  # type: ignore
+    from django.core.management import call_command  # type: ignore
+    from django.test.utils import setup_test_environment  # type: ignore
+
+    django.setup()
+    setup_test_environment()
+    call_command("migrate", verbosity=0)
+
+
+@pytest.fixture
+def client(django_app):
+    from django.test import Client  # type: ignore
+
+    return Client()
@@ -0,0 +1,52 @@
+import pytest
+
+from truchet_tiles.common.cancel import (
+    CancelToken,
+    RenderBudgetExceeded,
+    RenderCancelled,
+    cancel_scope,
+)
+from truchet_tiles.hexagonal.tiling import get_hexagonal_tiling
+from truchet_tiles.rectangular.tiling import get_rectangular_tiling
+
+
+@pytest.mark.parametrize(
+    ("get_tiling", "dimension"),
+    [(get_rectangular_tiling, 23), (get_hexagonal_tiling, 11)],
+)
+def test_cancelled_renders_stop(get_tiling, dimension):
+    token = CancelToken()
+    token.cancel()
+
+    with cancel_scope(token), pytest.raises(RenderCancelled):
+        get_tiling(function="RANDOM", dimension=dimension, rand_seed=41)
+
+
+@pytest.mark.parametrize(
+    ("get_tiling", "dimension"),
+    [(get_rectangular_tiling, 23), (get_hexagonal_tiling, 11)],
+)
+def test_renders_out_of_time_stop(get_tiling, dimension):
+    with cancel_scope(CancelToken(0.0)), pytest.raises(RenderBudgetExceeded):
+        get_tiling(function="RANDOM", dimension=dimension, rand_seed=42)
+
+
+def test_stopped_renders_are_not_cached():
+    token = CancelToken()
+    token.cancel()
+    with cancel_scope(token), pytest.raises(RenderCancelled):
+        get_rectangular_tiling(function="RANDOM", dimension=23, rand_seed=43)
+
+    svg_text = get_rectangular_tiling(function="RANDOM", dimension=23, rand_seed=43)
+
+    # The tiles and the use of their group
+    assert svg_text.count("<use ") == 23 * 23 + 1
+
+
+def test_renders_outside_of_scopes_are_not_checked():
+    token = CancelToken()
+    token.cancel()
+    with cancel_scope(token):
+        pass
+
+    assert get_rectangular_tiling(function="RANDOM", dimension=23, rand_seed=44)
@@ -0,0 +1,46 @@
+import base64
+
+from truchet_tiles.common.grid_file import read_grid_buffer
+from truchet_tiles.rectangular.tiling import get_rectangular_tiling_data
+
+DATA_URL = "/rect/data?dimension=12&connector=curved"
+
+
+def test_data_holds_the_grid_fills_and_base_tiles(client):
+    response = client.get(DATA_URL)
+
+    data = get_rectangular_tiling_data(dimension=12, connector="curved")
+    window = data.grid.window
+    assert response.status_code == 200
+    assert response.json()["dimension"] == 12
+    assert response.json()["window"] == [
+        window.row_start,
+        window.row_stop,
+        window.col_start,
+        window.col_stop,
+    ]
+    assert base64.b64decode(response.json()["grid"]) == bytes(data.grid.data)
+    assert base64.b64decode(response.json()["fill"]) == bytes(data.fill.data)
+    assert response.json()["base_tiles"] == data.base_tiles
+
+
+def test_grid_and_fill_are_served_as_grid_files(client):
+    data = get_rectangular_tiling_data(dimension=12, connector="curved")
+
+    for data_format, grid in (("grid", data.grid), ("fill", data.fill)):
+        response = client.get(f"{DATA_URL}&format={data_format}")
+
+        served = read_grid_buffer(memoryview(response.content))
+        assert served.window == grid.window
+        assert bytes(served.data) == bytes(grid.data)
+
+
+def test_data_of_matching_etag_is_not_modified(client):
+    etag = client.get(DATA_URL).headers["ETag"]
+
+    assert client.get(DATA_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(f"{DATA_URL}&format=grid").headers["ETag"] != etag
+
+
+def test_data_of_unknown_format_is_400(client):
+    assert client.get(f"{DATA_URL}&format=png").status_code == 400
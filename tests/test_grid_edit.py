@@ -0,0 +1,155 @@
+import pytest
+
+from truchet_tiles.common.tile_edit import TilingEditor
+from truchet_tiles.hexagonal.tiling import (
+    get_hexagonal_tiling,
+    get_hexagonal_tiling_data,
+    get_hexagonal_tiling_from_grid,
+)
+from truchet_tiles.rectangular.tiling import (
+    get_rectangular_tiling,
+    get_rectangular_tiling_data,
+    get_rectangular_tiling_from_grid,
+)
+from truchet_tiles.web_ui.truchet_ui.svg_patch import svg_patch
+
+COLORS = {"line_color": "#264653", "fill_color": "#F4A261", "bg_color": "#A8DADC"}
+
+RECT_FORM = {
+    "function": "XOR",
+    "dimension": "16",
+    "connector": "CURVED",
+    "hybrid_connector": "",
+    "line_width": "2",
+    "animation_method": "at_once",
+    "animation_duration": "0.5",
+    "grid_line_width": "0.5",
+    "grid_color": "#FF0000",
+    "image_height": "800",
+    **COLORS,
+}
+# The arguments the rect views give the tiling functions for RECT_FORM
+RECT_KWARGS = {
+    "function": "XOR",
+    "dimension": 16,
+    "connector": "curved",
+    "hybrid_connector": "",
+    "line_width": 2,
+    "edge_length": 50.0,
+    "rand_seed": 7,
+    **COLORS,
+}
+
+HEX_FORM = {
+    **RECT_FORM,
+    "function": "XSIGNMAG",
+    "dimension": "5",
+    "image_height": "720",
+}
+HEX_KWARGS = {
+    **RECT_KWARGS,
+    "function": "XSIGNMAG",
+    "dimension": 5,
+    "edge_length": 40.0,
+}
+
+
+def _post_edit(client, kind, form, cells):
+    client.cookies["X-TRUCHET-TILING-SEED"] = "7"
+    return client.post(
+        f"/{kind}/edit",
+        {**form, "render_key": "shown", "cells": cells},
+        HTTP_ACCEPT="application/json",
+    )
+
+
+def _redrawn_patch(old_svg, data, cells, from_grid, **kwargs):
+    # The patch between the tiling and the edited grid drawn again
+    editor = TilingEditor(data)
+    editor.flip_cells(cells)
+    return svg_patch(old_svg, from_grid(editor.data.grid, **kwargs))
+
+
+def _tiles(response):
+    return {(tile["x"], tile["y"]): tile["href"] for tile in response.json()["tiles"]}
+
+
+def test_rect_edit_patches_the_redrawn_tiles(client):
+    cells = [(0, 0), (3, 7), (15, 15)]
+    response = _post_edit(client, "rect", RECT_FORM, "0,0;3,7;15,15")
+
+    data_kwargs = {k: v for k, v in RECT_KWARGS.items() if k != "rand_seed"}
+    expected = _redrawn_patch(
+        get_rectangular_tiling(**RECT_KWARGS),
+        get_rectangular_tiling_data(**data_kwargs),
+        cells,
+        get_rectangular_tiling_from_grid,
+        **{k: v for k, v in data_kwargs.items() if k not in ("function", "dimension")},
+    )
+    assert response.status_code == 200
+    assert _tiles(response) == {(x, y): f"#{href}" for x, y, href in expected.tiles}
+    assert response.json()["defs"] == expected.defs
+
+
+@pytest.mark.parametrize("flat_top", [True, False])
+def test_hex_edit_patches_the_redrawn_tiles(client, flat_top):
+    cells = [(0, 0), (-4, 2), (3, 1)]
+    form = {**HEX_FORM, "flat_top": "on"} if flat_top else HEX_FORM
+    response = _post_edit(client, "hex", form, "0,0;-4,2;3,1")
+
+    # NOTE: Pointy top tilings rotate the flat top one, tiles keep their positions
+    data_kwargs = {k: v for k, v in HEX_KWARGS.items() if k != "rand_seed"}
+    expected = _redrawn_patch(
+        get_hexagonal_tiling(**HEX_KWARGS),
+        get_hexagonal_tiling_data(**data_kwargs),
+        cells,
+        get_hexagonal_tiling_from_grid,
+        **{k: v for k, v in data_kwargs.items() if k not in ("function", "dimension")},
+    )
+    assert response.status_code == 200
+    assert _tiles(response) == {(x, y): f"#{href}" for x, y, href in expected.tiles}
+    assert response.json()["defs"] == expected.defs
+
+
+def test_edit_sends_cells_flipped_back(client):
+    response = _post_edit(client, "rect", RECT_FORM, "2,3;2,3")
+
+    data_kwargs = {k: v for k, v in RECT_KWARGS.items() if k != "rand_seed"}
+    editor = TilingEditor(get_rectangular_tiling_data(**data_kwargs))
+    editor.flip((2, 3))
+    flipped_back = svg_patch(
+        get_rectangular_tiling_from_grid(
+            editor.data.grid,
+            **{
+                k: v
+                for k, v in data_kwargs.items()
+                if k not in ("function", "dimension")
+            },
+        ),
+        get_rectangular_tiling(**RECT_KWARGS),
+    )
+    assert response.status_code == 200
+    assert _tiles(response) == {(x, y): f"#{href}" for x, y, href in flipped_back.tiles}
+
+
+def test_edit_of_raster_tilings_is_rejected(client):
+    response = _post_edit(
+        client, "rect", {**RECT_FORM, "dimension": "1024", "image_height": "200"}, "0,0"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    ("kind", "form"), [("rect", RECT_FORM), ("hex", {**HEX_FORM, "flat_top": "on"})]
+)
+def test_edit_without_seed_cookie_uses_seed_0(client, kind, form):
+    client.cookies.clear()
+    response = client.post(
+        f"/{kind}/edit",
+        {**form, "render_key": "shown", "cells": "0,0"},
+        HTTP_ACCEPT="application/json",
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["tiles"]) == 1
@@ -0,0 +1,72 @@
+from random import Random
+
+import pytest
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import (
+    GRID_FILE_HEADER_SIZE,
+    grid_buffer_size,
+    read_grid_buffer,
+    read_grid_file,
+    write_grid_buffer,
+    write_grid_file,
+)
+from truchet_tiles.common.window import GridWindow
+
+WINDOWS = [
+    GridWindow(0, 1, 0, 1),
+    GridWindow(0, 8, 0, 8),
+    GridWindow(0, 5, 0, 13),
+    GridWindow(-7, 6, -3, 20),
+    GridWindow(2, 2, 0, 9),  # no rows
+]
+
+
+def _cells(grid: PackedGrid) -> list[int]:
+    window = grid.window
+    return [grid[(row, col)] for row in window.rows for col in window.cols]
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_grid_file_round_trip(tmp_path, window):
+    grid = PackedGrid.from_random(window, Random(1))
+    path = tmp_path / "grid.ttgr"
+    write_grid_file(path, grid)
+
+    read = read_grid_file(path)
+    assert read.window == window
+    assert bytes(read.data) == bytes(grid.data)
+    assert _cells(read) == _cells(grid)
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_grid_buffer_round_trip(window):
+    grid = PackedGrid.from_random(window, Random(2))
+    buffer = bytearray(grid_buffer_size(grid))
+    write_grid_buffer(memoryview(buffer), grid)
+
+    read = read_grid_buffer(memoryview(buffer))
+    assert read.window == window
+    assert _cells(read) == _cells(grid)
+
+
+def test_read_grid_file_rejects_other_files(tmp_path):
+    short_path = tmp_path / "short"
+    short_path.write_bytes(b"TTGR")
+    with pytest.raises(ValueError):
+        read_grid_file(short_path)
+
+    other_path = tmp_path / "other"
+    other_path.write_bytes(b"P4" + bytes(GRID_FILE_HEADER_SIZE))
+    with pytest.raises(ValueError):
+        read_grid_file(other_path)
+
+
+def test_read_grid_buffer_rejects_other_versions():
+    grid = PackedGrid.from_random(GridWindow(0, 3, 0, 3), Random(3))
+    buffer = bytearray(grid_buffer_size(grid))
+    write_grid_buffer(memoryview(buffer), grid)
+    buffer[4] = 99  # the version
+
+    with pytest.raises(ValueError, match="version"):
+        read_grid_buffer(memoryview(buffer))
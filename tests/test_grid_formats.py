@@ -0,0 +1,123 @@
+from random import Random
+
+import pytest
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import grid_buffer_size, write_grid_buffer
+from truchet_tiles.common.grid_formats import (
+    decode_grid,
+    decode_packed_bits,
+    decode_pbm,
+    decode_rle,
+)
+from truchet_tiles.common.window import GridWindow
+
+SIZES = [(1, 1), (8, 8), (13, 5), (3, 17), (64, 9)]
+
+
+def _rows(grid: PackedGrid) -> list[str]:
+    window = grid.window
+    return [
+        "".join(str(grid[(row, col)]) for col in window.cols) for row in window.rows
+    ]
+
+
+def _random_rows(width: int, height: int, seed: int) -> list[str]:
+    rng = Random(seed)
+    return ["".join(rng.choice("01") for _ in range(width)) for _ in range(height)]
+
+
+def _pbm(rows: list[str]) -> bytes:
+    width = len(rows[0])
+    data = b"".join(
+        int(row.ljust(-(-width // 8) * 8, "0"), 2).to_bytes(-(-width // 8), "big")
+        for row in rows
+    )
+    return b"P4\n# a comment\n%d %d\n" % (width, len(rows)) + data
+
+
+def _rle(rows: list[str]) -> str:
+    def runs(row: str) -> str:
+        text = ""
+        index = 0
+        while index < len(row):
+            stop = index
+            while stop < len(row) and row[stop] == row[index]:
+                stop += 1
+            count = stop - index
+            text += (str(count) if count > 1 else "") + (
+                "o" if row[index] == "1" else "b"
+            )
+            index = stop
+        return text
+
+    body = "$".join(runs(row.rstrip("0")) for row in rows) + "!"
+    return f"#C a comment\nx = {len(rows[0])}, y = {len(rows)}\n{body}\n"
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_decode_pbm(width, height):
+    rows = _random_rows(width, height, 1)
+    grid = decode_pbm(_pbm(rows), 64)
+    assert grid.window == GridWindow(0, height, 0, width)
+    assert _rows(grid) == rows
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_decode_rle(width, height):
+    rows = _random_rows(width, height, 2)
+    grid = decode_rle(_rle(rows), 64)
+    assert grid.window == GridWindow(0, height, 0, width)
+    assert _rows(grid) == rows
+
+
+def test_decode_rle_fills_missing_rows_and_cells():
+    grid = decode_rle("x = 4, y = 3\no$2bo!", 8)
+    assert _rows(grid) == ["1000", "0010", "0000"]
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_decode_packed_bits(width, height):
+    # NOTE: Grids of any window decode to a window starting at (0, 0)
+    grid = PackedGrid.from_random(GridWindow(-3, height - 3, 5, width + 5), Random(3))
+    data = bytearray(grid_buffer_size(grid))
+    write_grid_buffer(memoryview(data), grid)
+
+    decoded = decode_packed_bits(bytes(data), 64)
+    assert decoded.window == GridWindow(0, height, 0, width)
+    assert _rows(decoded) == _rows(grid)
+
+
+def test_decode_grid_detects_formats():
+    rows = _random_rows(11, 7, 4)
+    assert _rows(decode_grid(_pbm(rows), 64)) == rows
+    assert _rows(decode_grid(_rle(rows).encode(), 64)) == rows
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"P4\n65 1\n" + bytes(9),
+        b"x = 1, y = 65\no!",
+        b"P4\n0 1\n",
+    ],
+)
+def test_decoders_reject_sizes(data):
+    with pytest.raises(ValueError, match="should be between"):
+        decode_grid(data, 64)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"P4\n8 2\n\x00",  # truncated
+        b"x = 2, y = 1\n3o!",  # row longer than the width
+        b"x = 2, y = 1\no$o!",  # more rows than the height
+        b"x = 2, y = 1\nozo!",
+        b"just text",
+        b"\xff\xfe",
+    ],
+)
+def test_decoders_reject_invalid_grids(data):
+    with pytest.raises(ValueError):
+        decode_grid(data, 64)
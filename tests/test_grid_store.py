@@ -0,0 +1,66 @@
+import json
+import shutil
+import threading
+import uuid
+from random import Random
+
+import pytest
+
+from truchet_tiles.common.grid import PackedGrid
+from truchet_tiles.common.grid_file import grid_buffer_size
+from truchet_tiles.common.grid_store import SHARED_MEMORY_DIR, SharedGridStore
+from truchet_tiles.common.window import GridWindow
+
+pytestmark = pytest.mark.skipif(
+    not SHARED_MEMORY_DIR.is_dir(), reason="needs POSIX shared memory files"
+)
+
+GRIDS = [PackedGrid.from_random(GridWindow.square(0, 64), Random(i)) for i in range(8)]
+
+
+@pytest.fixture
+def store():
+    # A store of its own namespace, holding about half of GRIDS
+    store = SharedGridStore(
+        f"test_{uuid.uuid4().hex}", max_bytes=4 * grid_buffer_size(GRIDS[0])
+    )
+    yield store
+    store.release_all()
+    index_path = store._directory / "index.json"
+    for name in json.loads(index_path.read_text()):
+        store._unlink(name)
+    shutil.rmtree(store._directory)
+
+
+def test_stored_grids_are_shared(store):
+    shared = store.put(("grid", 0), GRIDS[0])
+
+    assert bytes(shared.data) == bytes(GRIDS[0].data)
+    assert store.get(("grid", 0)) is shared
+    assert store.get(("grid", 1)) is None
+
+
+def test_threads_share_the_store(store):
+    errors = []
+
+    def use_grids(seed):
+        rng = Random(seed)
+        try:
+            for _ in range(200):
+                i = rng.randrange(len(GRIDS))
+                grid = store.get(("grid", i)) or store.put(("grid", i), GRIDS[i])
+                assert bytes(grid.data) == bytes(GRIDS[i].data)
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    threads = [threading.Thread(target=use_grids, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert store._grid_bytes == sum(
+        grid_buffer_size(grid) for grid in store._grids.values()
+    )
+    assert store._grid_bytes <= 4 * grid_buffer_size(GRIDS[0])
@@ -0,0 +1,62 @@
+from django.core.files.uploadedfile import SimpleUploadedFile  # type: ignore
+
+from truchet_tiles.common.grid_formats import decode_rle
+from truchet_tiles.rectangular.tiling import get_rectangular_tiling_from_grid
+
+UPLOAD_URL = "/rect/upload?connector=curved&edge_length=10"
+GRID_TEXT = "x = 5, y = 3\n3b2o$b2obo$5o!"
+
+
+def test_uploaded_grid_text_is_drawn(client):
+    response = client.post(UPLOAD_URL, {"grid_text": GRID_TEXT})
+
+    grid = decode_rle(GRID_TEXT, 16)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/svg+xml"
+    assert response.content.decode() == get_rectangular_tiling_from_grid(
+        grid, connector="curved", edge_length=10.0
+    )
+
+
+def test_uploaded_pbm_file_is_drawn(client):
+    # A 2x2 checkerboard
+    pbm = b"P4\n2 2\n" + bytes([0b10000000, 0b01000000])
+    upload = SimpleUploadedFile("grid.pbm", pbm)
+
+    response = client.post(UPLOAD_URL, {"grid": upload})
+
+    assert response.status_code == 200
+    assert response.content.startswith(b"<?xml")
+
+
+def test_invalid_uploads_are_400(client):
+    assert client.post(UPLOAD_URL, {}).status_code == 400
+    assert client.post(UPLOAD_URL, {"grid_text": "not a grid"}).status_code == 400
+    assert (
+        client.post("/rect/upload?unknown=1", {"grid_text": GRID_TEXT}).status_code
+        == 400
+    )
+
+
+def test_too_large_uploads_are_413(client, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "GRID_UPLOAD_MAX_BYTES", 8)
+
+    response = client.post(UPLOAD_URL, {"grid_text": GRID_TEXT})
+
+    assert response.status_code == 413
+
+
+def test_uploads_over_the_max_dimension_are_400(client, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "GRID_UPLOAD_MAX_DIMENSION", 4)
+
+    response = client.post(UPLOAD_URL, {"grid_text": GRID_TEXT})
+
+    assert response.status_code == 400
+
+
+def test_upload_needs_post(client):
+    assert client.get(UPLOAD_URL).status_code == 405
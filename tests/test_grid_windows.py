@@ -0,0 +1,113 @@
+import gc
+
+import pytest
+
+from truchet_tiles.common.grid import FunctionalGrid
+from truchet_tiles.common.number_triangle import clear_number_triangles
+from truchet_tiles.common.window import GridWindow
+from truchet_tiles.hexagonal import grid_generator as hexagonal_grid_generator
+from truchet_tiles.hexagonal.grid_generator import HexGridType, get_hex_grid
+from truchet_tiles.rectangular.grid import generator as rectangular_grid_generator
+from truchet_tiles.rectangular.grid.generator import RectGridType, get_rect_grid
+
+RECT_WINDOWS = [
+    GridWindow(0, 1, 0, 1),
+    GridWindow(3, 17, 5, 20),
+    GridWindow(-4, 6, 18, 40),  # partly outside the grid
+]
+HEX_WINDOWS = [
+    GridWindow(0, 1, 0, 1),
+    GridWindow(-5, 4, -2, 8),
+    GridWindow(-20, 0, 3, 30),  # partly outside the grid
+]
+
+
+@pytest.mark.parametrize("window", RECT_WINDOWS)
+@pytest.mark.parametrize("grid_type", list(RectGridType))
+def test_rect_window_matches_full_grid(grid_type, window):
+    size = 23
+    full_grid = get_rect_grid(size, grid_type, None, 7)
+    windowed_grid = get_rect_grid(size, grid_type, window, 7)
+    window = window.intersect(GridWindow.square(0, size))
+
+    for row in window.rows:
+        for col in window.cols:
+            assert windowed_grid[(row, col)] == full_grid[(row, col)], (row, col)
+
+
+@pytest.mark.parametrize("window", HEX_WINDOWS)
+@pytest.mark.parametrize("grid_type", list(HexGridType))
+def test_hex_window_matches_full_grid(grid_type, window):
+    dimension = 9
+    full_grid = get_hex_grid(dimension, grid_type, None, 7)
+    windowed_grid = get_hex_grid(dimension, grid_type, window, 7)
+    window = window.intersect(GridWindow.square(-dimension + 1, dimension))
+
+    for q in window.rows:
+        for r in window.cols:
+            if abs(q + r) < dimension:
+                assert windowed_grid[(q, r)] == full_grid[(q, r)], (q, r)
+
+
+@pytest.mark.parametrize("grid_type", [RectGridType.RANDOM, RectGridType.HASHRANDOM])
+def test_rect_full_window_matches_full_grid(grid_type):
+    full_grid = get_rect_grid(16, grid_type, None, 3)
+    windowed_grid = get_rect_grid(16, grid_type, GridWindow.square(0, 16), 3)
+    for row in range(16):
+        for col in range(16):
+            assert windowed_grid[(row, col)] == full_grid[(row, col)]
+
+
+@pytest.mark.parametrize("grid_type", list(RectGridType))
+def test_rect_grown_grid_matches_cleared_grid(grid_type):
+    get_rect_grid(11, grid_type, None, 5)
+    grown_grid = get_rect_grid(19, grid_type, None, 5)
+    rectangular_grid_generator.clear_grid_caches()
+    clear_number_triangles()
+    grid = get_rect_grid(19, grid_type, None, 5)
+
+    assert grid is not grown_grid
+    for row in range(19):
+        for col in range(19):
+            assert grown_grid[(row, col)] == grid[(row, col)], (row, col)
+
+
+@pytest.mark.parametrize("grid_type", list(HexGridType))
+def test_hex_grown_grid_matches_cleared_grid(grid_type):
+    get_hex_grid(5, grid_type, None, 5)
+    grown_grid = get_hex_grid(8, grid_type, None, 5)
+    hexagonal_grid_generator.clear_grid_caches()
+    grid = get_hex_grid(8, grid_type, None, 5)
+
+    assert grid is not grown_grid
+    for q in range(-7, 8):
+        for r in range(-7, 8):
+            if abs(q + r) < 8:
+                assert grown_grid[(q, r)] == grid[(q, r)], (q, r)
+
+
+def _live_functional_grids() -> int:
+    gc.collect()
+    return sum(isinstance(obj, FunctionalGrid) for obj in gc.get_objects())
+
+
+def test_rect_grids_grown_many_times_are_freed():
+    rectangular_grid_generator.clear_grid_caches()
+    hexagonal_grid_generator.clear_grid_caches()
+    for step in range(1000):
+        grid = get_rect_grid(2 + step % 65, RectGridType.XOR)
+
+    assert grid[(5, 5)] == 0
+    assert grid[(5, 4)] == 1
+    assert _live_functional_grids() <= rectangular_grid_generator.GRID_CACHE_SIZE
+
+
+def test_hex_grids_grown_many_times_are_freed():
+    rectangular_grid_generator.clear_grid_caches()
+    hexagonal_grid_generator.clear_grid_caches()
+    for step in range(1000):
+        grid = get_hex_grid(2 + step % 65, HexGridType.XSIGNMAG)
+
+    expected = get_hex_grid(11, HexGridType.XSIGNMAG, GridWindow(3, 4, 4, 5))
+    assert grid[(3, 4)] == expected[(3, 4)]
+    assert _live_functional_grids() <= hexagonal_grid_generator.GRID_CACHE_SIZE
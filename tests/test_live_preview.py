@@ -0,0 +1,55 @@
+import asyncio
+
+from truchet_tiles.web_ui.truchet_ui.live_preview import LivePreview, get_live_previews
+
+RECT_FORM = {
+    "function": "XOR",
+    "dimension": "4",
+    "connector": "LINE",
+    "hybrid_connector": "",
+    "line_width": "2",
+    "line_color": "#264653",
+    "fill_color": "#F4A261",
+    "bg_color": "#A8DADC",
+    "animation_method": "at_once",
+    "animation_duration": "0.5",
+    "grid_line_width": "0.5",
+    "grid_color": "#FF0000",
+    "image_height": "400",
+}
+
+
+def test_live_update_without_seed_cookie_uses_seed_0(client):
+    channel, preview = get_live_previews().open("rect")
+    try:
+        client.cookies.clear()
+        response = client.post(f"/rect/live?channel={channel}", RECT_FORM)
+    finally:
+        get_live_previews().close(channel)
+
+    assert response.status_code == 204
+    assert preview.tiling_kwargs["rand_seed"] == 0
+
+
+def test_live_update_of_unknown_channel_is_rejected(client):
+    response = client.post("/rect/live?channel=unknown", RECT_FORM)
+
+    assert response.status_code == 400
+
+
+def test_live_preview_renders_settled_updates_once(django_app):
+    async def first_render():
+        preview = LivePreview("rect", 0.05)
+        renders = preview.renders()
+        for dimension in (2, 3, 4):
+            preview.update({"dimension": dimension, "edge_length": 8.0})
+
+        tiling_kwargs, rendered, final = await anext(renders)
+        await renders.aclose()
+        return tiling_kwargs, rendered, final
+
+    tiling_kwargs, rendered, final = asyncio.run(first_render())
+
+    assert tiling_kwargs["dimension"] == 4
+    assert final
+    assert 'width="32.0"' in rendered.text
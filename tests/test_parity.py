@@ -0,0 +1,30 @@
+import pytest
+
+from truchet_tiles.common.math import parity
+from truchet_tiles.rectangular.grid.generator import RectGridType, get_rect_grid
+
+
+@pytest.mark.parametrize("x", [0, 1, 6, 7, 2**53 + 1, 7**19, 13**17, 3**200])
+def test_parity_counts_every_bit(x):
+    assert parity(x) == x.bit_count() % 2
+
+
+@pytest.mark.parametrize(
+    ("x", "expected"), [(-1, 0), (-5, 1), (-6, 1), (-(7**19), 0), (-(2**60 + 3), 0)]
+)
+def test_parity_of_negative_numbers(x, expected):
+    assert parity(x) == expected
+
+
+@pytest.mark.parametrize(
+    ("grid_type", "cell", "expected"),
+    [
+        # NOTE: Halving through floats gave the other value for these cells
+        (RectGridType.POWXOR, (7, 19), 1),
+        (RectGridType.POWXOR, (13, 17), 0),
+        (RectGridType.SYMPOWSUMXOR, (9, 19), 0),
+        (RectGridType.SYMPOWSUMXOR, (13, 15), 1),
+    ],
+)
+def test_cells_beyond_float_precision(grid_type, cell, expected):
+    assert get_rect_grid(20, grid_type)[cell] == expected
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from truchet_tiles.web_ui.truchet_ui.live_preview import LivePreview
+from truchet_tiles.web_ui.truchet_ui.progressive import needs_preview
+
+
+@pytest.fixture
+def progressive_min_dimension(django_app, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "PROGRESSIVE_MIN_DIMENSION", 16)
+
+
+def _renders(tiling_kwargs, count, previewed=False):
+    async def first_renders():
+        preview = LivePreview("rect", 0.01)
+        preview.update(tiling_kwargs, previewed)
+        renders = preview.renders()
+        results = [await anext(renders) for _ in range(count)]
+        await renders.aclose()
+        return [(rendered, final) for _, rendered, final in results]
+
+    return asyncio.run(first_renders())
+
+
+def test_large_tilings_are_previewed_as_rasters_first(progressive_min_dimension):
+    tiling_kwargs = {
+        "function": "RANDOM",
+        "dimension": 24,
+        "edge_length": 4.0,
+        "rand_seed": 51,
+    }
+    (preview, preview_final), (rendered, final) = _renders(tiling_kwargs, 2)
+
+    assert not preview_final and final
+    assert "<image" in preview.text
+    assert "<image" not in rendered.text
+    assert 'width="96.0"' in preview.text
+    assert 'width="96.0"' in rendered.text
+
+
+def test_previewed_tilings_get_the_full_render(progressive_min_dimension):
+    tiling_kwargs = {
+        "function": "RANDOM",
+        "dimension": 24,
+        "edge_length": 4.0,
+        "rand_seed": 52,
+    }
+    ((rendered, final),) = _renders(tiling_kwargs, 1, previewed=True)
+
+    assert final
+    assert "<image" not in rendered.text
+
+
+def test_small_and_rendered_tilings_need_no_preview(progressive_min_dimension):
+    tiling_kwargs = {
+        "function": "RANDOM",
+        "dimension": 24,
+        "edge_length": 4.0,
+        "rand_seed": 53,
+    }
+    assert not needs_preview("rect", {**tiling_kwargs, "dimension": 15})
+    assert needs_preview("rect", tiling_kwargs)
+
+    _renders(tiling_kwargs, 2)
+
+    assert not needs_preview("rect", tiling_kwargs)
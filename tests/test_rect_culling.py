@@ -0,0 +1,88 @@
+import re
+
+from truchet_tiles.common.constants import ANIMATION_BEGIN
+from truchet_tiles.rectangular.tiling import (
+    get_rectangular_tiling,
+    get_rectangular_tiling_data,
+)
+
+_TILE = re.compile(r'<use xlink:href="#truchet_tiling\d+" x="([^"]+)" y="([^"]+)"')
+_BEGIN = re.compile(r'dur="1\.0" begin="([^"]+)"')
+
+DIMENSION = 16
+EDGE_LENGTH = 32.0
+
+
+def _tiles(svg_text):
+    # Positions of the tiles by (row, col), with the begin of their animation
+    tiles = {}
+    for element in svg_text.split("<use ")[1:]:
+        tile = _TILE.match(f"<use {element}")
+        if tile is None:
+            continue
+
+        begin = _BEGIN.search(element)
+        position = (
+            round(float(tile.group(2)) / EDGE_LENGTH),
+            round(float(tile.group(1)) / EDGE_LENGTH),
+        )
+        tiles[position] = float(begin.group(1)) if begin else None
+
+    return tiles
+
+
+def test_aligned_renders_cull_the_tiles_outside_the_view_box():
+    tiles = _tiles(
+        get_rectangular_tiling(
+            function="RANDOM",
+            dimension=DIMENSION,
+            edge_length=EDGE_LENGTH,
+            align_to_axis=True,
+            rand_seed=5,
+        )
+    )
+
+    assert len(tiles) < DIMENSION * DIMENSION
+    # The corners of the grid are outside of the view box, its center is inside
+    for corner in ((0, 0), (0, DIMENSION - 1), (DIMENSION - 1, 0)):
+        assert corner not in tiles
+    assert (DIMENSION // 2, DIMENSION // 2) in tiles
+
+
+def test_rotated_renders_draw_every_tile():
+    tiles = _tiles(
+        get_rectangular_tiling(
+            function="RANDOM",
+            dimension=DIMENSION,
+            edge_length=EDGE_LENGTH,
+            rand_seed=5,
+        )
+    )
+
+    assert len(tiles) == DIMENSION * DIMENSION
+
+
+def test_culled_tiles_take_their_turn_in_by_tile_animations():
+    tiles = _tiles(
+        get_rectangular_tiling(
+            function="RANDOM",
+            dimension=DIMENSION,
+            edge_length=EDGE_LENGTH,
+            align_to_axis=True,
+            animate=True,
+            animation_method="by_tile",
+            rand_seed=5,
+        )
+    )
+    grid = get_rectangular_tiling_data(
+        function="RANDOM", dimension=DIMENSION, rand_seed=5
+    ).grid
+
+    # Tiles animate from a grid of zeros, one after the other in row major order
+    turn = 0
+    for row in range(DIMENSION):
+        for col in range(DIMENSION):
+            if (row, col) in tiles:
+                begin = ANIMATION_BEGIN + turn if grid[(row, col)] else None
+                assert tiles[(row, col)] == begin
+            turn += grid[(row, col)]
@@ -0,0 +1,73 @@
+import pytest
+
+from truchet_tiles.common.lod import RASTER_DETAIL
+from truchet_tiles.hexagonal.tiling import estimate_hexagonal_tiling_cost
+from truchet_tiles.rectangular.tiling import estimate_rectangular_tiling_cost
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderRejected,
+    admit_render,
+)
+
+
+@pytest.fixture
+def render_budgets(django_app, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "RENDER_BUDGET_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "RENDER_BUDGET_BYTES", 1 << 30)
+
+
+@pytest.mark.parametrize(
+    "estimate", [estimate_rectangular_tiling_cost, estimate_hexagonal_tiling_cost]
+)
+def test_costs_grow_with_the_dimension(estimate):
+    small, large = estimate(dimension=16), estimate(dimension=64)
+
+    assert small.seconds < large.seconds
+    assert small.memory < large.memory
+    assert small.output_size < large.output_size
+
+
+@pytest.mark.parametrize(
+    "estimate", [estimate_rectangular_tiling_cost, estimate_hexagonal_tiling_cost]
+)
+def test_rasters_and_svgs_cost_less_than_pngs(estimate):
+    svg = estimate(dimension=64)
+
+    assert estimate(dimension=64, lod_policy=RASTER_DETAIL).seconds < svg.seconds
+    assert svg.seconds < estimate(dimension=64, output_format="png").seconds
+
+
+def test_unknown_output_formats_are_rejected():
+    with pytest.raises(ValueError):
+        estimate_rectangular_tiling_cost(output_format="pdf")
+
+
+def test_cheap_renders_are_admitted_unchanged(render_budgets):
+    tiling_kwargs = {"dimension": 16}
+
+    assert admit_render("rect", tiling_kwargs) == tiling_kwargs
+
+
+def test_renders_over_the_budgets_are_drawn_as_rasters(render_budgets):
+    admitted = admit_render("rect", {"dimension": 512})
+
+    assert admitted == {"dimension": 512, "lod_policy": RASTER_DETAIL}
+
+
+def test_renders_over_the_budgets_as_rasters_are_rejected(render_budgets):
+    with pytest.raises(RenderRejected):
+        admit_render("rect", {"dimension": 4096})
+
+    with pytest.raises(RenderRejected):
+        admit_render("rect", {"dimension": 512}, budget=0.001)
+
+
+def test_uploads_over_the_budgets_are_422(client, render_budgets, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "RENDER_BUDGET_SECONDS", 0.0)
+
+    response = client.post("/rect/upload", {"grid_text": "x = 2, y = 2\n2o$2o!"})
+
+    assert response.status_code == 422
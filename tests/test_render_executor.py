@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+import pytest
+
+from truchet_tiles.common.cancel import RenderCancelled, check_cancelled
+from truchet_tiles.web_ui.truchet_ui import render_executor
+from truchet_tiles.web_ui.truchet_ui.render_executor import (
+    RenderExecutor,
+    RenderQueueFull,
+    RenderTimeout,
+)
+
+
+def _wait_for(started: threading.Event, release: threading.Event) -> str:
+    started.set()
+    release.wait(5)
+    return "done"
+
+
+def _run_until_cancelled(started: threading.Event, stopped: threading.Event) -> None:
+    # Like a render, checks the cancel token of its scope once per "row"
+    started.set()
+    try:
+        for _ in range(500):
+            check_cancelled()
+            threading.Event().wait(0.01)
+    except RenderCancelled:
+        stopped.set()
+        raise
+
+
+@pytest.fixture
+def busy_executor():
+    # An executor of a single worker and no queue, busy until the test ends
+    executor = RenderExecutor(max_workers=1, max_queue_depth=0)
+    started, release = threading.Event(), threading.Event()
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(executor.run(_wait_for, started=started, release=release),),
+    )
+    thread.start()
+    assert started.wait(5)
+    yield executor
+    release.set()
+    thread.join(5)
+
+
+def test_full_executor_rejects_renders(busy_executor):
+    with pytest.raises(RenderQueueFull):
+        asyncio.run(busy_executor.run(str))
+
+
+def test_executor_admits_renders_once_a_worker_is_free():
+    executor = RenderExecutor(max_workers=1, max_queue_depth=0)
+    started, release = threading.Event(), threading.Event()
+    release.set()
+
+    assert asyncio.run(executor.run(_wait_for, started=started, release=release))
+    assert asyncio.run(executor.run(_wait_for, started=started, release=release))
+
+
+def test_timed_out_renders_stop_and_free_their_worker():
+    executor = RenderExecutor(max_workers=1, max_queue_depth=0, timeout=0.1)
+    started, stopped = threading.Event(), threading.Event()
+
+    with pytest.raises(RenderTimeout):
+        asyncio.run(
+            executor.run(_run_until_cancelled, started=started, stopped=stopped)
+        )
+
+    assert stopped.wait(1)
+    assert asyncio.run(executor.run(str, object="free")) == "free"
+
+
+def test_cancelled_renders_stop():
+    executor = RenderExecutor(max_workers=1, max_queue_depth=0, timeout=None)
+    started, stopped = threading.Event(), threading.Event()
+
+    async def cancel_render():
+        task = asyncio.create_task(
+            executor.run(_run_until_cancelled, started=started, stopped=stopped)
+        )
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_render())
+    assert stopped.wait(1)
+
+
+def test_svg_of_full_executor_is_503(client, busy_executor, monkeypatch):
+    monkeypatch.setattr(render_executor, "get_render_executor", lambda: busy_executor)
+
+    response = client.get("/rect/svg?dimension=9&rand_seed=37")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_svg_over_the_render_budgets_is_422(client, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "RENDER_BUDGET_SECONDS", 0.0)
+
+    response = client.get("/rect/svg?dimension=9&rand_seed=38")
+
+    assert response.status_code == 422
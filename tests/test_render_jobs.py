@@ -0,0 +1,96 @@
+import gzip
+
+import pytest
+
+from truchet_tiles.rectangular.tiling import get_rectangular_tiling
+
+JOB_QUERY = "dimension=10&edge_length=8&connector=curved"
+
+
+@pytest.fixture
+def jobs(client, monkeypatch):
+    # Render jobs run in the test by run_queued_jobs, instead of in job workers
+    from render_jobs import jobs, views  # type: ignore
+
+    monkeypatch.setattr(views, "start_queued_jobs", lambda: None)
+    monkeypatch.setattr(views, "get_job_pool", lambda: None)
+    return jobs
+
+
+def _download(client, job):
+    response = client.get(job["download_url"])
+    return response, b"".join(response.streaming_content)
+
+
+def test_submitted_job_is_polled_and_downloaded(client, jobs):
+    response = client.post(f"/jobs/rect?{JOB_QUERY}")
+
+    job = response.json()
+    assert response.status_code == 202
+    assert response.headers["Location"] == job["url"]
+    assert job["state"] == "queued"
+    assert job["download_url"] is None
+
+    assert client.get(f"{job['url']}/download").status_code == 409
+
+    jobs.run_queued_jobs()
+    job = client.get(job["url"]).json()
+
+    assert job["state"] == "done"
+    assert job["progress"] == 1.0
+    response, content = _download(client, job)
+    assert response.headers["Content-Disposition"] == (
+        'attachment; filename="rect-tiling.svg"'
+    )
+    assert content.decode() == get_rectangular_tiling(
+        dimension=10, edge_length=8.0, connector="curved"
+    )
+
+
+def test_svgz_jobs_are_gzipped(client, jobs):
+    job = client.post(f"/jobs/rect?{JOB_QUERY}&format=svgz").json()
+
+    jobs.run_queued_jobs()
+    _, content = _download(client, client.get(job["url"]).json())
+
+    assert gzip.decompress(content).decode() == get_rectangular_tiling(
+        dimension=10, edge_length=8.0, connector="curved"
+    )
+
+
+def test_failed_jobs_give_their_error(client, jobs, monkeypatch):
+    def fail(job):
+        raise MemoryError
+
+    monkeypatch.setattr(jobs, "_render_job_output", fail)
+    job = client.post(f"/jobs/rect?{JOB_QUERY}").json()
+
+    jobs.run_queued_jobs()
+    job = client.get(job["url"]).json()
+
+    assert job["state"] == "failed"
+    assert job["error"] == "MemoryError"
+    assert client.get(f"{job['url']}/download").status_code == 409
+
+
+def test_invalid_jobs_are_not_queued(client, jobs):
+    assert client.post(f"/jobs/rect?{JOB_QUERY}&format=pdf").status_code == 400
+    assert client.post("/jobs/rect?dimension=0").status_code == 400
+    assert client.post("/jobs/rect?dimension=100000").status_code == 400
+    assert client.post("/jobs/tri?dimension=4").status_code == 404
+    assert client.get(f"/jobs/rect?{JOB_QUERY}").status_code == 405
+
+
+def test_jobs_over_the_job_budgets_are_422(client, jobs, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    monkeypatch.setattr(settings, "RENDER_JOB_TIMEOUT", 0.0)
+
+    assert client.post(f"/jobs/rect?{JOB_QUERY}").status_code == 422
+
+
+def test_unknown_jobs_are_404(client, jobs):
+    url = "/jobs/00000000-0000-0000-0000-000000000000"
+
+    assert client.get(url).status_code == 404
+    assert client.get(f"{url}/download").status_code == 404
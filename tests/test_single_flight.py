@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from truchet_tiles.web_ui.truchet_ui.single_flight import SingleFlight
+
+
+class _Render:
+    # A render that takes its time and counts how often it ran
+    def __init__(self, result: bytes = b"<svg/>") -> None:
+        self.result = result
+        self.count = 0
+
+    async def __call__(self) -> bytes:
+        self.count += 1
+        await asyncio.sleep(0.1)
+        return self.result
+
+
+async def _gather(*runs):
+    return await asyncio.gather(*runs)
+
+
+def test_identical_renders_are_coalesced(tmp_path):
+    flight = SingleFlight(tmp_path)
+    render = _Render()
+
+    results = asyncio.run(_gather(*(flight.run("key", render) for _ in range(5))))
+
+    assert results == [b"<svg/>"] * 5
+    assert render.count == 1
+
+
+def test_different_renders_are_not_coalesced(tmp_path):
+    flight = SingleFlight(tmp_path)
+    render = _Render()
+
+    asyncio.run(_gather(flight.run("a", render), flight.run("b", render)))
+
+    assert render.count == 2
+
+
+def test_renders_are_coalesced_across_workers(tmp_path):
+    # Each worker process has its own SingleFlight over the shared directory
+    render = _Render()
+
+    results = asyncio.run(
+        _gather(
+            SingleFlight(tmp_path).run("key", render),
+            SingleFlight(tmp_path).run("key", render),
+        )
+    )
+
+    assert results == [b"<svg/>"] * 2
+    assert render.count == 1
+
+
+def test_waiters_get_the_error_of_the_render(tmp_path):
+    flight = SingleFlight(tmp_path)
+
+    async def fail():
+        await asyncio.sleep(0.1)
+        raise ValueError("unknown connector")
+
+    async def run_both():
+        return await asyncio.gather(
+            flight.run("key", fail), flight.run("key", fail), return_exceptions=True
+        )
+
+    errors = asyncio.run(run_both())
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_cancelled_waiters_leave_the_render_running(tmp_path):
+    flight = SingleFlight(tmp_path)
+    render = _Render()
+
+    async def cancel_waiter():
+        leader = asyncio.create_task(flight.run("key", render))
+        waiter = asyncio.create_task(flight.run("key", render))
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(cancel_waiter()) == b"<svg/>"
+    assert render.count == 1
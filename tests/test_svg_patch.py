@@ -0,0 +1,84 @@
+import pytest
+
+from truchet_tiles.hexagonal.tiling import get_hexagonal_tiling
+from truchet_tiles.rectangular.tiling import get_rectangular_tiling
+from truchet_tiles.web_ui.truchet_ui.svg_patch import (
+    _TILE,
+    _split_tiling,
+    svg_patch,
+)
+
+
+def _apply(svg_text, patch):
+    # Applies the patch like the client does, adding the base tiles to the defs and
+    # pointing the tiles at the positions of the patch at their new base tiles
+    hrefs = {(x, y): href for x, y, href in patch.tiles}
+    lines = []
+    for line in svg_text.splitlines():
+        tile = _TILE.fullmatch(line)
+        if tile is not None and (tile.group(2), tile.group(3)) in hrefs:
+            href = hrefs[(tile.group(2), tile.group(3))]
+            line = (
+                f'<use xlink:href="#{href}" x="{tile.group(2)}" y="{tile.group(3)}" />'
+            )
+        lines.append(line)
+        if line == "<defs>":
+            lines.extend(patch.defs.values())
+
+    return "\n".join(lines)
+
+
+def _assert_same_tiling(svg_text, expected_svg_text):
+    tiling, expected = _split_tiling(svg_text), _split_tiling(expected_svg_text)
+    assert tiling.frame == expected.frame
+    assert tiling.tiles == expected.tiles
+    for href in set(tiling.tiles.values()):
+        assert tiling.defs[href] == expected.defs[href]
+
+
+@pytest.mark.parametrize(
+    ("get_tiling", "kwargs"),
+    [
+        (get_rectangular_tiling, {"dimension": 12, "edge_length": 20.0}),
+        (get_hexagonal_tiling, {"dimension": 4, "edge_length": 20.0}),
+    ],
+)
+def test_patched_svg_is_the_new_svg(get_tiling, kwargs):
+    old_svg = get_tiling(function="RANDOM", rand_seed=1, **kwargs)
+    new_svg = get_tiling(function="RANDOM", rand_seed=2, **kwargs)
+
+    patch = svg_patch(old_svg, new_svg)
+
+    assert patch is not None
+    assert 0 < len(patch.tiles)
+    _assert_same_tiling(_apply(old_svg, patch), new_svg)
+
+
+def test_patch_of_identical_svgs_is_empty():
+    svg_text = get_rectangular_tiling(dimension=6, edge_length=20.0)
+
+    patch = svg_patch(svg_text, svg_text)
+
+    assert patch is not None
+    assert patch.tiles == []
+    assert patch.defs == {}
+
+
+def test_svgs_of_other_frames_are_not_patched():
+    old_svg = get_rectangular_tiling(dimension=6, edge_length=20.0)
+
+    assert (
+        svg_patch(old_svg, get_rectangular_tiling(dimension=7, edge_length=20.0))
+        is None
+    )
+    assert (
+        svg_patch(old_svg, get_rectangular_tiling(dimension=6, edge_length=30.0))
+        is None
+    )
+    assert (
+        svg_patch(
+            old_svg,
+            get_rectangular_tiling(dimension=6, edge_length=20.0, bg_color="#000"),
+        )
+        is None
+    )
@@ -0,0 +1,107 @@
+import gzip
+
+from truchet_tiles.web_ui.truchet_ui.render_executor import RenderCache
+from truchet_tiles.web_ui.truchet_ui.rendered_svg import BROTLI_AVAILABLE, RenderedSvg
+
+SVG_URL = "/rect/svg?dimension=8&rand_seed=3"
+
+
+def test_svg_has_an_etag(client):
+    response = client.get(SVG_URL)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert "immutable" in response.headers["Cache-Control"]
+
+
+def test_svg_of_matching_etag_is_not_modified(client):
+    etag = client.get(SVG_URL).headers["ETag"]
+
+    response = client.get(SVG_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_etags_differ_between_tilings(client):
+    etag = client.get(SVG_URL).headers["ETag"]
+
+    assert client.get("/rect/svg?dimension=9&rand_seed=3").headers["ETag"] != etag
+
+
+def test_query_out_of_the_form_bounds_is_400(client):
+    assert client.get("/rect/svg?dimension=0").status_code == 400
+    assert client.get("/rect/svg?line_width=1000").status_code == 400
+    assert client.get("/rect/svg?unknown=1").status_code == 400
+
+
+def test_svg_is_served_in_the_accepted_encoding(client):
+    svg = client.get(SVG_URL).content
+
+    response = client.get(SVG_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content) == svg
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] != client.get(SVG_URL).headers["ETag"]
+
+
+def test_brotli_is_preferred_when_available(client):
+    response = client.get(SVG_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+    if BROTLI_AVAILABLE:
+        assert response.headers["Content-Encoding"] == "br"
+    else:
+        assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_rendered_svgs_round_trip_through_bytes():
+    rendered = RenderedSvg.from_text("<svg>" + "<g/>" * 100 + "</svg>")
+
+    assert RenderedSvg.from_bytes(rendered.to_bytes()) == rendered
+
+
+def test_render_cache_drops_least_recently_used_renders():
+    renders = [RenderedSvg.from_text(f"<svg>{i}</svg>") for i in range(3)]
+    cache = RenderCache(renders[0].size * 2)
+
+    cache.put("0", renders[0])
+    cache.put("1", renders[1])
+    assert cache.get("0") == renders[0]
+    cache.put("2", renders[2])
+
+    assert cache.get("0") == renders[0]
+    assert cache.get("1") is None
+    assert cache.get("2") == renders[2]
+
+
+def test_downloads_are_streamed_attachments(client):
+    svg = client.get(SVG_URL).content
+
+    response = client.get("/rect/download?dimension=8&rand_seed=3&format=svgz")
+
+    assert response.streaming
+    assert (
+        response.headers["Content-Disposition"]
+        == 'attachment; filename="rect-tiling.svgz"'
+    )
+    assert gzip.decompress(b"".join(response.streaming_content)) == svg
+
+
+def test_download_of_unknown_format_is_400(client):
+    assert client.get("/rect/download?format=pdf").status_code == 400
+
+
+def test_svgs_drawn_as_rasters_have_their_own_etag_and_expire(client, monkeypatch):
+    from django.conf import settings  # type: ignore
+
+    url = "/rect/svg?dimension=64&edge_length=4"
+    full = client.get(url)
+    monkeypatch.setattr(settings, "RENDER_BUDGET_SECONDS", 0.05)
+    raster = client.get(url)
+
+    assert b"<image" in raster.content
+    assert raster.headers["ETag"] != full.headers["ETag"]
+    assert "immutable" not in raster.headers["Cache-Control"]
+    assert "max-age=300" in raster.headers["Cache-Control"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=full.headers["ETag"]).status_code == 200
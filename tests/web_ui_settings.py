@@ -0,0 +1,19 @@
+import tempfile
+from pathlib import Path
+
+from truchet_ui.settings import *
+
+# NOTE: Tests keep their files out of the web_ui directory and grids out of the disk
+# cache, so that the grid tests see the grids of the generators
+_TEST_DIR = Path(tempfile.mkdtemp(prefix="truchet_ui_tests_"))
+
+ALLOWED_HOSTS = ["testserver"]
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": _TEST_DIR / "db.sqlite3",
+    }
+}
+GRID_CACHE_DIR = None
+RENDER_JOB_DIR = _TEST_DIR / "render_jobs_output"
+SINGLE_FLIGHT_DIR = _TEST_DIR / "single_flight"